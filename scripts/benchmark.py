@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark decoding and parsing of API responses."""
+import argparse
+import timeit
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+from typing_extensions import Final
+from withings_api.codec import CODECS, STDLIB_CODEC
+from withings_api.common import (
+    HeartListResponse,
+    MeasureGetMeasResponse,
+    SleepGetResponse,
+    SleepGetSummaryResponse,
+    parse_trusted,
+)
+
+TIMEZONE: Final = "Europe/London"
+
+
+def measure_get_meas_body(size: int) -> Dict[str, Any]:
+    """Create a measure_get_meas body with size groups."""
+    return {
+        "measuregrps": [
+            {
+                "attrib": 0,
+                "category": 1,
+                "created": 1577836800 + index,
+                "date": 1577836800 + index,
+                "deviceid": "device",
+                "grpid": index,
+                "measures": [
+                    {"type": meastype, "unit": -2, "value": 7000 + index}
+                    for meastype in (1, 5, 6, 8)
+                ],
+            }
+            for index in range(size)
+        ],
+        "more": False,
+        "offset": 0,
+        "timezone": TIMEZONE,
+        "updatetime": 1577836800,
+    }
+
+
+def sleep_get_body(size: int) -> Dict[str, Any]:
+    """Create a sleep_get body with size minutes of samples."""
+    samples: Final = {str(1577836800 + index * 60): 60 for index in range(size)}
+    return {
+        "model": 32,
+        "series": [
+            {
+                "startdate": 1577836800,
+                "enddate": 1577836800 + size * 60,
+                "state": 1,
+                "hr": samples,
+                "rr": samples,
+                "snoring": samples,
+            }
+        ],
+    }
+
+
+def sleep_get_summary_body(size: int) -> Dict[str, Any]:
+    """Create a sleep_get_summary body with size series."""
+    return {
+        "more": False,
+        "offset": 0,
+        "series": [
+            {
+                "timezone": TIMEZONE,
+                "model": 32,
+                "startdate": 1577836800 + index * 86400,
+                "enddate": 1577865600 + index * 86400,
+                "date": "2020-01-01",
+                "modified": 1577865600 + index * 86400,
+                "data": {"deepsleepduration": 3600, "sleep_score": 80},
+            }
+            for index in range(size)
+        ],
+    }
+
+
+def heart_list_body(size: int) -> Dict[str, Any]:
+    """Create a heart_list body with size series."""
+    return {
+        "more": False,
+        "offset": 0,
+        "series": [
+            {
+                "ecg": {"signalid": index, "afib": 0},
+                "bloodpressure": {"diastole": 80, "systole": 120},
+                "heart_rate": 60,
+                "timestamp": 1577836800 + index,
+                "model": 44,
+            }
+            for index in range(size)
+        ],
+    }
+
+
+BODIES: Final[List[Tuple[Type[BaseModel], Callable[[int], Dict[str, Any]]]]] = [
+    (MeasureGetMeasResponse, measure_get_meas_body),
+    (SleepGetResponse, sleep_get_body),
+    (SleepGetSummaryResponse, sleep_get_summary_body),
+    (HeartListResponse, heart_list_body),
+]
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Get the fastest time of calling func."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main() -> None:
+    """Run main function."""
+    parser: Final = argparse.ArgumentParser(description="Benchmark parsing.")
+    parser.add_argument(
+        "--size", dest="size", type=int, default=1000, help="Items per response."
+    )
+    parser.add_argument(
+        "--repeat", dest="repeat", type=int, default=5, help="Runs per benchmark."
+    )
+    args: Final = parser.parse_args()
+
+    codecs: Final = sorted(CODECS.values(), key=lambda codec: codec.name)
+    print(
+        "%-25s" % "response"
+        + "".join("%12s" % codec.name for codec in codecs)
+        + "%12s%12s%8s" % ("validated", "trusted", "speedup")
+    )
+    for model, create_body in BODIES:
+        body = create_body(args.size)
+        data = STDLIB_CODEC.dumps(body)
+        decoded = [
+            best_of(
+                lambda: codec.loads(data),  # pylint: disable=cell-var-from-loop
+                args.repeat,
+            )
+            for codec in codecs
+        ]
+        validated = best_of(
+            lambda: model(**body), args.repeat  # pylint: disable=cell-var-from-loop
+        )
+        trusted = best_of(
+            lambda: parse_trusted(model, body),  # pylint: disable=cell-var-from-loop
+            args.repeat,
+        )
+        print(
+            "%-25s" % model.__name__
+            + "".join("%10.1fms" % (seconds * 1000) for seconds in decoded)
+            + "%10.1fms%10.1fms%7.1fx"
+            % (validated * 1000, trusted * 1000, validated / trusted)
+        )
+
+
+if __name__ == "__main__":
+    main()
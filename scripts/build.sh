@@ -73,7 +73,10 @@ mypy .
 
 echo
 echo "===Lint with pylint==="
-pylint $LINT_PATHS
+# Similar lines are reported for the last module linted, so the asyncio
+# client is linted on its own for its duplicate-code pragma to apply.
+pylint --ignore=aio.py $LINT_PATHS
+pylint ./withings_api/aio.py
 
 
 echo
@@ -1,11 +1,88 @@
 """Common test code."""
 from datetime import tzinfo
-from typing import cast
+from typing import Any, Dict, List, cast
 
 from dateutil import tz
 from typing_extensions import Final
+from withings_api.common import (
+    Credentials2,
+    MeasureGetMeasGroupAttrib,
+    MeasureGetMeasGroupCategory,
+    MeasureGetMeasResponse,
+    MeasureType,
+)
 
 TIMEZONE_STR0: Final = "Europe/London"
 TIMEZONE_STR1: Final = "America/Los_Angeles"
 TIMEZONE0: Final = cast(tzinfo, tz.gettz(TIMEZONE_STR0))
 TIMEZONE1: Final = cast(tzinfo, tz.gettz(TIMEZONE_STR1))
+
+USERID: Final = 12345
+
+ACTIVITY: Final[Dict[str, Any]] = {
+    "date": "2019-01-01",
+    "timezone": TIMEZONE_STR0,
+    "is_tracker": True,
+    "brand": 100,
+    "totalcalories": 109.1,
+}
+
+
+def new_credentials(expires_in: int = 10000) -> Credentials2:
+    """Create credentials."""
+    return Credentials2(
+        access_token="my_access_token",
+        expires_in=expires_in,
+        token_type="Bearer",
+        refresh_token="my_refresh_token",
+        userid=USERID,
+        client_id="my_client_id",
+        consumer_secret="my_consumer_secret",
+    )
+
+
+def meas_group(
+    grpid: int,
+    date: int,
+    measures: Dict[MeasureType, int],
+    attrib: MeasureGetMeasGroupAttrib = MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER,
+    category: MeasureGetMeasGroupCategory = MeasureGetMeasGroupCategory.REAL,
+) -> Dict[str, Any]:
+    """Create a raw measure group."""
+    return {
+        "attrib": attrib,
+        "category": category,
+        "created": date,
+        "date": date,
+        "deviceid": "dev1",
+        "grpid": grpid,
+        "measures": [
+            {"type": meastype, "unit": -1, "value": value}
+            for meastype, value in measures.items()
+        ],
+    }
+
+
+GROUPS: Final[List[Dict[str, Any]]] = [
+    meas_group(1, 100, {MeasureType.WEIGHT: 700, MeasureType.FAT_RATIO: 200}),
+    meas_group(2, 300, {MeasureType.WEIGHT: 710}),
+    meas_group(
+        3,
+        200,
+        {MeasureType.WEIGHT: 720, MeasureType.HEART_RATE: 600},
+        attrib=MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+    ),
+    meas_group(
+        4,
+        400,
+        {MeasureType.HEIGHT: 18},
+        category=MeasureGetMeasGroupCategory.USER_OBJECTIVES,
+    ),
+]
+
+
+def new_response(groups: List[Dict[str, Any]]) -> MeasureGetMeasResponse:
+    """Create a response of raw groups."""
+    return MeasureGetMeasResponse(
+        measuregrps=groups, more=False, offset=0, timezone=TIMEZONE_STR0, updatetime=1,
+    )
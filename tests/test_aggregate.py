@@ -0,0 +1,195 @@
+"""Tests for the aggregation of measures."""
+from functools import partial
+import math
+import sys
+from typing import Any
+
+import arrow
+import pytest
+from typing_extensions import Final
+from withings_api.aggregate import AggregatePeriod, MeasureAggregate, aggregate_measures
+from withings_api.common import (
+    MeasureGetMeasGroup,
+    MeasureGetMeasGroupAttrib,
+    MeasureType,
+    parse_trusted,
+)
+
+from .common import TIMEZONE1, TIMEZONE_STR1, meas_group, new_response
+
+# 2020-01-05T23:00 in America/Los_Angeles, the sunday before.
+DATE0: Final = arrow.get("2020-01-06T07:00:00Z").int_timestamp
+# Monday 2020-01-06.
+DATE1: Final = arrow.get("2020-01-06T08:00:00Z").int_timestamp
+DATE2: Final = arrow.get("2020-01-06T20:00:00Z").int_timestamp
+# Wednesday 2020-01-08.
+DATE3: Final = arrow.get("2020-01-08T09:00:00Z").int_timestamp
+# Saturday 2020-02-01.
+DATE4: Final = arrow.get("2020-02-01T10:00:00Z").int_timestamp
+
+AGGREGATE_GROUPS: Final = [
+    meas_group(3, DATE2, {MeasureType.WEIGHT: 720, MeasureType.FAT_RATIO: 200}),
+    meas_group(1, DATE0, {MeasureType.WEIGHT: 690}),
+    meas_group(4, DATE3, {MeasureType.WEIGHT: 710}),
+    meas_group(2, DATE1, {MeasureType.WEIGHT: 700}),
+    meas_group(
+        5,
+        DATE4,
+        {MeasureType.WEIGHT: 800},
+        attrib=MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+    ),
+]
+
+
+def test_aggregate_measures() -> None:
+    """Test function."""
+    response: Final = new_response(AGGREGATE_GROUPS)
+    daily: Final = aggregate_measures(response)
+    assert set(daily) == {MeasureType.WEIGHT, MeasureType.FAT_RATIO}
+    assert daily[MeasureType.WEIGHT] == (
+        MeasureAggregate(
+            start=arrow.get("2020-01-06"),
+            end=arrow.get("2020-01-07"),
+            size=3,
+            mean=(69.0 + 70.0 + 72.0) / 3,
+            min=69.0,
+            max=72.0,
+            last=72.0,
+        ),
+        MeasureAggregate(
+            arrow.get("2020-01-08"), arrow.get("2020-01-09"), 1, 71.0, 71.0, 71.0, 71.0
+        ),
+        MeasureAggregate(
+            arrow.get("2020-02-01"), arrow.get("2020-02-02"), 1, 80.0, 80.0, 80.0, 80.0
+        ),
+    )
+    assert daily[MeasureType.FAT_RATIO] == (
+        MeasureAggregate(
+            arrow.get("2020-01-06"), arrow.get("2020-01-07"), 1, 20.0, 20.0, 20.0, 20.0
+        ),
+    )
+
+    weekly: Final = aggregate_measures(
+        response,
+        period=AggregatePeriod.WEEK,
+        with_measure_types=(MeasureType.WEIGHT,),
+        with_group_attrib=MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER,
+    )
+    assert weekly == {
+        MeasureType.WEIGHT: (
+            MeasureAggregate(
+                arrow.get("2020-01-06"),
+                arrow.get("2020-01-13"),
+                4,
+                70.5,
+                69.0,
+                72.0,
+                71.0,
+            ),
+        )
+    }
+
+    monthly: Final = aggregate_measures(response, period=AggregatePeriod.MONTH)
+    assert [
+        (rollup.start, rollup.end, rollup.size, rollup.last)
+        for rollup in monthly[MeasureType.WEIGHT]
+    ] == [
+        (arrow.get("2020-01-01"), arrow.get("2020-02-01"), 4, 71.0),
+        (arrow.get("2020-02-01"), arrow.get("2020-03-01"), 1, 80.0),
+    ]
+
+    assert aggregate_measures(response, with_measure_types=()) == {}
+    assert aggregate_measures() == {}
+
+
+def test_aggregate_measures_timezone() -> None:
+    """Test function."""
+    response: Final = new_response(AGGREGATE_GROUPS).copy(
+        update={"timezone": TIMEZONE1}
+    )
+    daily: Final = aggregate_measures(response)[MeasureType.WEIGHT]
+    assert [(rollup.start, rollup.size, rollup.last) for rollup in daily] == [
+        (arrow.get("2020-01-05", tzinfo=TIMEZONE1), 1, 69.0),
+        (arrow.get("2020-01-06", tzinfo=TIMEZONE1), 2, 72.0),
+        (arrow.get("2020-01-08", tzinfo=TIMEZONE1), 1, 71.0),
+        (arrow.get("2020-02-01", tzinfo=TIMEZONE1), 1, 80.0),
+    ]
+    assert daily[0].start.tzinfo is TIMEZONE1
+
+    weekly: Final = aggregate_measures(response, period=AggregatePeriod.WEEK)
+    assert [rollup.start for rollup in weekly[MeasureType.WEIGHT]] == [
+        arrow.get("2019-12-30", tzinfo=TIMEZONE1),
+        arrow.get("2020-01-06", tzinfo=TIMEZONE1),
+        arrow.get("2020-01-27", tzinfo=TIMEZONE1),
+    ]
+
+    groups: Final = [MeasureGetMeasGroup(**group) for group in AGGREGATE_GROUPS]
+    assert aggregate_measures(groups, timezone=TIMEZONE_STR1) == aggregate_measures(
+        response
+    )
+    assert aggregate_measures(groups[1], timezone=TIMEZONE1) == {
+        MeasureType.WEIGHT: (daily[0],)
+    }
+    with pytest.raises(ValueError):
+        aggregate_measures(groups, timezone="Nowhere/Special")
+
+
+def test_aggregate_measures_sources() -> None:
+    """Test function."""
+    combined: Final = aggregate_measures(new_response(AGGREGATE_GROUPS))
+    records: Final = parse_trusted(
+        type(new_response([])), new_response(AGGREGATE_GROUPS[2:]).dict(), records=True,
+    )
+    merged: Final = aggregate_measures(
+        new_response(AGGREGATE_GROUPS[:2]), records.measuregrps
+    )
+    assert merged == combined
+
+    # The last value is taken from the newest measure, whatever the source.
+    reversed_merged: Final = aggregate_measures(
+        records, new_response(AGGREGATE_GROUPS[:2])
+    )
+    assert reversed_merged == combined
+
+
+def test_aggregate_measures_numpy(monkeypatch: Any) -> None:
+    """Test function."""
+    pytest.importorskip("numpy")
+    groups: Final = AGGREGATE_GROUPS + [
+        meas_group(
+            grpid,
+            DATE0 + grpid * 40000,
+            {MeasureType.WEIGHT: 650 + grpid % 9, MeasureType.HEART_RATE: 60 + grpid},
+        )
+        for grpid in range(10, 70, 3)
+    ]
+    sources: Final = (
+        new_response(groups).copy(update={"timezone": TIMEZONE1}),
+        new_response(groups[:3]),
+    )
+    calls: Final = [
+        partial(aggregate_measures, *sources, period=period)
+        for period in AggregatePeriod
+    ] + [
+        partial(aggregate_measures, *sources, with_measure_types=(MeasureType.WEIGHT,)),
+        partial(
+            aggregate_measures,
+            *sources,
+            with_group_attrib=MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+        ),
+    ]
+    vectorized: Final = [call() for call in calls]
+
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    for call, expected in zip(calls, vectorized):
+        result = call()
+        assert result.keys() == expected.keys()
+        for meastype, rollups in result.items():
+            # numpy adds the values up in another order.
+            assert [rollup._replace(mean=0.0) for rollup in rollups] == [
+                rollup._replace(mean=0.0) for rollup in expected[meastype]
+            ]
+            assert all(
+                math.isclose(rollup.mean, other.mean)
+                for rollup, other in zip(rollups, expected[meastype])
+            )
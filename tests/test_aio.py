@@ -0,0 +1,506 @@
+"""Tests for the asyncio API."""
+import asyncio
+import json
+import sys
+from typing import Any, Coroutine, Dict, List, Optional, Tuple
+from unittest.mock import MagicMock
+
+import arrow
+import pytest
+from typing_extensions import Final
+from withings_api.aio import AsyncWithingsApi, create_client_session
+from withings_api.cache import MemoryResponseCache
+from withings_api.common import (
+    ActivityRecord,
+    AuthFailedException,
+    GetActivityField,
+    GetSleepField,
+    GetSleepSummaryField,
+    HeartWearPosition,
+    MeasureGroupRecord,
+    MeasureType,
+    NotifyAppli,
+    SleepModel,
+    TooManyRequestsException,
+)
+from withings_api.ratelimit import RateLimiter
+from withings_api.retry import RetryPolicy
+
+from .common import ACTIVITY, TIMEZONE_STR0, USERID, new_credentials
+
+
+class FakeResponse:
+    """Fake aiohttp response."""
+
+    def __init__(self, body: Any):
+        """Initialize."""
+        self._body = body
+
+    async def __aenter__(self) -> "FakeResponse":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        """Read the body."""
+        await asyncio.sleep(0)
+        return json.dumps(self._body).encode()
+
+
+class FakeSession:
+    """Fake aiohttp session routing on path and action."""
+
+    def __init__(self, routes: Dict[Tuple[str, str], Any]):
+        """Initialize."""
+        self.routes = routes
+        self.calls: List[Dict[str, Any]] = []
+        self.closed = False
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> FakeResponse:
+        """Record the call and return the routed response."""
+        self.calls.append(dict(method=method, url=url, params=params, data=data))
+        args: Final = params or data or {}
+        body = self.routes[(url, args["action"])]
+        if callable(body):
+            body = body(args)
+        return FakeResponse(body)
+
+    async def close(self) -> None:
+        """Close the session."""
+        self.closed = True
+
+
+def run(awaitable: Coroutine) -> Any:
+    """Run a coroutine to completion."""
+    return asyncio.run(awaitable)
+
+
+def success(body: Any) -> dict:
+    """Wrap a body in a successful response."""
+    return {"status": 0, "body": body}
+
+
+def api_url(path: str) -> str:
+    """Get the full url for a path."""
+    return "https://wbsapi.withings.net/%s" % path
+
+
+def paged(key: str, pages: list) -> Any:
+    """Create a route serving pages by offset."""
+
+    def route(params: Dict[str, Any]) -> dict:
+        index: Final = int(params.get("offset", 0))
+        return success(
+            {key: pages[index], "more": index + 1 < len(pages), "offset": index + 1}
+        )
+
+    return route
+
+
+def test_measure_get_meas() -> None:
+    """Test function."""
+    group: Final = {
+        "attrib": 2,
+        "category": 1,
+        "created": 1111111111,
+        "date": 1111111111,
+        "deviceid": "dev1",
+        "grpid": 1,
+        "measures": [{"type": MeasureType.WEIGHT, "unit": -1, "value": 700}],
+    }
+    session: Final = FakeSession(
+        {
+            (api_url("measure"), "getmeas"): success(
+                {
+                    "measuregrps": [group],
+                    "more": False,
+                    "offset": 0,
+                    "timezone": TIMEZONE_STR0,
+                    "updatetime": 1409596058,
+                }
+            )
+        }
+    )
+    api: Final = AsyncWithingsApi(new_credentials(), session=session)
+
+    response: Final = run(
+        api.measure_get_meas(meastype=MeasureType.WEIGHT, startdate=1, enddate=2)
+    )
+
+    assert response.measuregrps[0].measures[0].value == 700
+    assert session.calls[0]["method"] == "GET"
+    assert session.calls[0]["params"]["access_token"] == "my_access_token"
+    assert session.calls[0]["params"]["meastype"] == 1
+    assert session.calls[0]["params"]["startdate"] == 1
+
+    trusted_api: Final = AsyncWithingsApi(
+        new_credentials(), session=session, trusted_parsing=True
+    )
+    assert run(trusted_api.measure_get_meas()) == response
+
+    lazy_api: Final = AsyncWithingsApi(
+        new_credentials(), session=session, lazy_parsing=True
+    )
+    assert run(lazy_api.measure_get_meas()) == response
+
+
+def test_iter_endpoints() -> None:
+    """Test function."""
+    group: Final[Dict[str, Any]] = {
+        "attrib": 2,
+        "category": 1,
+        "created": 1,
+        "date": 1,
+        "deviceid": None,
+        "grpid": 1,
+        "measures": [],
+    }
+    summary: Final = {
+        "timezone": TIMEZONE_STR0,
+        "model": SleepModel.TRACKER,
+        "startdate": 1,
+        "enddate": 1,
+        "date": 1,
+        "modified": 1,
+        "data": {},
+    }
+    heart: Final = {
+        "model": 44,
+        "ecg": {"signalid": 1, "afib": 0},
+        "heart_rate": 77,
+        "timestamp": 1594921551,
+    }
+
+    def with_meta(route: Any) -> Any:
+        def wrapped(params: Dict[str, Any]) -> dict:
+            response: Dict[str, Any] = route(params)
+            response["body"].update(timezone=TIMEZONE_STR0, updatetime=1)
+            return response
+
+        return wrapped
+
+    session: Final = FakeSession(
+        {
+            (api_url("measure"), "getmeas"): with_meta(
+                paged("measuregrps", [[group], [group, group]])
+            ),
+            (api_url("v2/measure"), "getactivity"): paged(
+                "activities", [[ACTIVITY], [ACTIVITY]]
+            ),
+            (api_url("v2/sleep"), "getsummary"): paged(
+                "series", [[summary], [summary]]
+            ),
+            (api_url("v2/heart"), "list"): paged("series", [[heart], [], [heart]]),
+        }
+    )
+    api: Final = AsyncWithingsApi(new_credentials(), session=session)
+
+    async def collect() -> Tuple[list, list, list, list]:
+        return (
+            [item async for item in api.iter_measure_get_meas()],
+            [item async for item in api.iter_measure_get_activity()],
+            [
+                item
+                async for item in api.iter_sleep_get_summary(
+                    data_fields=GetSleepSummaryField
+                )
+            ],
+            [item async for item in api.iter_heart_list()],
+        )
+
+    groups, activities, summaries, hearts = run(collect())
+    assert len(groups) == 3
+    assert len(activities) == 2
+    assert len(summaries) == 2
+    assert len(hearts) == 2
+    assert len(session.calls) == 9
+    assert session.calls[-1]["params"]["offset"] == 2
+
+    records_api: Final = AsyncWithingsApi(
+        new_credentials(), session=session, records=True
+    )
+
+    async def collect_records() -> Tuple[list, list]:
+        return (
+            [item async for item in records_api.iter_measure_get_meas()],
+            [item async for item in records_api.iter_measure_get_activity()],
+        )
+
+    groups, activities = run(collect_records())
+    assert len(groups) == 3
+    assert all(isinstance(group, MeasureGroupRecord) for group in groups)
+    assert all(isinstance(activity, ActivityRecord) for activity in activities)
+
+
+def test_other_endpoints() -> None:
+    """Test function."""
+    session: Final = FakeSession(
+        {
+            (api_url("v2/user"), "getdevice"): success({"devices": []}),
+            (api_url("v2/measure"), "getactivity"): success(
+                {"activities": [], "more": False, "offset": 0}
+            ),
+            (api_url("v2/sleep"), "get"): success({"model": 16, "series": []}),
+            (api_url("v2/sleep"), "getsummary"): success(
+                {"series": [], "more": False, "offset": 0}
+            ),
+            (api_url("v2/heart"), "get"): success(
+                {"signal": [1, 2], "sampling_frequency": 500, "wearposition": 1}
+            ),
+            (api_url("v2/heart"), "list"): success(
+                {"series": [], "more": False, "offset": 0}
+            ),
+            (api_url("notify"), "get"): success(
+                {"appli": 1, "callbackurl": "http://cb"}
+            ),
+            (api_url("notify"), "list"): success({"profiles": []}),
+            (api_url("notify"), "revoke"): success({}),
+            (api_url("notify"), "subscribe"): success({}),
+            (api_url("notify"), "update"): success({}),
+        }
+    )
+    api: Final = AsyncWithingsApi(new_credentials(), session=session)
+
+    async def call_all() -> None:
+        assert (await api.user_get_device()).devices == ()
+        assert (
+            await api.measure_get_activity(data_fields=(GetActivityField.STEPS,))
+        ).activities == ()
+        assert (
+            await api.sleep_get(data_fields=(GetSleepField.HR,))
+        ).model == SleepModel.TRACKER
+        assert (
+            await api.sleep_get_summary(data_fields=GetSleepSummaryField)
+        ).series == ()
+        assert (
+            await api.heart_get(signalid=1)
+        ).wearposition == HeartWearPosition.LEFT_WRIST
+        assert (await api.heart_list()).series == ()
+        assert (
+            await api.notify_get(callbackurl="http://cb")
+        ).appli == NotifyAppli.WEIGHT
+        assert (await api.notify_list()).profiles == ()
+        await api.notify_revoke(callbackurl="http://cb")
+        await api.notify_subscribe(callbackurl="http://cb", appli=NotifyAppli.SLEEP)
+        await api.notify_update(
+            callbackurl="http://cb",
+            appli=NotifyAppli.SLEEP,
+            new_callbackurl="http://cb2",
+        )
+
+    run(call_all())
+    assert session.calls[-1]["params"]["new_callbackurl"] == "http://cb2"
+    assert session.calls[-2]["params"]["appli"] == NotifyAppli.SLEEP.value
+
+
+def test_status_error() -> None:
+    """Test function."""
+    session: Final = FakeSession({(api_url("notify"), "list"): {"status": 100}})
+    api: Final = AsyncWithingsApi(new_credentials(), session=session)
+
+    with pytest.raises(AuthFailedException):
+        run(api.notify_list())
+
+
+def test_rate_limiter() -> None:
+    """Test function."""
+    session: Final = FakeSession(
+        {
+            (api_url("notify"), "list"): success({"profiles": []}),
+            (api_url("notify"), "get"): {"status": 601},
+        }
+    )
+    limiter: Final = RateLimiter(rate=1000, burst=1, clock=lambda: 0)
+    api: Final = AsyncWithingsApi(
+        new_credentials(), session=session, rate_limiter=limiter
+    )
+
+    run(api.notify_list())
+    run(api.notify_list())
+    assert limiter.client_bucket.rate == 1000
+    assert limiter.client_bucket.reserve() == 0.002
+
+    with pytest.raises(TooManyRequestsException):
+        run(api.notify_get(callbackurl="http://cb"))
+    assert limiter.client_bucket.rate == 500
+
+
+def test_retry_policy() -> None:
+    """Test function."""
+    statuses: Final = [522, 0]
+    session: Final = FakeSession(
+        {
+            (api_url("notify"), "list"): lambda params: success({"profiles": []})
+            if not statuses.pop(0)
+            else {"status": 522}
+        }
+    )
+    api: Final = AsyncWithingsApi(
+        new_credentials(),
+        session=session,
+        retry_policy=RetryPolicy(backoff_base=0.001),
+    )
+
+    assert run(api.notify_list()).profiles == ()
+    assert len(session.calls) == 2
+
+
+def test_retry_policy_connection_error() -> None:
+    """Test function."""
+    aiohttp: Final = pytest.importorskip("aiohttp")
+    failures: Final = [aiohttp.ServerDisconnectedError()]
+
+    def route(_params: Dict[str, Any]) -> dict:
+        if failures:
+            raise failures.pop(0)
+        return success({"profiles": []})
+
+    session: Final = FakeSession({(api_url("notify"), "list"): route})
+    api: Final = AsyncWithingsApi(
+        new_credentials(),
+        session=session,
+        retry_policy=RetryPolicy(backoff_base=0.001),
+    )
+
+    assert run(api.notify_list()).profiles == ()
+    assert len(session.calls) == 2
+    assert RetryPolicy().is_retryable(
+        aiohttp.ClientConnectorError(MagicMock(), OSError())
+    )
+
+
+def test_response_cache() -> None:
+    """Test function."""
+    session: Final = FakeSession(
+        {
+            (api_url("notify"), "list"): success({"profiles": []}),
+            (api_url("notify"), "subscribe"): success({}),
+            (api_url("notify"), "update"): success({}),
+            (api_url("notify"), "revoke"): success({}),
+        }
+    )
+    api: Final = AsyncWithingsApi(
+        new_credentials(), session=session, response_cache=MemoryResponseCache()
+    )
+
+    async def list_twice() -> None:
+        await api.notify_list()
+        await api.notify_list()
+
+    run(list_twice())
+    assert len(session.calls) == 1
+
+    run(api.notify_subscribe(callbackurl="http://cb"))
+    run(list_twice())
+    assert len(session.calls) == 3
+
+    run(api.notify_update("http://cb", NotifyAppli.WEIGHT, "http://cb2"))
+    run(api.notify_revoke(callbackurl="http://cb2"))
+    run(api.notify_list())
+    assert len(session.calls) == 6
+
+    AsyncWithingsApi(new_credentials(), session=session).invalidate_response_cache()
+
+
+def test_refresh_token() -> None:
+    """Test function."""
+    refresh_cb: Final = MagicMock()
+    session: Final = FakeSession(
+        {
+            (api_url("v2/oauth2"), "requesttoken"): success(
+                {
+                    "access_token": "my_access_token_refreshed",
+                    "expires_in": 10000,
+                    "token_type": "Bearer",
+                    "refresh_token": "my_refresh_token_refreshed",
+                    "userid": USERID,
+                }
+            ),
+            (api_url("notify"), "list"): success({"profiles": []}),
+        }
+    )
+    api: Final = AsyncWithingsApi(
+        new_credentials(expires_in=-1), refresh_cb=refresh_cb, session=session
+    )
+
+    async def call_concurrently() -> None:
+        await asyncio.gather(api.notify_list(), api.notify_list(), api.notify_list())
+
+    run(call_concurrently())
+
+    refresh_calls: Final = [
+        call for call in session.calls if call["url"] == api_url("v2/oauth2")
+    ]
+    assert len(refresh_calls) == 1
+    assert refresh_calls[0]["method"] == "POST"
+    assert refresh_calls[0]["data"]["refresh_token"] == "my_refresh_token"
+    assert refresh_calls[0]["data"]["grant_type"] == "refresh_token"
+    assert session.calls[-1]["params"]["access_token"] == "my_access_token_refreshed"
+
+    creds: Final = api.get_credentials()
+    refresh_cb.assert_called_once_with(creds)
+    assert creds.refresh_token == "my_refresh_token_refreshed"
+    assert creds.token_expiry > arrow.utcnow().int_timestamp
+
+
+def test_session_ownership() -> None:
+    """Test function."""
+    shared: Final = FakeSession({})
+
+    async def use_shared() -> None:
+        async with AsyncWithingsApi(new_credentials(), session=shared):
+            pass
+
+    run(use_shared())
+    assert not shared.closed
+
+    owned: Final = FakeSession({})
+    api: Final = AsyncWithingsApi(new_credentials())
+    # pylint: disable=protected-access
+    api._session = owned
+
+    async def use_owned() -> None:
+        async with api:
+            pass
+
+    run(use_owned())
+    assert owned.closed
+    run(api.close())
+
+
+def test_create_client_session_requires_aiohttp(monkeypatch: Any) -> None:
+    """Test function."""
+    monkeypatch.setitem(sys.modules, "aiohttp", None)
+
+    with pytest.raises(ImportError, match="aiohttp"):
+        create_client_session()
+
+    with pytest.raises(ImportError, match="aiohttp"):
+        run(AsyncWithingsApi(new_credentials()).notify_list())
+
+
+def test_create_client_session() -> None:
+    """Test function."""
+    pytest.importorskip("aiohttp")
+
+    async def use_session() -> None:
+        session = create_client_session(limit=5)
+        assert session.connector.limit == 5
+        await session.close()
+
+        api = AsyncWithingsApi(new_credentials())
+        async with api:
+            # pylint: disable=protected-access
+            session = api._get_session()
+            assert session.connector.limit == 100
+            assert api._get_session() is session
+        assert session.closed
+
+    run(use_session())
@@ -0,0 +1,180 @@
+"""Tests for response caching."""
+from typing import List
+
+import arrow
+import pytest
+from typing_extensions import Final
+from withings_api.cache import (
+    CachePolicy,
+    MemoryResponseCache,
+    SqliteResponseCache,
+    make_cache_key,
+)
+
+_NOW: Final = arrow.get("2020-06-01T00:00:00+00:00").int_timestamp
+_DAY: Final = 24 * 60 * 60
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Initialize new object."""
+        self.now = float(_NOW)
+
+    def __call__(self) -> float:
+        """Get the time."""
+        return self.now
+
+
+def test_make_cache_key() -> None:
+    """Test function."""
+    assert make_cache_key(1, "/measure", {"a": 1, "b": "2"}) == make_cache_key(
+        "1", "measure", {"b": 2, "a": "1"}
+    )
+    assert make_cache_key(1, "measure", {"a": 1}) != make_cache_key(
+        2, "measure", {"a": 1}
+    )
+
+
+def test_cache_policy() -> None:
+    """Test function."""
+    policy: Final = CachePolicy(ttls={("v2/user", "getdevice"): 60})
+    assert policy.get_ttl("/v2/user/", {"action": "getdevice"}, _NOW) == 60
+    assert policy.get_ttl("measure", {"action": "getmeas"}, _NOW) is None
+
+    closed: Final = {"action": "getmeas", "enddate": _NOW - 2 * _DAY}
+    assert policy.get_ttl("measure", closed, _NOW) == 30 * _DAY
+    assert policy.get_ttl("measure", {**closed, "lastupdate": 0}, _NOW) == 30 * _DAY
+    assert (
+        policy.get_ttl("measure", {"action": "getmeas", "lastupdate": 0}, _NOW) is None
+    )
+    assert (
+        policy.get_ttl("measure", {"action": "getmeas", "enddate": _NOW - 60}, _NOW)
+        is None
+    )
+
+    assert policy.get_ttl("v2/sleep", {"enddateymd": "2020-05-29"}, _NOW) == 30 * _DAY
+    assert policy.get_ttl("v2/sleep", {"enddateymd": "2020-05-31"}, _NOW) is None
+
+    assert CachePolicy(historical_ttl=None).get_ttl("measure", closed, _NOW) is None
+
+
+@pytest.fixture(name="cache")
+def cache_instance() -> SqliteResponseCache:
+    """Test function."""
+    return SqliteResponseCache(
+        ":memory:",
+        max_entries=2,
+        policy=CachePolicy(ttls={("notify", "list"): 60, ("notify", "get"): 60}),
+        clock=FakeClock(),
+    )
+
+
+def test_sqlite_response_cache(cache: SqliteResponseCache) -> None:
+    """Test function."""
+    clock: Final = cache._clock  # pylint: disable=protected-access
+    user: Final = cache.for_user(1)
+    assert user.get("notify", {"action": "list"}) is None
+
+    user.set("notify", {"action": "list"}, {"profiles": []})
+    user.set("notify", {"action": "revoke"}, {})
+    assert user.get("notify", {"action": "list"}) == {"profiles": []}
+    assert cache.for_user(2).get("notify", {"action": "list"}) is None
+    assert len(cache) == 1
+
+    clock.now += 61  # type: ignore
+    assert user.get("notify", {"action": "list"}) is None
+    assert len(cache) == 0
+
+    cache.close()
+
+
+def test_sqlite_response_cache_lru(cache: SqliteResponseCache) -> None:
+    """Test function."""
+    clock: Final = cache._clock  # pylint: disable=protected-access
+    user: Final = cache.for_user(1)
+    keys: Final[List[str]] = ["a", "b", "c"]
+    for key in keys:
+        clock.now += 1  # type: ignore
+        user.set("notify", {"action": "get", "callbackurl": key}, {"key": key})
+        if key == "b":
+            clock.now += 1  # type: ignore
+            assert user.get("notify", {"action": "get", "callbackurl": "a"})
+
+    assert len(cache) == 2
+    assert user.get("notify", {"action": "get", "callbackurl": "a"}) == {"key": "a"}
+    assert user.get("notify", {"action": "get", "callbackurl": "b"}) is None
+    assert user.get("notify", {"action": "get", "callbackurl": "c"}) == {"key": "c"}
+
+
+def test_sqlite_response_cache_invalidate(cache: SqliteResponseCache) -> None:
+    """Test function."""
+    cache.for_user(1).set("notify", {"action": "list"}, {"profiles": []})
+    cache.for_user(2).set("notify", {"action": "list"}, {"profiles": []})
+
+    cache.for_user(1).invalidate("measure")
+    assert len(cache) == 2
+    cache.for_user(1).invalidate("/notify")
+    assert len(cache) == 1
+    cache.for_user(2).invalidate()
+    assert len(cache) == 0
+
+
+def test_sqlite_response_cache_persists(tmp_path) -> None:  # type: ignore
+    """Test function."""
+    path: Final = str(tmp_path / "responses.db")
+    policy: Final = CachePolicy(ttls={("notify", "list"): 60})
+    cache = SqliteResponseCache(path, policy=policy)
+    cache.for_user(1).set("notify", {"action": "list"}, {"profiles": []})
+    cache.close()
+
+    cache = SqliteResponseCache(path, policy=policy)
+    assert cache.for_user(1).get("notify", {"action": "list"}) == {"profiles": []}
+    cache.close()
+
+
+def test_memory_response_cache() -> None:
+    """Test function."""
+    clock: Final = FakeClock()
+    cache: Final = MemoryResponseCache(max_entries=2, clock=clock)
+    user: Final = cache.for_user(1)
+
+    user.set("v2/user", {"action": "getdevice"}, {"devices": []})
+    user.set("measure", {"action": "getmeas", "enddate": 0}, {"measuregrps": []})
+    assert len(cache) == 1
+    assert user.get("/v2/user", {"action": "getdevice"}) == {"devices": []}
+    assert cache.for_user(2).get("v2/user", {"action": "getdevice"}) is None
+
+    clock.now += 60 * 60
+    assert user.get("v2/user", {"action": "getdevice"}) is None
+    assert len(cache) == 0
+
+
+def test_memory_response_cache_lru() -> None:
+    """Test function."""
+    cache: Final = MemoryResponseCache(max_entries=2, clock=FakeClock())
+    user: Final = cache.for_user(1)
+    for callbackurl in ("a", "b"):
+        user.set("notify", {"action": "get", "callbackurl": callbackurl}, {})
+    assert user.get("notify", {"action": "get", "callbackurl": "a"}) == {}
+    user.set("notify", {"action": "list"}, {"profiles": []})
+
+    assert len(cache) == 2
+    assert user.get("notify", {"action": "get", "callbackurl": "b"}) is None
+    assert user.get("notify", {"action": "get", "callbackurl": "a"}) == {}
+
+
+def test_memory_response_cache_invalidate() -> None:
+    """Test function."""
+    cache: Final = MemoryResponseCache()
+    cache.for_user(1).set("notify", {"action": "list"}, {"profiles": []})
+    cache.for_user(1).set("v2/user", {"action": "getdevice"}, {"devices": []})
+    cache.for_user(2).set("notify", {"action": "list"}, {"profiles": []})
+
+    cache.for_user(1).invalidate("notify")
+    assert len(cache) == 2
+    assert cache.for_user(1).get("v2/user", {"action": "getdevice"})
+    cache.for_user(1).invalidate()
+    assert len(cache) == 1
+    assert cache.for_user(2).get("notify", {"action": "list"})
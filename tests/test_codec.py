@@ -0,0 +1,50 @@
+"""Tests for JSON codecs."""
+from typing import Any, Iterator
+
+import pytest
+from typing_extensions import Final
+from withings_api import codec
+from withings_api.codec import CODECS, STDLIB_CODEC, JsonCodec
+
+_DOCUMENT: Final = {"status": 0, "body": {"series": [1, 2.5, None, True, "é"]}}
+
+
+@pytest.fixture(name="restore_codec")
+def restore_codec_fixture() -> Iterator[None]:
+    """Restore the codec after a test."""
+    current: Final = codec.get_codec()
+    yield
+    codec.set_codec(current)
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_codecs(name: str, restore_codec: Any) -> None:
+    """Test function."""
+    # pylint: disable=unused-argument
+    codec.set_codec(name)
+    assert codec.get_codec() is CODECS[name]
+
+    data: Final = codec.dumps(_DOCUMENT)
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == _DOCUMENT
+    assert codec.loads(data.decode("utf-8")) == _DOCUMENT
+    assert codec.loads(codec.dumps({1: "a"})) == {"1": "a"}
+
+
+def test_default_codec() -> None:
+    """Test function."""
+    assert codec.get_codec() is CODECS.get("orjson", STDLIB_CODEC)
+
+
+def test_custom_codec(restore_codec: Any) -> None:
+    """Test function."""
+    # pylint: disable=unused-argument
+    custom: Final = JsonCodec(
+        name="custom", loads=lambda data: "loaded", dumps=lambda value: b"dumped"
+    )
+    codec.set_codec(custom)
+    assert codec.loads("{}") == "loaded"
+    assert codec.dumps({}) == b"dumped"
+
+    with pytest.raises(KeyError):
+        codec.set_codec("unknown")
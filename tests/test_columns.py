@@ -0,0 +1,91 @@
+"""Tests for the columnar export of measure groups."""
+import sys
+from typing import Any
+
+import pytest
+from typing_extensions import Final
+from withings_api.columns import COLUMNS, MeasureColumns
+from withings_api.common import (
+    MeasureGetMeasGroupAttrib,
+    MeasureGetMeasGroupCategory,
+    MeasureType,
+    parse_trusted,
+)
+
+from .common import GROUPS, new_response
+
+
+def test_measure_columns() -> None:
+    """Test function."""
+    response: Final = new_response(GROUPS)
+    columns: Final = MeasureColumns(response)
+    assert len(columns) == 6
+    assert columns.dates.tolist() == [100, 100, 300, 200, 200, 400]
+    assert columns.grpids.tolist() == [1, 1, 2, 3, 3, 4]
+    assert columns.types.tolist() == [
+        MeasureType.WEIGHT,
+        MeasureType.FAT_RATIO,
+        MeasureType.WEIGHT,
+        MeasureType.WEIGHT,
+        MeasureType.HEART_RATE,
+        MeasureType.HEIGHT,
+    ]
+    assert columns.attribs.tolist()[3] == MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY
+    assert columns.categories.tolist()[5] == MeasureGetMeasGroupCategory.USER_OBJECTIVES
+    assert columns.deviceids == ["dev1"] * 6
+    assert columns.values.tolist() == [700, 200, 710, 720, 600, 18]
+    assert columns.units.tolist() == [-1] * 6
+    assert columns.scaled_values.tolist() == [
+        float(measure.value * pow(10, measure.unit))
+        for group in response.measuregrps
+        for measure in group.measures
+    ]
+
+    records: Final = parse_trusted(
+        type(response), response.dict(), records=True
+    ).measuregrps
+    streamed: Final = MeasureColumns()
+    streamed.add(records[0])
+    streamed.add(iter(records[1:]))
+    for name in ("dates", "grpids", "types", "values", "units", "scaled_values"):
+        assert getattr(streamed, name) == getattr(columns, name)
+
+
+def test_measure_columns_to_numpy() -> None:
+    """Test function."""
+    numpy: Final = pytest.importorskip("numpy")
+    result: Final = MeasureColumns(new_response(GROUPS)).to_numpy()
+    assert result.dtype.names == COLUMNS
+    assert result.dtype["date"] == numpy.dtype("datetime64[s]")
+    assert result.dtype["grpid"] == numpy.int64
+    assert result.dtype["type"] == numpy.int32
+    assert result.dtype["deviceid"] == numpy.dtype(object)
+    assert result.dtype["value"] == numpy.float64
+    assert result["date"].astype(numpy.int64).tolist() == [100, 100, 300, 200, 200, 400]
+    assert result["type"][1] == MeasureType.FAT_RATIO
+    assert result["deviceid"].tolist() == ["dev1"] * 6
+    assert result["value"].tolist() == pytest.approx([70, 20, 71, 72, 60, 1.8])
+    assert len(MeasureColumns().to_numpy()) == 0
+
+
+def test_measure_columns_to_pandas() -> None:
+    """Test function."""
+    pandas: Final = pytest.importorskip("pandas")
+    frame: Final = MeasureColumns(new_response(GROUPS)).to_pandas()
+    assert tuple(frame.columns) == COLUMNS
+    assert isinstance(frame.index, pandas.RangeIndex)
+    assert frame.index.tolist() == list(range(6))
+    assert str(frame["date"].dt.tz) == "UTC"
+    assert frame["date"][2] == pandas.Timestamp(300, unit="s", tz="UTC")
+    assert frame["grpid"].tolist() == [1, 1, 2, 3, 3, 4]
+    assert frame["value"].tolist() == pytest.approx([70, 20, 71, 72, 60, 1.8])
+
+
+def test_measure_columns_without_numpy(monkeypatch: Any) -> None:
+    """Test function."""
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    monkeypatch.setitem(sys.modules, "pandas", None)
+    with pytest.raises(ImportError):
+        MeasureColumns().to_numpy()
+    with pytest.raises(ImportError):
+        MeasureColumns().to_pandas()
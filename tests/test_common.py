@@ -1,25 +1,49 @@
 """Tests for common code."""
-from typing import Any, Dict
+import json
+import math
+import pickle
+import sys
+from typing import Any, Dict, Iterator, Tuple, cast
 
 import arrow
+from pydantic import ValidationError
 import pytest
 from typing_extensions import Final
 from withings_api.common import (
     ArrowType,
     AuthFailedException,
     BadStateException,
+    ConfiguredBaseModel,
     Credentials,
     Credentials2,
     ErrorOccurredException,
+    GetSleepSummarySerie,
+    HeartGetResponse,
+    HeartSignal,
+    HeartWearPosition,
     InvalidParamsException,
+    LazySequence,
     MeasureGetMeasGroup,
     MeasureGetMeasGroupAttrib,
     MeasureGetMeasGroupCategory,
     MeasureGetMeasMeasure,
     MeasureGetMeasResponse,
     MeasureGroupAttribs,
+    MeasureGroupRecord,
+    MeasureRecord,
     MeasureType,
     MeasureTypes,
+    MeasureValue,
+    NotifyAppli,
+    NotifyListProfile,
+    NotifyListResponse,
+    SleepGetResponse,
+    SleepGetSerie,
+    SleepGetTimestampValue,
+    SleepGetTimestampValueRecords,
+    SleepGetTimestampValues,
+    SleepState,
+    SleepTimestampValueRecord,
     TimeoutException,
     TimeZone,
     TooManyRequestsException,
@@ -27,9 +51,18 @@ from withings_api.common import (
     UnexpectedTypeException,
     UnknownStatusException,
     get_measure_value,
+    get_measure_values,
+    get_timezone,
+    get_unknown_enum_values,
     maybe_upgrade_credentials,
+    parse_lazy,
+    parse_trusted,
     query_measure_groups,
+    replace_measures,
+    reset_unknown_enum_values,
     response_body_or_raise,
+    to_enum,
+    to_timezone,
 )
 from withings_api.const import (
     STATUS_AUTH_FAILED,
@@ -45,6 +78,32 @@ from withings_api.const import (
 from .common import TIMEZONE0, TIMEZONE_STR0
 
 
+def test_to_enum(caplog: Any) -> None:
+    """Test function."""
+    reset_unknown_enum_values()
+    assert to_enum(MeasureType, 1, MeasureType.UNKNOWN) is MeasureType.WEIGHT
+    assert to_enum(MeasureType, MeasureType.WEIGHT, MeasureType.UNKNOWN) is (
+        MeasureType.WEIGHT
+    )
+    assert to_enum(SleepState, 2, SleepState.UNKNOWN) is SleepState.DEEP
+    assert to_enum(MeasureType, [1], MeasureType.UNKNOWN) is MeasureType.UNKNOWN
+    assert get_unknown_enum_values() == {("MeasureType", "[1]"): 1}
+    caplog.clear()
+
+    for _ in range(2500):
+        assert to_enum(SleepState, 999, SleepState.UNKNOWN) is SleepState.UNKNOWN
+    assert to_enum(MeasureType, "1", MeasureType.UNKNOWN) is MeasureType.UNKNOWN
+    assert get_unknown_enum_values() == {
+        ("MeasureType", "[1]"): 1,
+        ("SleepState", "999"): 2500,
+        ("MeasureType", "1"): 1,
+    }
+    assert len(caplog.records) == 4
+
+    reset_unknown_enum_values()
+    assert not get_unknown_enum_values()
+
+
 def test_time_zone_validate() -> None:
     """Test TimeZone conversation."""
     with pytest.raises(TypeError):
@@ -54,6 +113,32 @@ def test_time_zone_validate() -> None:
     assert TimeZone.validate(TIMEZONE_STR0) == TIMEZONE0
 
 
+def test_get_timezone() -> None:
+    """Test function."""
+    assert get_timezone(TIMEZONE_STR0) is get_timezone(TIMEZONE_STR0)
+    assert TimeZone.validate(TIMEZONE_STR0) is get_timezone(TIMEZONE_STR0)
+    assert get_timezone("NOT_A_TIMEZONE") is None
+
+    utc: Final = arrow.get(1234567)
+    local: Final = to_timezone(utc, TIMEZONE0)
+    assert local.tzinfo == TIMEZONE0
+    assert local == utc
+    assert to_timezone(local, local.tzinfo) is local
+
+    summary: Final = GetSleepSummarySerie(
+        timezone=TIMEZONE_STR0,
+        model=32,
+        startdate=1234567,
+        enddate=1234568,
+        date="2020-01-31",
+        modified=1234569,
+        data={},
+    )
+    for date in (summary.startdate, summary.enddate, summary.date, summary.modified):
+        assert date.tzinfo is summary.timezone
+    assert summary.date == arrow.get("2020-01-31")
+
+
 def test_arrow_type_validate() -> None:
     """Test ArrowType conversation."""
     with pytest.raises(TypeError):
@@ -62,10 +147,58 @@ def test_arrow_type_validate() -> None:
     arrow_obj: Final = arrow.get(1234567)
     assert ArrowType.validate("1234567") == arrow_obj
     assert ArrowType.validate(str(arrow_obj)) == arrow_obj
+    assert ArrowType.validate("2020-01-31") == arrow.get("2020-01-31")
+    assert isinstance(ArrowType.validate("2020-01-31"), ArrowType)
+    assert ArrowType.validate("2020-01-31T01:02:03") == arrow.get("2020-01-31T01:02:03")
+    with pytest.raises(ValueError):
+        ArrowType.validate("2020-13-31")
     assert ArrowType.validate(1234567) == arrow_obj
     assert ArrowType.validate(arrow_obj) == arrow_obj
 
 
+def test_arrow_type_lazy() -> None:
+    """Test function."""
+    first: Final = ArrowType.validate(1234567)
+    second: Final = ArrowType.validate("1234568")
+    assert isinstance(first, ArrowType)
+
+    assert first < second
+    assert first <= second
+    assert second > first
+    assert second >= first
+    assert first != second
+    assert sorted([second, first]) == [first, second]
+    assert first.int_timestamp == 1234567
+    assert first.tzinfo == arrow.get(1234567).tzinfo
+    assert "_datetime" not in first.__dict__
+
+    local: Final = first.to(TIMEZONE0)
+    assert local.tzinfo == TIMEZONE0
+    assert local == first
+    assert "_datetime" not in local.__dict__
+    assert local.to("UTC") == first
+    assert local.datetime == arrow.get(1234567).to(TIMEZONE0).datetime
+    assert "_datetime" in local.__dict__
+
+    assert first == arrow.get(1234567)
+    assert arrow.get(1234567) == first
+    assert first < arrow.get(1234568)
+    assert hash(first) == hash(arrow.get(1234567))
+    assert first.year == 1970
+    assert first.week == 3
+    assert first.shift(seconds=1) == second
+    assert pickle.loads(pickle.dumps(first)) == first
+
+    eager: Final = ArrowType(2020, 1, 1)
+    assert eager.int_timestamp == arrow.get("2020-01-01").int_timestamp
+    assert eager.tzinfo == arrow.get("2020-01-01").tzinfo
+    assert eager.to(TIMEZONE0) == eager
+    assert eager > first
+    assert first != "1234567"
+    with pytest.raises(AttributeError):
+        first._unknown  # pylint: disable=protected-access,pointless-statement
+
+
 def test_maybe_update_credentials() -> None:
     """Test upgrade credentials objects."""
 
@@ -255,6 +388,26 @@ def test_query_measure_groups() -> None:
     ) == (response.measuregrps[0],)
 
 
+def test_query_measure_groups_date_range() -> None:
+    """Test function."""
+    groups: Final = tuple(
+        MeasureGetMeasGroup(
+            attrib=MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER,
+            category=MeasureGetMeasGroupCategory.REAL,
+            created=date,
+            date=date,
+            deviceid="dev1",
+            grpid=date,
+            measures=(),
+        )
+        for date in (300, 100, 200)
+    )
+    assert query_measure_groups(groups, start=200) == (groups[0], groups[2])
+    assert query_measure_groups(groups, end=arrow.get(200)) == groups[1:]
+    assert query_measure_groups(groups, start=150, end=250) == (groups[2],)
+    assert query_measure_groups(groups, start=301) == ()
+
+
 def test_get_measure_value() -> None:
     """Test function."""
     response: Final = MeasureGetMeasResponse(
@@ -302,6 +455,76 @@ def response_status_factory(status: Any) -> Dict[str, Any]:
     return {"status": status, "body": {}}
 
 
+def test_get_measure_values() -> None:
+    """Test function."""
+    groups: Final = tuple(
+        MeasureGetMeasGroup(
+            attrib=attrib,
+            category=MeasureGetMeasGroupCategory.REAL,
+            created=date,
+            date=date,
+            deviceid="dev1",
+            grpid=date,
+            measures=tuple(
+                MeasureGetMeasMeasure(type=meastype, unit=-1, value=value)
+                for meastype, value in measures
+            ),
+        )
+        for date, attrib, measures in (
+            (
+                2,
+                MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER,
+                ((MeasureType.WEIGHT, 700), (MeasureType.WEIGHT, 701)),
+            ),
+            (
+                3,
+                MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+                ((MeasureType.WEIGHT, 710), (MeasureType.HEIGHT, 18)),
+            ),
+            (
+                1,
+                MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER,
+                ((MeasureType.HEIGHT, 17),),
+            ),
+            (
+                3,
+                MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER,
+                ((MeasureType.WEIGHT, 720),),
+            ),
+        )
+    )
+
+    def consume_two() -> Iterator[MeasureGetMeasGroup]:
+        yield groups[0]
+        yield groups[1]
+        raise AssertionError("should have stopped")
+
+    types: Final = (MeasureType.WEIGHT, MeasureType.HEIGHT)
+    assert get_measure_values(consume_two(), types) == {
+        MeasureType.WEIGHT: MeasureValue(70.0, arrow.get(2)),
+        MeasureType.HEIGHT: MeasureValue(1.8, arrow.get(3)),
+    }
+    assert get_measure_values(groups, types, latest=True) == {
+        MeasureType.WEIGHT: MeasureValue(71.0, arrow.get(3)),
+        MeasureType.HEIGHT: MeasureValue(1.8, arrow.get(3)),
+    }
+    device_values: Final = get_measure_values(
+        groups, types, MeasureGetMeasGroupAttrib.DEVICE_ENTRY_FOR_USER, latest=True
+    )
+    assert len(device_values) == 2
+    assert device_values[MeasureType.WEIGHT] == MeasureValue(72.0, arrow.get(3))
+    assert device_values[MeasureType.HEIGHT].date == arrow.get(1)
+    assert math.isclose(device_values[MeasureType.HEIGHT].value, 1.7)
+    assert get_measure_values(groups[2], types) == {
+        MeasureType.HEIGHT: device_values[MeasureType.HEIGHT]
+    }
+    assert get_measure_values(groups, (MeasureType.FAT_RATIO,)) == {}
+    for meastype in types:
+        assert get_measure_values(groups, (meastype,))[meastype].value == (
+            get_measure_value(groups, meastype)
+        )
+
+
 def test_response_body_or_raise() -> None:
     """Test function."""
     with pytest.raises(UnexpectedTypeException):
@@ -346,3 +569,300 @@ def test_response_body_or_raise() -> None:
 
     with pytest.raises(UnknownStatusException):
         response_body_or_raise(response_status_factory(100000))
+
+
+def test_parse_trusted() -> None:
+    """Test function."""
+    body: Final[Dict[str, Any]] = {
+        "measuregrps": [
+            {
+                "attrib": 2,
+                "category": 1,
+                "created": 1,
+                "date": "2",
+                "grpid": 3,
+                "measures": [
+                    {"type": 1, "unit": -3, "value": 70000},
+                    {"type": 12345, "unit": 0, "value": 1},
+                ],
+                "ignored": "value",
+            }
+        ],
+        "more": False,
+        "offset": 0,
+        "timezone": TIMEZONE_STR0,
+        "updatetime": 1000,
+    }
+
+    response: Final = parse_trusted(MeasureGetMeasResponse, body)
+    assert response == MeasureGetMeasResponse(**body)
+    assert response.updatetime.tzinfo == TIMEZONE0
+    assert response.measuregrps[0].deviceid is None
+    assert response.measuregrps[0].measures[1].type == MeasureType.UNKNOWN
+    assert response.__fields_set__ == set(body)
+    assert parse_trusted(MeasureGetMeasResponse, {**body, "measuregrps": ()}) == (
+        MeasureGetMeasResponse(**{**body, "measuregrps": ()})
+    )
+
+    nested: Final = parse_trusted(
+        NotifyListResponse,
+        {"profiles": [NotifyListProfile(appli=1, callbackurl="http://cb")]},
+    )
+    assert nested.profiles[0].appli == NotifyAppli.WEIGHT
+
+    class Values(ConfiguredBaseModel):
+        """Values."""
+
+        values: Tuple[int, ...]
+
+    assert parse_trusted(Values, {"values": [1, 2]}).values == (1, 2)
+
+
+def test_records() -> None:
+    """Test function."""
+    data: Final[Dict[str, Any]] = {
+        "measuregrps": [
+            {
+                "attrib": 0,
+                "category": 1,
+                "created": 1,
+                "date": 2,
+                "grpid": 3,
+                "measures": [
+                    {"type": 1, "unit": -1, "value": 700},
+                    {"type": 4, "unit": -2, "value": 180},
+                ],
+            }
+        ],
+        "more": False,
+        "offset": 0,
+        "timezone": TIMEZONE_STR0,
+        "updatetime": 4,
+    }
+    response: Final = parse_trusted(MeasureGetMeasResponse, data, records=True)
+    assert isinstance(response, MeasureGetMeasResponse)
+    group: Final = response.measuregrps[0]
+    # Records stand in for the models of the annotations.
+    assert isinstance(cast(Any, group), MeasureGroupRecord)
+    assert group.deviceid is None
+    assert group.date == arrow.get(2)
+    assert group.measures[1] == MeasureRecord(
+        type=MeasureType.HEIGHT, unit=-2, value=180
+    )
+    assert response == parse_trusted(MeasureGetMeasResponse, data, records=True)
+    assert not hasattr(group, "__dict__")
+
+    assert get_measure_value(response, MeasureType.HEIGHT) == 1.8
+    assert get_measure_value(group, MeasureType.WEIGHT) == 70.0
+    assert query_measure_groups(group, MeasureType.HEIGHT) == (
+        replace_measures(group, (group.measures[1],)),
+    )
+
+    assert parse_trusted(MeasureGetMeasGroup, data["measuregrps"][0]) == (
+        MeasureGetMeasGroup(**data["measuregrps"][0])
+    )
+    assert parse_trusted(
+        MeasureGetMeasGroup, data["measuregrps"][0], records=True
+    ) == MeasureGroupRecord.parse(data["measuregrps"][0])
+
+    values: Final = SleepGetTimestampValues([1, 2], [60, 61]).as_records()
+    assert isinstance(values, SleepGetTimestampValueRecords)
+    assert values[1] == SleepTimestampValueRecord(arrow.get(2), 61)
+    assert isinstance(values[1:], SleepGetTimestampValueRecords)
+    assert pickle.loads(pickle.dumps(values)) == values
+    assert repr(values) == "SleepGetTimestampValueRecords([1, 2], [60, 61])"
+    assert SleepGetTimestampValues.validate(values) is values
+
+
+def test_parse_lazy() -> None:
+    """Test function."""
+    data: Final = {
+        "measuregrps": [
+            {
+                "attrib": 0,
+                "category": 1,
+                "created": 1,
+                "date": grpid,
+                "grpid": grpid,
+                "measures": [{"type": 1, "unit": -1, "value": 700}],
+            }
+            for grpid in range(3)
+        ],
+        "more": True,
+        "offset": 3,
+        "timezone": TIMEZONE_STR0,
+        "updatetime": 4,
+    }
+    expected: Final = MeasureGetMeasResponse(**data)
+
+    response: Final = parse_lazy(MeasureGetMeasResponse, data)
+    groups: Final = response.measuregrps
+    assert isinstance(groups, LazySequence)
+    assert response.more is True
+    assert response.offset == 3
+    assert len(groups) == 3
+    assert groups.parsed_count == 0
+
+    assert groups[1] == expected.measuregrps[1]
+    assert groups[1] is groups[1]
+    assert groups.parsed_count == 1
+    assert groups[-1].grpid == 2
+    assert groups[:2] == expected.measuregrps[:2]
+    assert response == expected
+    assert groups == list(expected.measuregrps)
+    assert groups != "groups"
+    assert pickle.loads(pickle.dumps(groups)) == expected.measuregrps
+    assert repr(groups) == "LazySequence(%r)" % (expected.measuregrps,)
+
+    trusted: Final = parse_lazy(MeasureGetMeasResponse, data, trusted=True)
+    assert trusted == expected
+    records: Final = parse_lazy(MeasureGetMeasResponse, data, records=True)
+    assert isinstance(cast(Any, records.measuregrps[0]), MeasureGroupRecord)
+    assert isinstance(
+        parse_lazy(
+            SleepGetResponse, {"model": 32, "series": [{}]}, records=True
+        ).series,
+        LazySequence,
+    )
+
+    invalid: Final = parse_lazy(MeasureGetMeasResponse, {**data, "measuregrps": [{}]})
+    with pytest.raises(ValidationError):
+        invalid.measuregrps[0]  # pylint: disable=pointless-statement
+
+
+def test_sleep_get_timestamp_values() -> None:
+    """Test function."""
+    values: Final = SleepGetTimestampValues.validate({"10": 1, "20": 2, "30": 3})
+    items: Final = (
+        SleepGetTimestampValue(timestamp=10, value=1),
+        SleepGetTimestampValue(timestamp=20, value=2),
+        SleepGetTimestampValue(timestamp=30, value=3),
+    )
+
+    assert len(values) == 3
+    assert values[1] == items[1]
+    assert values[-1].timestamp == arrow.get(30)
+    assert isinstance(values[0].timestamp, ArrowType)
+    assert "_datetime" not in values[0].timestamp.__dict__
+    assert values[1:] == items[1:]
+    assert values[1:] == SleepGetTimestampValues([20, 30], [2, 3])
+    assert tuple(values) == items
+    assert values == items
+    assert values == list(items)
+    assert values != items[1:]
+    assert values != "values"
+    assert values.timestamps.tolist() == [10, 20, 30]
+    assert values.values.tolist() == [1, 2, 3]
+    assert values.values.readonly
+    assert SleepGetTimestampValues.validate(items) == values
+    assert SleepGetTimestampValues.validate([{"timestamp": 10, "value": 1}]) == (
+        items[:1]
+    )
+    assert SleepGetTimestampValues.validate(values) is values
+    assert SleepGetTimestampValues.validate(None) == ()
+    assert pickle.loads(pickle.dumps(values)) == values
+    assert repr(values) == "SleepGetTimestampValues([10, 20, 30], [1, 2, 3])"
+
+    with pytest.raises(TypeError):
+        SleepGetTimestampValues.validate(123)
+    with pytest.raises(ValueError):
+        SleepGetTimestampValues([1, 2], [1])
+    with pytest.raises(TypeError):
+        hash(values)
+
+    sample: Final = SleepGetSerie(
+        startdate=1, enddate=2, state=1, hr={"10": 1, "20": 2, "30": 3}
+    )
+    assert sample.hr == values
+    assert sample.rr == ()
+    assert sample.copy(deep=True).hr is sample.hr
+    assert sample.dict()["hr"] == tuple(item.dict() for item in items)
+    assert sample.dict()["rr"] == ()
+    assert SleepGetResponse(model=32, series=[sample]).dict()["series"][0][
+        "hr"
+    ] == tuple(item.dict() for item in items)
+
+    coerced: Final = SleepGetSerie(
+        startdate=1, enddate=2, state=1, hr={"10": 1.0, "20": "2", "30": 3}
+    )
+    assert coerced.hr == values
+    with pytest.raises(ValidationError):
+        SleepGetSerie(startdate=1, enddate=2, state=1, hr={"10": "one"})
+
+
+def test_sleep_get_timestamp_values_to_numpy() -> None:
+    """Test function."""
+    numpy: Final = pytest.importorskip("numpy")
+    timestamps, values = SleepGetTimestampValues.validate(
+        {"10": 60, "20": 61}
+    ).to_numpy()
+    assert timestamps.dtype == numpy.int64
+    assert timestamps.tolist() == [10, 20]
+    assert values.tolist() == [60, 61]
+
+
+def test_sleep_get_timestamp_values_without_numpy(monkeypatch: Any) -> None:
+    """Test function."""
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    with pytest.raises(ImportError):
+        SleepGetTimestampValues().to_numpy()
+
+
+def test_heart_signal() -> None:
+    """Test function."""
+    signal: Final = HeartSignal.validate([-20, 0, 20])
+    assert signal.typecode == "h"
+    assert len(signal) == 3
+    assert signal[0] == -20
+    assert signal[1:] == (0, 20)
+    assert list(signal) == [-20, 0, 20]
+    assert signal == (-20, 0, 20)
+    assert signal == [-20, 0, 20]
+    assert signal != (-20, 0)
+    assert signal != "signal"
+    assert signal.buffer.tolist() == [-20, 0, 20]
+    assert signal.buffer.readonly
+    assert HeartSignal.validate(signal) is signal
+    assert HeartSignal.validate((1,)) == HeartSignal(iter([1]))
+    assert pickle.loads(pickle.dumps(signal)) == signal
+    assert repr(signal) == "HeartSignal([-20, 0, 20])"
+
+    assert HeartSignal([2 ** 20]).typecode == "i"
+    assert HeartSignal([-(2 ** 40)]).typecode == "q"
+    with pytest.raises(OverflowError):
+        HeartSignal([2 ** 70])
+    with pytest.raises(TypeError):
+        HeartSignal.validate("signal")
+    with pytest.raises(TypeError):
+        hash(signal)
+
+    response: Final = HeartGetResponse(
+        signal=[1, 2], sampling_frequency=500, wearposition=1
+    )
+    assert response.copy(deep=True).signal is response.signal
+    assert response.dict() == {
+        "signal": (1, 2),
+        "sampling_frequency": 500,
+        "wearposition": HeartWearPosition.LEFT_WRIST,
+    }
+    assert json.loads(response.json()) == {
+        "signal": [1, 2],
+        "sampling_frequency": 500,
+        "wearposition": 1,
+    }
+    assert HeartGetResponse.parse_raw(response.json()) == response
+
+
+def test_heart_signal_to_numpy() -> None:
+    """Test function."""
+    numpy: Final = pytest.importorskip("numpy")
+    samples: Final = HeartSignal.validate([-20, 0, 20]).to_numpy()
+    assert samples.dtype == numpy.int16
+    assert samples.tolist() == [-20, 0, 20]
+
+
+def test_heart_signal_without_numpy(monkeypatch: Any) -> None:
+    """Test function."""
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    with pytest.raises(ImportError):
+        HeartSignal().to_numpy()
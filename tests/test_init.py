@@ -1,6 +1,10 @@
 """Tets for main API."""
 import datetime
+import json
 import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple, cast
 from unittest.mock import MagicMock
 from urllib import parse
 
@@ -8,8 +12,15 @@ import arrow
 import pytest
 import responses
 from typing_extensions import Final
-from withings_api import WithingsApi, WithingsAuth
+from withings_api import (
+    AbstractWithingsApi,
+    WithingsApi,
+    WithingsAuth,
+    create_http_adapter,
+)
+from withings_api.cache import CachePolicy, MemoryResponseCache, SqliteResponseCache
 from withings_api.common import (
+    ActivityRecord,
     AfibClassification,
     AuthScope,
     Credentials2,
@@ -24,6 +35,7 @@ from withings_api.common import (
     HeartListResponse,
     HeartListSerie,
     HeartModel,
+    HeartSignal,
     HeartWearPosition,
     MeasureGetActivityActivity,
     MeasureGetActivityResponse,
@@ -32,6 +44,8 @@ from withings_api.common import (
     MeasureGetMeasGroupCategory,
     MeasureGetMeasMeasure,
     MeasureGetMeasResponse,
+    MeasureGroupRecord,
+    MeasureRecord,
     MeasureType,
     NotifyAppli,
     NotifyGetResponse,
@@ -43,11 +57,23 @@ from withings_api.common import (
     SleepGetTimestampValue,
     SleepModel,
     SleepState,
+    SleepTimestampValueRecord,
+    TimeoutException,
+    TooManyRequestsException,
     UserGetDeviceDevice,
     UserGetDeviceResponse,
 )
-
-from .common import TIMEZONE0, TIMEZONE1, TIMEZONE_STR0, TIMEZONE_STR1
+from withings_api.ratelimit import RateLimiter
+from withings_api.retry import RetryPolicy
+
+from .common import (
+    ACTIVITY,
+    TIMEZONE0,
+    TIMEZONE1,
+    TIMEZONE_STR0,
+    TIMEZONE_STR1,
+    new_credentials,
+)
 
 _UNKNOWN_INT = 1234567
 _USERID: Final = 12345
@@ -65,8 +91,12 @@ _FETCH_TOKEN_RESPONSE_BODY: Final = {
 }
 
 
-@pytest.fixture(name="withings_api")
-def withings_api_instance() -> WithingsApi:
+@pytest.fixture(
+    name="withings_api",
+    params=[(False, False), (True, False), (False, True)],
+    ids=["validated", "trusted", "lazy"],
+)
+def withings_api_instance(request: Any) -> WithingsApi:
     """Test function."""
     client_id: Final = "my_client_id"
     consumer_secret: Final = "my_consumer_secret"
@@ -80,7 +110,9 @@ def withings_api_instance() -> WithingsApi:
         consumer_secret=consumer_secret,
     )
 
-    return WithingsApi(credentials)
+    return WithingsApi(
+        credentials, trusted_parsing=request.param[0], lazy_parsing=request.param[1]
+    )
 
 
 def test_get_authorize_url() -> None:
@@ -212,6 +244,173 @@ def test_refresh_token() -> None:
     assert new_credentials2.token_expiry > credentials.token_expiry
 
 
+@responses.activate
+def test_shared_http_adapter() -> None:
+    """Test function."""
+    adapter: Final = create_http_adapter(pool_maxsize=20, pool_block=True)
+    apis: Final = tuple(
+        WithingsApi(
+            Credentials2(
+                access_token="my_access_token%s" % userid,
+                expires_in=10000,
+                token_type="Bearer",
+                refresh_token="my_refresh_token",
+                userid=userid,
+                client_id="my_client_id",
+                consumer_secret="my_consumer_secret",
+            ),
+            http_adapter=adapter,
+        )
+        for userid in (1, 2)
+    )
+
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 20
+    assert adapter.poolmanager.connection_pool_kw["block"]
+    # pylint: disable=protected-access
+    for api in apis:
+        assert api._client.get_adapter("https://wbsapi.withings.net") is adapter
+
+    responses_add_user_get_device()
+    apis[0].user_get_device()
+    apis[1].user_get_device()
+    assert_url_query_equals(
+        responses.calls[0].request.url, {"access_token": "my_access_token1"}
+    )
+    assert_url_query_equals(
+        responses.calls[1].request.url, {"access_token": "my_access_token2"}
+    )
+
+
+@responses.activate
+def test_rate_limiter(withings_api: WithingsApi) -> None:
+    """Test function."""
+    limiter: Final = MagicMock()
+    # pylint: disable=protected-access
+    withings_api._rate_limiter = limiter
+    responses_add_user_get_device()
+    responses.add(
+        method=responses.GET,
+        url=re.compile("https://wbsapi.withings.net/notify?.*action=list(&.*)?"),
+        status=200,
+        json={"status": 601},
+    )
+
+    withings_api.user_get_device()
+    limiter.acquire.assert_called_once_with()
+    limiter.on_success.assert_called_once_with()
+
+    with pytest.raises(TooManyRequestsException):
+        withings_api.notify_list()
+    assert limiter.acquire.call_count == 2
+    limiter.on_throttled.assert_called_once_with()
+    limiter.on_success.assert_called_once_with()
+
+    api: Final = WithingsApi(
+        withings_api.get_credentials(), rate_limiter=RateLimiter(rate=10)
+    )
+    assert api._rate_limiter is not None
+
+
+@responses.activate
+def test_retry_policy(withings_api: WithingsApi) -> None:
+    """Test function."""
+    url: Final = re.compile("https://wbsapi.withings.net/notify?.*action=list(&.*)?")
+    responses.add(method=responses.GET, url=url, json={"status": 522})
+    responses.add(method=responses.GET, url=url, body=ConnectionError("boom"))
+    responses.add(
+        method=responses.GET, url=url, json={"status": 0, "body": {"profiles": []}}
+    )
+
+    with pytest.raises(TimeoutException):
+        withings_api.notify_list()
+    assert len(responses.calls) == 1
+
+    api: Final = WithingsApi(
+        withings_api.get_credentials(), retry_policy=RetryPolicy(backoff_base=0.001),
+    )
+    assert api.notify_list().profiles == ()
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_response_cache(withings_api: WithingsApi) -> None:
+    """Test function."""
+    responses_add_user_get_device()
+    cache: Final = SqliteResponseCache(
+        ":memory:", policy=CachePolicy(ttls={("v2/user", "getdevice"): 60})
+    )
+    api: Final = WithingsApi(withings_api.get_credentials(), response_cache=cache)
+
+    assert api.user_get_device() == api.user_get_device()
+    assert len(responses.calls) == 1
+    assert len(cache) == 1
+
+    responses.add(
+        method=responses.POST,
+        url=re.compile("https://wbsapi.withings.net/notify?.*action=list(&.*)?"),
+        json={"status": 0, "body": {"profiles": []}},
+    )
+    assert api.request(path="notify", params={"action": "list"}, method="POST")
+    assert len(cache) == 1
+
+
+@responses.activate
+def test_response_cache_historical_measures(withings_api: WithingsApi) -> None:
+    """Test function."""
+    responses_add_measure_get_meas()
+    api: Final = WithingsApi(
+        withings_api.get_credentials(), response_cache=SqliteResponseCache(":memory:")
+    )
+
+    # The default lastupdate of measure_get_meas does not prevent caching.
+    assert api.measure_get_meas(
+        startdate=1111111111, enddate=1111119999
+    ) == api.measure_get_meas(startdate=1111111111, enddate=1111119999)
+    assert len(responses.calls) == 1
+    assert "lastupdate=" in responses.calls[0].request.url
+
+    api.measure_get_meas(lastupdate=1111111111)
+    api.measure_get_meas(lastupdate=1111111111)
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_response_cache_invalidation(withings_api: WithingsApi) -> None:
+    """Test function."""
+    for action, body in (
+        ("list", {"profiles": []}),
+        ("subscribe", {}),
+        ("update", {}),
+        ("revoke", {}),
+    ):
+        responses.add(
+            method=responses.GET,
+            url=re.compile(
+                "https://wbsapi.withings.net/notify?.*action=%s(&.*)?" % action
+            ),
+            json={"status": 0, "body": body},
+        )
+    cache: Final = MemoryResponseCache()
+    api: Final = WithingsApi(withings_api.get_credentials(), response_cache=cache)
+
+    api.notify_list()
+    api.notify_list()
+    assert len(responses.calls) == 1
+    assert len(cache) == 1
+
+    api.notify_subscribe(callbackurl="http://cb")
+    assert len(cache) == 0
+    api.notify_list()
+    api.notify_update("http://cb", NotifyAppli.WEIGHT, "http://cb2")
+    assert len(cache) == 0
+    api.notify_list()
+    api.notify_revoke(callbackurl="http://cb2")
+    assert len(cache) == 0
+    assert len(responses.calls) == 6
+
+    withings_api.invalidate_response_cache()
+
+
 def responses_add_user_get_device() -> None:
     """Set up request response."""
     responses.add(
@@ -851,11 +1050,14 @@ def responses_add_heart_get(wear_potion: int) -> None:
 def test_heart_get_known(withings_api: WithingsApi) -> None:
     """Test function."""
     responses_add_heart_get(HeartWearPosition.LEFT_ARM.real)
-    assert withings_api.heart_get(123456) == HeartGetResponse(
+    response: Final = withings_api.heart_get(123456)
+    assert response == HeartGetResponse(
         signal=tuple([-20, 0, 20]),
         sampling_frequency=500,
         wearposition=HeartWearPosition.LEFT_ARM,
     )
+    assert isinstance(response.signal, HeartSignal)
+    assert response.signal.typecode == "h"
 
 
 @responses.activate
@@ -1347,6 +1549,329 @@ def test_heart_list_params(withings_api: WithingsApi) -> None:
     assert_url_query_equals(responses.calls[0].request.url, {"action": "list"})
 
 
+def responses_add_pages(path: str, action: str, key: str, pages: list) -> None:
+    """Set up paginated responses served by offset."""
+
+    def callback(request: Any) -> Tuple[int, dict, str]:
+        params: Final = dict(parse.parse_qsl(parse.urlsplit(request.url).query))
+        index: Final = int(params.get("offset", 0))
+        body: Final = {
+            key: pages[index],
+            "more": index + 1 < len(pages),
+            "offset": index + 1,
+            "timezone": TIMEZONE_STR0,
+            "updatetime": 1409596058,
+        }
+        return 200, {}, json.dumps({"status": 0, "body": body})
+
+    responses.add_callback(
+        method=responses.GET,
+        url=re.compile(
+            "https://wbsapi.withings.net/%s?.*action=%s(&.*)?" % (path, action)
+        ),
+        callback=callback,
+        content_type="application/json",
+    )
+
+
+def _meas_group(grpid: int) -> dict:
+    return {
+        "attrib": MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+        "category": MeasureGetMeasGroupCategory.REAL,
+        "created": 1111111111 + grpid,
+        "date": 1111111111 + grpid,
+        "deviceid": "dev1",
+        "grpid": grpid,
+        "measures": [{"type": MeasureType.WEIGHT, "unit": -1, "value": 700 + grpid}],
+    }
+
+
+@responses.activate
+def test_iter_measure_get_meas(withings_api: WithingsApi) -> None:
+    """Test function."""
+    responses_add_pages(
+        "measure",
+        "getmeas",
+        "measuregrps",
+        [[_meas_group(1), _meas_group(2)], [], [_meas_group(3)]],
+    )
+
+    groups: Final = withings_api.iter_measure_get_meas(
+        meastype=MeasureType.WEIGHT, startdate=1, enddate=2, lastupdate=None
+    )
+    assert next(groups).grpid == 1
+    assert len(responses.calls) == 1
+
+    assert [group.grpid for group in groups] == [2, 3]
+    assert len(responses.calls) == 3
+    assert_url_query_equals(
+        responses.calls[2].request.url,
+        {"meastype": "1", "startdate": "1", "enddate": "2", "offset": "2"},
+    )
+    assert "offset" not in responses.calls[0].request.url
+    assert "lastupdate" not in responses.calls[0].request.url
+
+
+@responses.activate
+def test_iter_measure_get_activity(withings_api: WithingsApi) -> None:
+    """Test function."""
+    responses_add_pages(
+        "v2/measure", "getactivity", "activities", [[ACTIVITY], [ACTIVITY]]
+    )
+
+    activities: Final = tuple(
+        withings_api.iter_measure_get_activity(startdateymd="2019-01-01")
+    )
+    assert len(activities) == 2
+    assert activities[0].brand == 100
+    assert len(responses.calls) == 2
+    assert_url_query_equals(
+        responses.calls[1].request.url, {"startdateymd": "2019-01-01", "offset": "1"}
+    )
+
+
+@responses.activate
+def test_iter_sleep_get_summary(withings_api: WithingsApi) -> None:
+    """Test function."""
+    summary: Final = {
+        "timezone": TIMEZONE_STR0,
+        "model": SleepModel.SLEEP_MONITOR,
+        "startdate": 5555555,
+        "enddate": 5555555,
+        "date": 5555555,
+        "modified": 5555555,
+        "data": {"deepsleepduration": 110},
+    }
+    responses_add_pages(
+        "v2/sleep", "getsummary", "series", [[summary, summary], [summary]]
+    )
+
+    series: Final = tuple(
+        withings_api.iter_sleep_get_summary(
+            data_fields=(GetSleepSummaryField.DEEP_SLEEP_DURATION,)
+        )
+    )
+    assert [summary.data.deepsleepduration for summary in series] == [110, 110, 110]
+    assert len(responses.calls) == 2
+    assert_url_query_equals(
+        responses.calls[1].request.url,
+        {"data_fields": "deepsleepduration", "offset": "1"},
+    )
+
+
+@responses.activate
+def test_iter_heart_list(withings_api: WithingsApi) -> None:
+    """Test function."""
+    heart: Final = {
+        "model": HeartModel.MOVE_ECG.real,
+        "ecg": {"signalid": 123987, "afib": AfibClassification.NEGATIVE.real},
+        "heart_rate": 77,
+        "timestamp": 1594921551,
+    }
+    responses_add_pages("v2/heart", "list", "series", [[heart], [heart], [heart]])
+
+    series: Final = tuple(withings_api.iter_heart_list(startdate="2020-01-01"))
+    assert [heart.heart_rate for heart in series] == [77, 77, 77]
+    assert len(responses.calls) == 3
+    assert_url_query_equals(
+        responses.calls[2].request.url, {"startdate": "1577836800", "offset": "2"}
+    )
+
+
+@responses.activate
+def test_measure_get_meas_windowed(withings_api: WithingsApi) -> None:
+    """Test function."""
+    all_groups: Final = [_meas_group(grpid) for grpid in range(0, 100, 3)]
+    # The same group is reported again by the last window.
+    duplicate: Final = dict(all_groups[0], date=all_groups[-1]["date"])
+
+    def callback(request: Any) -> Tuple[int, dict, str]:
+        params: Final = dict(parse.parse_qsl(parse.urlsplit(request.url).query))
+        start: Final = int(params["startdate"])
+        end: Final = int(params["enddate"])
+        offset: Final = int(params.get("offset", 0))
+        groups: Final = [
+            group for group in all_groups + [duplicate] if start <= group["date"] <= end
+        ]
+        body: Final = {
+            "measuregrps": groups[offset : offset + 2],
+            "more": offset + 2 < len(groups),
+            "offset": offset + 2,
+            "timezone": TIMEZONE_STR0,
+            "updatetime": 1409596058 + start,
+        }
+        return 200, {}, json.dumps({"status": 0, "body": body})
+
+    responses.add_callback(
+        method=responses.GET,
+        url=re.compile("https://wbsapi.withings.net/measure?.*action=getmeas(&.*)?"),
+        callback=callback,
+        content_type="application/json",
+    )
+
+    start: Final = all_groups[0]["date"]
+    end: Final = all_groups[-1]["date"]
+    response: Final = withings_api.measure_get_meas_windowed(
+        startdate=start, enddate=end, meastype=MeasureType.WEIGHT, windows=4
+    )
+
+    grpids: Final = [group.grpid for group in response.measuregrps]
+    assert sorted(grpids) == [group["grpid"] for group in all_groups]
+    dates: Final = [group.date for group in response.measuregrps]
+    assert dates == sorted(dates, reverse=True)
+    assert not response.more
+    assert response.timezone == TIMEZONE0
+    assert response.updatetime > arrow.get(1409596058 + start)
+
+    windows: Final = {
+        (params["startdate"], params["enddate"])
+        for params in (
+            dict(parse.parse_qsl(parse.urlsplit(call.request.url).query))
+            for call in responses.calls
+        )
+    }
+    assert len(windows) == 4
+    assert (str(start), "1111111135") in windows
+    assert len(responses.calls) > 4
+
+    assert withings_api.measure_get_meas_windowed(
+        startdate=end, enddate=end, windows=4
+    ).measuregrps[0].grpid in (0, 99)
+    assert (
+        withings_api.measure_get_meas_windowed(startdate=end, enddate=start).more
+        is False
+    )
+
+
+@responses.activate
+def test_measure_get_meas_windowed_refresh_token() -> None:
+    """Test function."""
+    refreshes: Final[List[str]] = []
+
+    def refresh(request: Any) -> Tuple[int, dict, str]:
+        refreshes.append(request.body)
+        # Give the other windows time to find the token expired too.
+        time.sleep(0.05)
+        return 200, {}, json.dumps(_FETCH_TOKEN_RESPONSE_BODY)
+
+    responses.add_callback(
+        method=responses.POST,
+        url=re.compile("https://wbsapi.withings.net/v2/oauth2.*"),
+        callback=refresh,
+        content_type="application/json",
+    )
+    responses.add(
+        method=responses.GET,
+        url=re.compile("https://wbsapi.withings.net/measure?.*action=getmeas(&.*)?"),
+        status=200,
+        json={
+            "status": 0,
+            "body": {
+                "measuregrps": [_meas_group(1)],
+                "more": False,
+                "offset": 0,
+                "timezone": TIMEZONE_STR0,
+                "updatetime": 1409596058,
+            },
+        },
+    )
+
+    refresh_callback: Final = MagicMock()
+    api: Final = WithingsApi(
+        Credentials2(
+            access_token="my_access_token_old",
+            expires_in=-1,
+            token_type="Bearer",
+            refresh_token="my_refresh_token_old",
+            userid=_USERID,
+            client_id="my_client_id",
+            consumer_secret="my_consumer_secret",
+        ),
+        refresh_callback,
+    )
+    response: Final = api.measure_get_meas_windowed(
+        startdate=1111111111, enddate=1111119999, windows=8
+    )
+
+    assert [group.grpid for group in response.measuregrps] == [1]
+    assert len(refreshes) == 1
+    assert "my_refresh_token_old" in refreshes[0]
+    refresh_callback.assert_called_once_with(api.get_credentials())
+    assert api.get_credentials().refresh_token == "my_refresh_token"
+    assert all(
+        "access_token=my_access_token&" in call.request.url + "&"
+        for call in responses.calls
+        if "getmeas" in call.request.url
+    )
+
+
+@responses.activate
+def test_ensure_token_refreshed_by_other_thread(monkeypatch: Any) -> None:
+    """Test function."""
+    responses.add(
+        method=responses.POST,
+        url=re.compile("https://wbsapi.withings.net/v2/oauth2.*"),
+        status=200,
+        json=_FETCH_TOKEN_RESPONSE_BODY,
+    )
+    responses.add(
+        method=responses.GET,
+        url=re.compile("https://wbsapi.withings.net/measure?.*action=getmeas(&.*)?"),
+        status=200,
+        json={
+            "status": 0,
+            "body": {
+                "measuregrps": [],
+                "more": False,
+                "offset": 0,
+                "timezone": TIMEZONE_STR0,
+                "updatetime": 1409596058,
+            },
+        },
+    )
+
+    refresh_callback: Final = MagicMock()
+    api: Final = WithingsApi(
+        Credentials2(
+            access_token="my_access_token_old",
+            expires_in=-1,
+            token_type="Bearer",
+            refresh_token="my_refresh_token_old",
+            userid=_USERID,
+            client_id="my_client_id",
+            consumer_secret="my_consumer_secret",
+        ),
+        refresh_callback,
+    )
+
+    utcnow: Final = arrow.utcnow
+    interleaved: Final[List[bool]] = []
+
+    def other_thread_refreshes() -> arrow.Arrow:
+        # Let another thread refresh right after this one found the token expired.
+        if not interleaved:
+            interleaved.append(True)
+            thread = threading.Thread(target=api.measure_get_meas)
+            thread.start()
+            thread.join()
+        return utcnow()
+
+    monkeypatch.setattr(arrow, "utcnow", other_thread_refreshes)
+    api.measure_get_meas()
+
+    assert interleaved
+    refreshes: Final = [
+        call for call in responses.calls if "oauth2" in call.request.url
+    ]
+    assert len(refreshes) == 1
+    refresh_callback.assert_called_once_with(api.get_credentials())
+    assert all(
+        "access_token=my_access_token&" in call.request.url + "&"
+        for call in responses.calls
+        if "getmeas" in call.request.url
+    )
+
+
 def assert_url_query_equals(url: str, expected: dict) -> None:
     """Assert a url query contains specific params."""
     params: Final = dict(parse.parse_qsl(parse.urlsplit(url).query))
@@ -1356,6 +1881,163 @@ def assert_url_query_equals(url: str, expected: dict) -> None:
         assert params[key] == expected[key]
 
 
+@responses.activate
+def test_records() -> None:
+    """Test function."""
+    api: Final = WithingsApi(new_credentials(), records=True)
+    responses_add_pages("measure", "getmeas", "measuregrps", [[_meas_group(1)]])
+    responses_add_pages("v2/measure", "getactivity", "activities", [[ACTIVITY]])
+    responses_add_pages(
+        "v2/sleep",
+        "get",
+        "series",
+        [[{"startdate": 1, "enddate": 2, "state": 1, "hr": {"1": 60}}]],
+    )
+
+    group: Final = api.measure_get_meas().measuregrps[0]
+    assert group == MeasureGroupRecord(
+        attrib=MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+        category=MeasureGetMeasGroupCategory.REAL,
+        created=arrow.get(1111111112),
+        date=arrow.get(1111111112),
+        deviceid="dev1",
+        grpid=1,
+        measures=(MeasureRecord(type=MeasureType.WEIGHT, unit=-1, value=701),),
+    )
+    assert tuple(api.iter_measure_get_meas()) == (group,)
+    assert tuple(api.stream_measure_get_meas()) == (group,)
+    assert api.measure_get_meas_windowed(startdate=1, enddate=2).measuregrps == (group,)
+    assert isinstance(
+        api.measure_get_meas(records=False).measuregrps[0], MeasureGetMeasGroup
+    )
+
+    activity: Final = next(api.iter_measure_get_activity())
+    # Records stand in for the models of the annotations.
+    assert isinstance(cast(Any, activity), ActivityRecord)
+    assert activity.brand == 100
+    assert activity.steps is None
+    assert isinstance(
+        api.measure_get_activity(records=False).activities[0],
+        MeasureGetActivityActivity,
+    )
+
+    assert tuple(cast(Any, api.sleep_get(data_fields=GetSleepField).series[0].hr)) == (
+        SleepTimestampValueRecord(timestamp=arrow.get(1), value=60),
+    )
+
+
 def assert_url_path(url: str, path: str) -> None:
     """Assert the path of a url."""
     assert parse.urlsplit(url).path == path
+
+
+@responses.activate
+def test_stream_measure_get_meas(withings_api: WithingsApi) -> None:
+    """Test function."""
+    responses_add_pages(
+        "measure",
+        "getmeas",
+        "measuregrps",
+        [[_meas_group(1), _meas_group(2)], [], [_meas_group(3)]],
+    )
+
+    groups: Final = withings_api.stream_measure_get_meas(
+        meastype=MeasureType.WEIGHT, startdate=1, enddate=2, lastupdate=None
+    )
+    first: Final = next(groups)
+    assert (
+        first
+        == withings_api.measure_get_meas(
+            meastype=MeasureType.WEIGHT, startdate=1, enddate=2, lastupdate=None
+        ).measuregrps[0]
+    )
+    assert [group.grpid for group in groups] == [2, 3]
+    assert len(responses.calls) == 4
+    assert_url_query_equals(
+        responses.calls[3].request.url,
+        {"meastype": "1", "startdate": "1", "enddate": "2", "offset": "2"},
+    )
+
+
+@responses.activate
+def test_stream_sleep_get_summary_and_heart_list(withings_api: WithingsApi) -> None:
+    """Test function."""
+    sleep_serie: Final = {
+        "timezone": TIMEZONE_STR0,
+        "model": SleepModel.SLEEP_MONITOR,
+        "startdate": 5555555,
+        "enddate": 5555555,
+        "date": 5555555,
+        "modified": 5555555,
+        "data": {"deepsleepduration": 110},
+    }
+    heart_serie: Final = {
+        "model": HeartModel.MOVE_ECG.real,
+        "ecg": {"signalid": 123987, "afib": AfibClassification.NEGATIVE.real},
+        "heart_rate": 77,
+        "timestamp": 1594921551,
+    }
+    responses_add_pages("v2/sleep", "getsummary", "series", [[sleep_serie], []])
+    responses_add_pages(
+        "v2/heart", "list", "series", [[heart_serie, heart_serie], [heart_serie]]
+    )
+
+    series: Final = tuple(
+        withings_api.stream_sleep_get_summary(
+            data_fields=(GetSleepSummaryField.DEEP_SLEEP_DURATION,)
+        )
+    )
+    assert [summary.data.deepsleepduration for summary in series] == [110]
+    assert series[0].startdate.tzinfo == TIMEZONE0
+    assert [heart.heart_rate for heart in withings_api.stream_heart_list()] == [
+        77,
+        77,
+        77,
+    ]
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_stream_errors(withings_api: WithingsApi) -> None:
+    """Test function."""
+    limiter: Final = MagicMock()
+    # pylint: disable=protected-access
+    withings_api._rate_limiter = limiter
+    url: Final = re.compile("https://wbsapi.withings.net/v2/heart?.*action=list(&.*)?")
+    responses.add(method=responses.GET, url=url, json={"status": 601})
+    responses.add(method=responses.GET, url=url, json={"status": 522})
+    responses.add(
+        method=responses.GET, url=url, json={"status": 0, "body": {"series": []}}
+    )
+
+    with pytest.raises(TooManyRequestsException):
+        tuple(withings_api.stream_heart_list())
+    limiter.on_throttled.assert_called_once_with()
+    with pytest.raises(TimeoutException):
+        tuple(withings_api.stream_heart_list())
+    assert tuple(withings_api.stream_heart_list()) == ()
+    assert limiter.acquire.call_count == 3
+    limiter.on_success.assert_called_once_with()
+
+
+def test_default_request_stream() -> None:
+    """Test function."""
+
+    class Api(AbstractWithingsApi):
+        """Api answering with prepared responses."""
+
+        responses: List[Dict[str, Any]] = []
+
+        def _request(
+            self, path: str, params: Dict[str, Any], method: str = "GET"
+        ) -> Dict[str, Any]:
+            return self.responses.pop(0)
+
+    api: Final = Api()
+    api.responses = [
+        {"status": 0, "body": {"series": [], "more": False, "offset": 0}},
+        {"status": 601},
+    ]
+    assert tuple(api.stream_heart_list()) == ()
+    with pytest.raises(TooManyRequestsException):
+        tuple(api.stream_heart_list())
@@ -0,0 +1,114 @@
+"""Tests for the api pool."""
+import asyncio
+import threading
+from typing import Any, List
+
+import pytest
+from typing_extensions import Final
+from withings_api.common import TooManyRequestsException
+from withings_api.pool import PoolResult, WithingsApiPool
+
+
+class FakeApi:
+    """Fake api object."""
+
+    active: int = 0
+    max_active: int = 0
+    lock: Final = threading.Lock()
+
+    def __init__(self, userid: int):
+        """Initialize."""
+        self.userid = userid
+
+    def measure_get_meas(self, lastupdate: int) -> int:
+        """Fake call."""
+        with FakeApi.lock:
+            FakeApi.active += 1
+            FakeApi.max_active = max(FakeApi.max_active, FakeApi.active)
+        try:
+            if self.userid == 3:
+                raise TooManyRequestsException(601)
+            return self.userid + lastupdate
+        finally:
+            with FakeApi.lock:
+                FakeApi.active -= 1
+
+    async def notify_list(self) -> int:
+        """Fake coroutine call."""
+        await asyncio.sleep(0)
+        if self.userid == 3:
+            raise TooManyRequestsException(601)
+        return self.userid
+
+
+def new_pool(size: int, max_workers: int) -> WithingsApiPool:
+    """Create a pool of fake api objects."""
+    return WithingsApiPool(
+        {userid: FakeApi(userid) for userid in range(size)}, max_workers=max_workers
+    )
+
+
+def test_map() -> None:
+    """Test function."""
+    pool: Final = new_pool(50, max_workers=4)
+
+    results: Final = {
+        result.key: result for result in pool.map("measure_get_meas", lastupdate=100)
+    }
+
+    assert len(results) == 50
+    assert results[0].ok
+    assert results[0].get() == 100
+    assert results[49].get() == 149
+    assert not results[3].ok
+    assert isinstance(results[3].exception, TooManyRequestsException)
+    with pytest.raises(TooManyRequestsException):
+        results[3].get()
+    assert FakeApi.max_active <= 4
+
+
+def test_map_callable_and_keys() -> None:
+    """Test function."""
+    pool: Final = new_pool(5, max_workers=2)
+    calls: Final[List[Any]] = []
+
+    def call(api: FakeApi, factor: int) -> int:
+        calls.append(api)
+        return api.userid * factor
+
+    results: Final = sorted(
+        (result.key, result.get()) for result in pool.map(call, 10, keys=(1, 4))
+    )
+
+    assert results == [(1, 10), (4, 40)]
+    assert len(calls) == 2
+    assert tuple(pool.map(call, 10, keys=())) == ()
+
+
+def test_map_async() -> None:
+    """Test function."""
+    pool: Final = new_pool(10, max_workers=3)
+
+    async def collect() -> List[PoolResult]:
+        return [result async for result in pool.map_async("notify_list")]
+
+    results: Final = {result.key: result for result in asyncio.run(collect())}
+    assert len(results) == 10
+    assert results[5].value == 5
+    assert isinstance(results[3].exception, TooManyRequestsException)
+
+
+def test_membership() -> None:
+    """Test function."""
+    pool: Final = WithingsApiPool()
+    api: Final = FakeApi(7)
+
+    pool.add(7, api)
+    assert len(pool) == 1
+    assert 7 in pool
+    assert pool[7] is api
+    assert pool.keys() == (7,)
+
+    pool.remove(7)
+    assert 7 not in pool
+    assert len(pool) == 0
@@ -0,0 +1,97 @@
+"""Tests for rate limiting."""
+from typing import List
+
+import pytest
+from typing_extensions import Final
+from withings_api.ratelimit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock instead of sleeping."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_reserve() -> None:
+    """Test function."""
+    clock: Final = FakeClock()
+    bucket: Final = TokenBucket(rate=2, burst=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+    clock.now = 10
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_token_bucket_adapts() -> None:
+    """Test function."""
+    clock: Final = FakeClock()
+    bucket: Final = TokenBucket(
+        rate=4, burst=4, min_rate=1, recovery_step=0.25, clock=clock
+    )
+
+    bucket.on_throttled()
+    assert bucket.rate == 2
+    assert bucket.reserve() == 0.5
+    bucket.on_throttled()
+    bucket.on_throttled()
+    assert bucket.rate == 1
+
+    bucket.on_success()
+    assert bucket.rate == 2
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rate == 4
+
+
+def test_rate_limiter_users() -> None:
+    """Test function."""
+    clock: Final = FakeClock()
+    limiter: Final = RateLimiter(
+        rate=10, burst=10, user_rate=1, user_burst=1, clock=clock, sleep=clock.sleep
+    )
+    user1: Final = limiter.for_user(1)
+    user2: Final = limiter.for_user(2)
+
+    assert limiter.for_user(1) is user1
+    user1.acquire()
+    user2.acquire()
+    assert clock.sleeps == []
+
+    user1.acquire()
+    assert clock.sleeps == [1.0]
+
+    user1.on_throttled()
+    assert limiter.client_bucket.rate == 5
+    assert limiter.for_user(2).reserve() > 0
+    user1.on_success()
+    assert limiter.client_bucket.rate == 5.5
+
+
+def test_rate_limiter_without_user_rate() -> None:
+    """Test function."""
+    clock: Final = FakeClock()
+    limiter: Final = RateLimiter(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+
+    limiter.for_user(1).acquire()
+    limiter.for_user(2).acquire()
+    assert clock.sleeps == [1.0]
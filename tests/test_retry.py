@@ -0,0 +1,97 @@
+"""Tests for retrying."""
+import asyncio
+from typing import Any, List
+
+import pytest
+import requests
+from typing_extensions import Final
+from withings_api.common import (
+    AuthFailedException,
+    TimeoutException,
+    TooManyRequestsException,
+)
+from withings_api.retry import RetryPolicy
+
+
+class Flaky:
+    """Callable failing a number of times before succeeding."""
+
+    def __init__(self, *failures: Exception):
+        """Initialize."""
+        self.failures = list(failures)
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return "ok"
+
+
+def test_is_retryable() -> None:
+    """Test function."""
+    policy: Final = RetryPolicy()
+
+    assert policy.is_retryable(TimeoutException(522))
+    assert policy.is_retryable(TooManyRequestsException(601))
+    assert not policy.is_retryable(AuthFailedException(100))
+    assert policy.is_retryable(requests.ConnectionError())
+    assert policy.is_retryable(requests.Timeout())
+    assert not policy.is_retryable(ValueError())
+    assert not RetryPolicy(retryable_statuses=()).is_retryable(TimeoutException(522))
+
+
+def test_backoff() -> None:
+    """Test function."""
+    policy: Final = RetryPolicy(backoff_base=1, backoff_max=5)
+
+    for _ in range(100):
+        assert 0 <= policy.backoff(1) <= 1
+        assert 0 <= policy.backoff(3) <= 4
+        assert 0 <= policy.backoff(10) <= 5
+
+
+def test_call_retries() -> None:
+    """Test function."""
+    sleeps: Final[List[float]] = []
+    func: Final = Flaky(TimeoutException(522), requests.ConnectionError())
+
+    assert RetryPolicy().call(func, sleep=sleeps.append) == "ok"
+    assert func.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_call_gives_up() -> None:
+    """Test function."""
+    sleeps: Final[List[float]] = []
+
+    func: Any = Flaky(TimeoutException(522), TimeoutException(522))
+    with pytest.raises(TimeoutException):
+        RetryPolicy(max_attempts=2).call(func, sleep=sleeps.append)
+    assert func.calls == 2
+
+    func = Flaky(AuthFailedException(100))
+    with pytest.raises(AuthFailedException):
+        RetryPolicy().call(func, sleep=sleeps.append)
+    assert func.calls == 1
+
+    func = Flaky(TimeoutException(522))
+    now: Final = iter((0.0, 100.0))
+    with pytest.raises(TimeoutException):
+        RetryPolicy(deadline=10).call(
+            func, sleep=sleeps.append, clock=lambda: next(now)
+        )
+    assert func.calls == 1
+    assert len(sleeps) == 1
+
+
+def test_call_async() -> None:
+    """Test function."""
+    flaky: Final = Flaky(TooManyRequestsException(601))
+
+    async def func() -> str:
+        return flaky()
+
+    policy: Final = RetryPolicy(backoff_base=0.001)
+    assert asyncio.run(policy.call_async(func)) == "ok"
+    assert flaky.calls == 2
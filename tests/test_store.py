@@ -0,0 +1,183 @@
+"""Tests for the measure store."""
+import math
+
+import arrow
+import pytest
+from typing_extensions import Final
+from withings_api.common import (
+    MeasureGetMeasGroup,
+    MeasureGetMeasGroupAttrib,
+    MeasureGetMeasGroupCategory,
+    MeasureGetMeasResponse,
+    MeasureGroupRecord,
+    MeasureType,
+    MeasureValue,
+    get_measure_value,
+    parse_trusted,
+    query_measure_groups,
+)
+from withings_api.store import MeasureStore
+
+from .common import GROUPS, meas_group, new_response
+
+
+def test_measure_store() -> None:
+    """Test function."""
+    response: Final = new_response(GROUPS)
+    store: Final = MeasureStore(response)
+    assert len(store) == 4
+    assert 3 in store
+    assert 5 not in store
+    assert store.get_group(3) == response.measuregrps[2]
+    assert store.get_group(5) is None
+    assert [group.grpid for group in store] == [4, 2, 3, 1]
+
+    weights: Final = store.query(MeasureType.WEIGHT)
+    assert [group.grpid for group in weights] == [2, 3, 1]
+    assert weights[0] is response.measuregrps[1]
+    assert weights[1].measures == response.measuregrps[2].measures[:1]
+    assert weights[1].date == arrow.get(200)
+    assert weights == query_measure_groups(store.query(), MeasureType.WEIGHT)[1:]
+
+    assert [
+        group.grpid
+        for group in store.query(
+            (MeasureType.WEIGHT, MeasureType.HEART_RATE),
+            MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY,
+        )
+    ] == [3]
+    assert store.query(MeasureType.HEIGHT, with_group_attrib=()) == ()
+    assert [
+        group.grpid
+        for group in store.query(with_category=MeasureGetMeasGroupCategory.REAL)
+    ] == [2, 3, 1]
+    assert store.query(MeasureType.DIASTOLIC_BLOOD_PRESSURE) == ()
+
+    assert store.get_measure_value(MeasureType.WEIGHT) == 71.0
+    assert store.get_measure_value(
+        MeasureType.WEIGHT, MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY
+    ) == pytest.approx(72.0)
+    assert store.get_measure_value(MeasureType.FAT_RATIO) == 20.0
+    assert store.get_measure_value(MeasureType.DIASTOLIC_BLOOD_PRESSURE) is None
+    assert store.get_measure_values(
+        (MeasureType.WEIGHT, MeasureType.FAT_RATIO, MeasureType.HEIGHT)
+    ) == {
+        MeasureType.WEIGHT: MeasureValue(71.0, arrow.get(300)),
+        MeasureType.FAT_RATIO: MeasureValue(20.0, arrow.get(100)),
+        MeasureType.HEIGHT: MeasureValue(1.8, arrow.get(400)),
+    }
+    manual: Final = store.get_measure_values(
+        (MeasureType.WEIGHT,), MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY
+    )
+    assert list(manual) == [MeasureType.WEIGHT]
+    assert manual[MeasureType.WEIGHT].date == arrow.get(200)
+    assert math.isclose(manual[MeasureType.WEIGHT].value, 72.0)
+    for meastype in (MeasureType.WEIGHT, MeasureType.HEIGHT, MeasureType.FAT_RATIO):
+        assert store.get_measure_value(meastype) == get_measure_value(
+            store.query(), meastype
+        )
+
+
+def test_measure_store_changes() -> None:
+    """Test function."""
+    store: Final = MeasureStore()
+    assert store.get_measure_value(MeasureType.WEIGHT) is None
+
+    store.add(MeasureGetMeasGroup(**GROUPS[0]))
+    store.add([MeasureGetMeasGroup(**GROUPS[1])])
+    assert store.get_measure_value(MeasureType.WEIGHT) == 71.0
+
+    store.add(MeasureGetMeasGroup(**meas_group(2, 50, {MeasureType.FAT_RATIO: 250})))
+    assert len(store) == 2
+    assert store.get_measure_value(MeasureType.WEIGHT) == 70.0
+    assert store.get_measure_value(MeasureType.FAT_RATIO) == 20.0
+
+    store.remove(1)
+    assert store.get_measure_value(MeasureType.WEIGHT) is None
+    assert store.get_measure_value(MeasureType.FAT_RATIO) == 25.0
+    with pytest.raises(KeyError):
+        store.remove(1)
+
+
+def test_measure_store_records() -> None:
+    """Test function."""
+    response: Final = parse_trusted(
+        MeasureGetMeasResponse, new_response(GROUPS).dict(), records=True,
+    )
+    store: Final = MeasureStore(response)
+    weights: Final = store.query(MeasureType.WEIGHT)
+    assert all(isinstance(group, MeasureGroupRecord) for group in weights)
+    assert weights[1].measures == response.measuregrps[2].measures[:1]
+    assert store.get_measure_value(MeasureType.HEART_RATE) == 60.0
+
+
+def test_measure_store_date_range() -> None:
+    """Test function."""
+    pages: Final = [
+        new_response(
+            [
+                meas_group(grpid, date, {MeasureType.WEIGHT: 700 + grpid})
+                for grpid, date in page
+            ]
+        )
+        for page in (
+            ((5, 500), (6, 600)),
+            ((1, 100), (2, 200), (3, 200)),
+            ((4, 400), (6, 300)),
+        )
+    ]
+    store: Final = MeasureStore(*pages)
+    assert [group.grpid for group in store] == [5, 4, 6, 2, 3, 1]
+
+    assert [group.grpid for group in store.query(start=200, end=400)] == [4, 6, 2, 3]
+    assert [group.grpid for group in store.query(start=arrow.get(401))] == [5]
+    assert [group.grpid for group in store.query(end="1970-01-01T00:03:20")] == [
+        2,
+        3,
+        1,
+    ]
+    assert store.query(start=201, end=299) == ()
+    assert store.query(MeasureType.HEIGHT, start=0) == ()
+    assert (
+        store.query(
+            with_group_attrib=MeasureGetMeasGroupAttrib.MANUAL_USER_ENTRY, start=0
+        )
+        == ()
+    )
+    assert (
+        store.query(with_category=MeasureGetMeasGroupCategory.USER_OBJECTIVES, start=0)
+        == ()
+    )
+    assert store.query(start=200, end=400) == query_measure_groups(
+        store.query(), start=200, end=400
+    )
+
+    assert store.get_measure_value(MeasureType.WEIGHT, end=450) == 70.4
+    assert store.get_measure_value(MeasureType.WEIGHT, start=700) is None
+    assert store.get_measure_values((MeasureType.WEIGHT,), start=100, end=250) == {
+        MeasureType.WEIGHT: MeasureValue(70.2, arrow.get(200))
+    }
+
+    store.remove(4)
+    store.add(MeasureGetMeasGroup(**meas_group(2, 50, {MeasureType.WEIGHT: 1})))
+    assert [group.grpid for group in store] == [5, 6, 3, 1, 2]
+    assert [group.grpid for group in store.query(start=50, end=100)] == [1, 2]
+
+
+def test_measure_store_same_date() -> None:
+    """Test function."""
+    groups: Final = [
+        meas_group(grpid, 100, {MeasureType.WEIGHT: 700 + grpid * 10})
+        for grpid in (3, 1, 2)
+    ]
+    store: Final = MeasureStore(new_response(groups))
+    assert [group.grpid for group in store] == [1, 2, 3]
+    assert [group.grpid for group in store.query(start=100)] == [1, 2, 3]
+    assert store.get_measure_value(MeasureType.WEIGHT) == 71.0
+    assert store.get_measure_value(MeasureType.WEIGHT, end=100) == 71.0
+    assert store.get_measure_values((MeasureType.WEIGHT,)) == {
+        MeasureType.WEIGHT: MeasureValue(71.0, arrow.get(100))
+    }
+    assert store.get_measure_value(MeasureType.WEIGHT) == get_measure_value(
+        store.query(), with_measure_type=MeasureType.WEIGHT
+    )
@@ -0,0 +1,80 @@
+"""Tests for incremental JSON decoding."""
+import json
+from typing import Any, List
+
+import pytest
+from typing_extensions import Final
+from withings_api.stream import JsonItemStream
+
+_DOCUMENT: Final = {
+    "status": 0,
+    "body": {
+        "series": [1, -2.5, 1e-07, True, None, "é", {"a": [1, {}]}, []],
+        "empty": {},
+        "more": True,
+        "offset": 12345,
+    },
+}
+
+
+def chunked(document: Any, size: int) -> List[bytes]:
+    """Split an encoded document in chunks of size bytes."""
+    data: Final = json.dumps(document, indent=1).encode()
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_json_item_stream(size: int) -> None:
+    """Test function."""
+    stream: Final = JsonItemStream(chunked(_DOCUMENT, size), ("body", "series"))
+    assert stream.rest is None
+    assert list(stream) == _DOCUMENT["body"]["series"]  # type: ignore
+    assert stream.rest == {
+        "status": 0,
+        "body": {"empty": {}, "more": True, "offset": 12345},
+    }
+
+    with pytest.raises(RuntimeError):
+        list(stream)
+
+
+def test_json_item_stream_is_lazy() -> None:
+    """Test function."""
+    chunks: Final = iter(chunked(_DOCUMENT, 1))
+    items: Final = iter(JsonItemStream(chunks, ("body", "series")))
+    assert next(items) == 1
+    assert next(chunks) is not None
+
+
+def test_json_item_stream_missing_path() -> None:
+    """Test function."""
+    for document in (
+        {"status": 601},
+        {"status": 0, "body": {}},
+        {"status": 0, "body": {"series": {}}},
+        {"status": 0, "body": []},
+        {},
+    ):
+        stream = JsonItemStream(chunked(document, 3), ("body", "series"))
+        assert list(stream) == []
+        assert stream.rest == document
+
+    with pytest.raises(ValueError):
+        JsonItemStream([], ())
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"[]",
+        b'{"body": {"series": [1 2]}}',
+        b'{"body"',
+        b'{"a": 1.',
+        b'{"a": tru}',
+    ],
+)
+def test_json_item_stream_invalid(data: bytes) -> None:
+    """Test function."""
+    with pytest.raises(json.JSONDecodeError):
+        list(JsonItemStream([data[:2], data[2:]], ("body", "series")))
@@ -0,0 +1,134 @@
+"""Tests for incremental syncing."""
+from typing import Any, Dict, List
+
+import arrow
+from typing_extensions import Final
+from withings_api import AbstractWithingsApi
+from withings_api.sync import (
+    ENDPOINT_MEASURE_GET_ACTIVITY,
+    ENDPOINT_MEASURE_GET_MEAS,
+    ENDPOINT_SLEEP_GET_SUMMARY,
+    MemoryCursorStore,
+    SqliteCursorStore,
+    WithingsSync,
+)
+
+from .common import ACTIVITY, TIMEZONE_STR0, meas_group
+
+
+class FakeApi(AbstractWithingsApi):
+    """Serves pages of items modified after lastupdate."""
+
+    def __init__(self, key: str, items: List[dict], updatetime: int = 1000):
+        """Initialize."""
+        self.key = key
+        self.items = items
+        self.updatetime = updatetime
+        self.calls: List[Dict[str, Any]] = []
+
+    def _request(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Dict[str, Any]:
+        self.calls.append(params)
+        offset: Final = params.get("offset", 0)
+        items: Final = [
+            item
+            for item in self.items
+            if item.get("modified", item["date"]) > params["lastupdate"]
+        ]
+        return {
+            "status": 0,
+            "body": {
+                self.key: items[offset : offset + 2],
+                "more": offset + 2 < len(items),
+                "offset": offset + 2,
+                "timezone": TIMEZONE_STR0,
+                "updatetime": self.updatetime,
+            },
+        }
+
+
+def sleep_summary(modified: int) -> dict:
+    """Create a raw sleep summary."""
+    return {
+        "timezone": TIMEZONE_STR0,
+        "model": 32,
+        "startdate": 1,
+        "enddate": 2,
+        "date": 1,
+        "modified": modified,
+        "data": {},
+    }
+
+
+def test_sync_measures() -> None:
+    """Test function."""
+    api: Final = FakeApi(
+        "measuregrps", [meas_group(grpid, grpid * 10, {}) for grpid in range(1, 6)]
+    )
+    store: Final = MemoryCursorStore()
+    sync: Final = WithingsSync(api, store, userid=1)
+
+    groups = sync.sync_measures()
+    assert next(groups).grpid == 1
+    assert sync.get_cursor(ENDPOINT_MEASURE_GET_MEAS) == 0
+    assert [group.grpid for group in groups] == [2, 3, 4, 5]
+    assert sync.get_cursor(ENDPOINT_MEASURE_GET_MEAS) == 1000
+    assert api.calls[0]["lastupdate"] == 0
+    assert "startdate" not in api.calls[0]
+    assert "enddate" not in api.calls[0]
+
+    api.items.append(meas_group(6, 1001, {}))
+    api.updatetime = 2000
+    assert [group.grpid for group in sync.sync_measures()] == [6]
+    assert api.calls[-1]["lastupdate"] == 1000
+    assert store.get_cursor(1, ENDPOINT_MEASURE_GET_MEAS) == 2000
+    assert store.get_cursor(2, ENDPOINT_MEASURE_GET_MEAS) is None
+
+
+def test_sync_sleep_summary() -> None:
+    """Test function."""
+    api: Final = FakeApi("series", [sleep_summary(modified) for modified in (5, 9, 7)])
+    sync: Final = WithingsSync(api, MemoryCursorStore(), userid=1, initial=3)
+
+    assert len(tuple(sync.sync_sleep_summary())) == 3
+    assert api.calls[0]["lastupdate"] == 3
+    assert sync.get_cursor(ENDPOINT_SLEEP_GET_SUMMARY) == 9
+
+    assert tuple(sync.sync_sleep_summary()) == ()
+    assert sync.get_cursor(ENDPOINT_SLEEP_GET_SUMMARY) == 9
+
+    sync.reset(ENDPOINT_SLEEP_GET_SUMMARY, 6)
+    assert len(tuple(sync.sync_sleep_summary())) == 2
+    sync.reset(ENDPOINT_SLEEP_GET_SUMMARY)
+    assert sync.get_cursor(ENDPOINT_SLEEP_GET_SUMMARY) == 3
+
+
+def test_sync_activity() -> None:
+    """Test function."""
+    activity: Final = {**ACTIVITY, "modified": 10}
+    api: Final = FakeApi("activities", [activity])
+    sync: Final = WithingsSync(api, MemoryCursorStore(), userid=1)
+
+    before: Final = arrow.utcnow().int_timestamp
+    assert len(tuple(sync.sync_activity())) == 1
+    assert "startdateymd" not in api.calls[0]
+    assert sync.get_cursor(ENDPOINT_MEASURE_GET_ACTIVITY) >= before
+
+
+def test_sqlite_cursor_store(tmp_path: Any) -> None:
+    """Test function."""
+    path: Final = str(tmp_path / "cursors.db")
+    store = SqliteCursorStore(path)
+
+    assert store.get_cursor(1, ENDPOINT_MEASURE_GET_MEAS) is None
+    store.set_cursor(1, ENDPOINT_MEASURE_GET_MEAS, 10)
+    store.set_cursor(1, ENDPOINT_MEASURE_GET_MEAS, 20)
+    store.set_cursor(2, ENDPOINT_MEASURE_GET_MEAS, 30)
+    store.close()
+
+    store = SqliteCursorStore(path)
+    assert store.get_cursor(1, ENDPOINT_MEASURE_GET_MEAS) == 20
+    assert store.get_cursor(2, ENDPOINT_MEASURE_GET_MEAS) == 30
+    assert store.get_cursor(1, ENDPOINT_SLEEP_GET_SUMMARY) is None
+    store.close()
@@ -5,28 +5,50 @@ Withings Health API
 <https://developer.health.withings.com/api>
 """
 from abc import abstractmethod
-import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from types import LambdaType
-from typing import Any, Callable, Dict, Iterable, Optional, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import arrow
-from oauthlib.common import to_unicode
 from oauthlib.oauth2 import WebApplicationClient
+from pydantic import BaseModel
 from requests import Response
+from requests.adapters import HTTPAdapter
 from requests_oauthlib import OAuth2Session
 from typing_extensions import Final
 
+from . import codec
+from .cache import AbstractResponseCache, UserResponseCache
 from .common import (
     AuthScope,
     Credentials2,
     CredentialsType,
+    DateType,
     GetActivityField,
     GetSleepField,
     GetSleepSummaryField,
+    GetSleepSummarySerie,
     HeartGetResponse,
     HeartListResponse,
+    HeartListSerie,
+    MeasureGetActivityActivity,
     MeasureGetActivityResponse,
+    MeasureGetMeasGroup,
     MeasureGetMeasGroupCategory,
     MeasureGetMeasResponse,
     MeasureType,
@@ -35,13 +57,19 @@ from .common import (
     NotifyListResponse,
     SleepGetResponse,
     SleepGetSummaryResponse,
+    TooManyRequestsException,
     UserGetDeviceResponse,
     maybe_upgrade_credentials,
+    parse_lazy,
+    parse_trusted,
     response_body_or_raise,
 )
+from .ratelimit import RateLimiter, UserRateLimiter
+from .retry import RetryPolicy
+from .stream import DEFAULT_CHUNK_SIZE, JsonItemStream
 
-DateType = Union[arrow.Arrow, datetime.date, datetime.datetime, int, str]
 ParamsType = Dict[str, Union[str, int, bool]]
+ModelType = TypeVar("ModelType", bound=BaseModel)
 
 
 def update_params(
@@ -73,7 +101,7 @@ def adjust_withings_token(response: Response) -> Response:
         }
     """
     try:
-        token = json.loads(response.text)
+        token = codec.loads(response.content)
     except Exception:  # pylint: disable=broad-except
         # If there was exception, just return unmodified response
         return response
@@ -86,13 +114,262 @@ def adjust_withings_token(response: Response) -> Response:
         # Put body content at root level
         token.update(body)
     # pylint: disable=protected-access
-    response._content = to_unicode(json.dumps(token)).encode("UTF-8")
+    response._content = codec.dumps(token)
 
     return response
 
 
-class AbstractWithingsApi:
-    """Abstract class for customizing which requests module you want."""
+def _measure_get_activity_params(
+    data_fields: Iterable[GetActivityField],
+    startdateymd: Optional[DateType],
+    enddateymd: Optional[DateType],
+    offset: Optional[int],
+    lastupdate: Optional[DateType],
+) -> ParamsType:
+    """Build the params for measure_get_activity."""
+    params: Final[ParamsType] = {}
+
+    update_params(
+        params,
+        "startdateymd",
+        startdateymd,
+        lambda val: arrow.get(val).format("YYYY-MM-DD"),
+    )
+    update_params(
+        params,
+        "enddateymd",
+        enddateymd,
+        lambda val: arrow.get(val).format("YYYY-MM-DD"),
+    )
+    update_params(params, "offset", offset)
+    update_params(
+        params,
+        "data_fields",
+        data_fields,
+        lambda fields: ",".join([field.value for field in fields]),
+    )
+    update_params(
+        params, "lastupdate", lastupdate, lambda val: arrow.get(val).int_timestamp
+    )
+    update_params(params, "action", "getactivity")
+
+    return params
+
+
+def _measure_get_meas_params(
+    meastype: Optional[MeasureType],
+    category: Optional[MeasureGetMeasGroupCategory],
+    startdate: Optional[DateType],
+    enddate: Optional[DateType],
+    offset: Optional[int],
+    lastupdate: Optional[DateType],
+) -> ParamsType:
+    """Build the params for measure_get_meas."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "meastype", meastype, lambda val: val.value)
+    update_params(params, "category", category, lambda val: val.value)
+    update_params(
+        params, "startdate", startdate, lambda val: arrow.get(val).int_timestamp
+    )
+    update_params(params, "enddate", enddate, lambda val: arrow.get(val).int_timestamp)
+    update_params(params, "offset", offset)
+    update_params(
+        params, "lastupdate", lastupdate, lambda val: arrow.get(val).int_timestamp
+    )
+    update_params(params, "action", "getmeas")
+
+    return params
+
+
+def _sleep_get_params(
+    data_fields: Iterable[GetSleepField],
+    startdate: Optional[DateType],
+    enddate: Optional[DateType],
+) -> ParamsType:
+    """Build the params for sleep_get."""
+    params: Final[ParamsType] = {}
+
+    update_params(
+        params, "startdate", startdate, lambda val: arrow.get(val).int_timestamp
+    )
+    update_params(params, "enddate", enddate, lambda val: arrow.get(val).int_timestamp)
+    update_params(
+        params,
+        "data_fields",
+        data_fields,
+        lambda fields: ",".join([field.value for field in fields]),
+    )
+    update_params(params, "action", "get")
+
+    return params
+
+
+def _sleep_get_summary_params(
+    data_fields: Iterable[GetSleepSummaryField],
+    startdateymd: Optional[DateType],
+    enddateymd: Optional[DateType],
+    offset: Optional[int],
+    lastupdate: Optional[DateType],
+) -> ParamsType:
+    """Build the params for sleep_get_summary."""
+    params: Final[ParamsType] = {}
+
+    update_params(
+        params,
+        "startdateymd",
+        startdateymd,
+        lambda val: arrow.get(val).format("YYYY-MM-DD"),
+    )
+    update_params(
+        params,
+        "enddateymd",
+        enddateymd,
+        lambda val: arrow.get(val).format("YYYY-MM-DD"),
+    )
+    update_params(
+        params,
+        "data_fields",
+        data_fields,
+        lambda fields: ",".join([field.value for field in fields]),
+    )
+    update_params(params, "offset", offset)
+    update_params(
+        params, "lastupdate", lastupdate, lambda val: arrow.get(val).int_timestamp
+    )
+    update_params(params, "action", "getsummary")
+
+    return params
+
+
+def _heart_get_params(signalid: int) -> ParamsType:
+    """Build the params for heart_get."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "signalid", signalid)
+    update_params(params, "action", "get")
+
+    return params
+
+
+def _heart_list_params(
+    startdate: Optional[DateType], enddate: Optional[DateType], offset: Optional[int],
+) -> ParamsType:
+    """Build the params for heart_list."""
+    params: Final[ParamsType] = {}
+
+    update_params(
+        params, "startdate", startdate, lambda val: arrow.get(val).int_timestamp,
+    )
+    update_params(
+        params, "enddate", enddate, lambda val: arrow.get(val).int_timestamp,
+    )
+    update_params(params, "offset", offset)
+    update_params(params, "action", "list")
+
+    return params
+
+
+def _notify_get_params(callbackurl: str, appli: Optional[NotifyAppli]) -> ParamsType:
+    """Build the params for notify_get."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "callbackurl", callbackurl)
+    update_params(params, "appli", appli, lambda appli: appli.value)
+    update_params(params, "action", "get")
+
+    return params
+
+
+def _notify_list_params(appli: Optional[NotifyAppli]) -> ParamsType:
+    """Build the params for notify_list."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "appli", appli, lambda appli: appli.value)
+    update_params(params, "action", "list")
+
+    return params
+
+
+def _notify_revoke_params(
+    callbackurl: Optional[str], appli: Optional[NotifyAppli]
+) -> ParamsType:
+    """Build the params for notify_revoke."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "callbackurl", callbackurl)
+    update_params(params, "appli", appli, lambda appli: appli.value)
+    update_params(params, "action", "revoke")
+
+    return params
+
+
+def _notify_subscribe_params(
+    callbackurl: str, appli: Optional[NotifyAppli], comment: Optional[str],
+) -> ParamsType:
+    """Build the params for notify_subscribe."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "callbackurl", callbackurl)
+    update_params(params, "appli", appli, lambda appli: appli.value)
+    update_params(params, "comment", comment)
+    update_params(params, "action", "subscribe")
+
+    return params
+
+
+def _notify_update_params(
+    callbackurl: str,
+    appli: NotifyAppli,
+    new_callbackurl: str,
+    new_appli: Optional[NotifyAppli],
+    comment: Optional[str],
+) -> ParamsType:
+    """Build the params for notify_update."""
+    params: Final[ParamsType] = {}
+
+    update_params(params, "callbackurl", callbackurl)
+    update_params(params, "appli", appli, lambda appli: appli.value)
+    update_params(params, "new_callbackurl", new_callbackurl)
+    update_params(params, "new_appli", new_appli, lambda new_appli: new_appli.value)
+    update_params(params, "comment", comment)
+    update_params(params, "action", "update")
+
+    return params
+
+
+def _split_range(start: int, end: int, windows: int) -> List[Tuple[int, int]]:
+    """Split the timestamps from start to end included into windows."""
+    count: Final = max(1, min(windows, end - start + 1))
+    bounds: Final = [
+        start + (end - start + 1) * index // count for index in range(count)
+    ]
+    return [
+        (bound, next_bound - 1) for bound, next_bound in zip(bounds, bounds[1:])
+    ] + [(bounds[-1], end)]
+
+
+def _merge_meas_responses(
+    pages: List[MeasureGetMeasResponse],
+) -> MeasureGetMeasResponse:
+    """Merge pages into one response, deduplicated by grpid and newest first."""
+    groups: Final = {group.grpid: group for page in pages for group in page.measuregrps}
+    latest: Final = max(pages, key=lambda page: page.updatetime)
+
+    # Everything was validated already, skip validating it again.
+    return MeasureGetMeasResponse.construct(
+        measuregrps=tuple(
+            sorted(groups.values(), key=lambda group: group.date, reverse=True)
+        ),
+        more=False,
+        offset=0,
+        timezone=latest.timezone,
+        updatetime=latest.updatetime,
+    )
+
+
+class BaseWithingsApi:
+    """Paths, settings and response parsing shared by the sync and async apis."""
 
     URL: Final = "https://wbsapi.withings.net"
     PATH_V2_USER: Final = "v2/user"
@@ -102,6 +379,91 @@ class AbstractWithingsApi:
     PATH_NOTIFY: Final = "notify"
     PATH_V2_HEART: Final = "v2/heart"
 
+    _rate_limiter: Optional[UserRateLimiter] = None
+    _retry_policy: Optional[RetryPolicy] = None
+    _response_cache: Optional[UserResponseCache] = None
+    _trusted_parsing: bool = False
+    _records: bool = False
+    _lazy_parsing: bool = False
+
+    def _parse_response(
+        self,
+        model: Type[ModelType],
+        body: Dict[str, Any],
+        records: Optional[bool] = None,
+    ) -> ModelType:
+        """Create the model of a response body."""
+        if records is None:
+            records = self._records
+        if self._lazy_parsing:
+            return parse_lazy(
+                model, body, trusted=self._trusted_parsing, records=records
+            )
+        if records:
+            return parse_trusted(model, body, records=True)
+        if self._trusted_parsing:
+            return parse_trusted(model, body)
+        return model(**body)
+
+    def invalidate_response_cache(self, path: Optional[str] = None) -> None:
+        """Drop the cached responses of this user, optionally only of a path."""
+        if self._response_cache is not None:
+            self._response_cache.invalidate(path)
+
+
+class UserWithingsApi(BaseWithingsApi):
+    """Credentials and settings of the api of a single user."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        credentials: CredentialsType,
+        refresh_cb: Optional[Callable[[Credentials2], None]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        response_cache: Optional[AbstractResponseCache] = None,
+        trusted_parsing: bool = False,
+        records: bool = False,
+        lazy_parsing: bool = False,
+    ):
+        """Initialize new object."""
+        self._credentials = maybe_upgrade_credentials(credentials)
+        self._refresh_cb: Final = refresh_cb or self._blank_refresh_cb
+        if rate_limiter is not None:
+            self._rate_limiter = rate_limiter.for_user(self._credentials.userid)
+        self._retry_policy = retry_policy
+        if response_cache is not None:
+            self._response_cache = response_cache.for_user(self._credentials.userid)
+        self._trusted_parsing = trusted_parsing
+        self._records = records
+        self._lazy_parsing = lazy_parsing
+
+    def _blank_refresh_cb(self, creds: Credentials2) -> None:
+        """The default callback which does nothing."""
+
+    def get_credentials(self) -> Credentials2:
+        """Get the current oauth credentials."""
+        return self._credentials
+
+    def _update_token(self, token: Dict[str, Union[str, int]]) -> None:
+        """Set the oauth token."""
+        self._credentials = Credentials2(
+            access_token=token["access_token"],
+            expires_in=token["expires_in"],
+            token_type=self._credentials.token_type,
+            refresh_token=token["refresh_token"],
+            userid=self._credentials.userid,
+            client_id=self._credentials.client_id,
+            consumer_secret=self._credentials.consumer_secret,
+        )
+
+        self._refresh_cb(self._credentials)
+
+
+class AbstractWithingsApi(BaseWithingsApi):  # pylint: disable=too-many-public-methods
+    """Abstract class for customizing which requests module you want."""
+
     @abstractmethod
     def _request(
         self, path: str, params: Dict[str, Any], method: str = "GET"
@@ -112,9 +474,91 @@ class AbstractWithingsApi:
         self, path: str, params: Dict[str, Any], method: str = "GET"
     ) -> Dict[str, Any]:
         """Request a specific service."""
-        return response_body_or_raise(
-            self._request(method=method, path=path, params=params)
+        response_cache: Final = self._response_cache if method == "GET" else None
+        if response_cache is not None:
+            cached: Final = response_cache.get(path, params)
+            if cached is not None:
+                return cached
+
+        retry_policy: Final = self._retry_policy
+        if retry_policy is None:
+            body = self._request_body(path=path, params=params, method=method)
+        else:
+            body = retry_policy.call(
+                lambda: self._request_body(path=path, params=params, method=method)
+            )
+
+        if response_cache is not None:
+            response_cache.set(path, params, body)
+
+        return body
+
+    def _request_body(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Dict[str, Any]:
+        """Make a single rate limited request and return its body."""
+        rate_limiter: Final = self._rate_limiter
+        if rate_limiter is None:
+            return response_body_or_raise(
+                self._request(method=method, path=path, params=params)
+            )
+
+        rate_limiter.acquire()
+        try:
+            body: Final = response_body_or_raise(
+                self._request(method=method, path=path, params=params)
+            )
+        except TooManyRequestsException:
+            rate_limiter.on_throttled()
+            raise
+        rate_limiter.on_success()
+
+        return body
+
+    def _request_stream(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Iterable[bytes]:
+        """
+        Fetch data from the Withings API as chunks of the raw response.
+
+        Override it to really stream, this one fetches the whole response.
+        """
+        return (codec.dumps(self._request(method=method, path=path, params=params)),)
+
+    def _stream_items(
+        self,
+        model: Type[ModelType],
+        path: str,
+        params: Dict[str, Any],
+        key: str,
+        records: Optional[bool] = None,
+    ) -> Generator[ModelType, None, Dict[str, Any]]:
+        """
+        Make a single rate limited request, yielding the items of body[key].
+
+        Each item is parsed as soon as it was downloaded, the rest of the body
+        is returned.
+        """
+        rate_limiter: Final = self._rate_limiter
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        stream: Final = JsonItemStream(
+            self._request_stream(path=path, params=params), ("body", key)
         )
+        for item in stream:
+            yield self._parse_response(model, item, records)
+
+        try:
+            body: Final = response_body_or_raise(stream.rest)
+        except TooManyRequestsException:
+            if rate_limiter is not None:
+                rate_limiter.on_throttled()
+            raise
+        if rate_limiter is not None:
+            rate_limiter.on_success()
+
+        return body
 
     def user_get_device(self) -> UserGetDeviceResponse:
         """
@@ -122,8 +566,9 @@ class AbstractWithingsApi:
 
         Some data related to user profile are available through those services.
         """
-        return UserGetDeviceResponse(
-            **self.request(path=self.PATH_V2_USER, params={"action": "getdevice"})
+        return self._parse_response(
+            UserGetDeviceResponse,
+            self.request(path=self.PATH_V2_USER, params={"action": "getdevice"}),
         )
 
     def measure_get_activity(
@@ -133,37 +578,48 @@ class AbstractWithingsApi:
         enddateymd: Optional[DateType] = arrow.utcnow(),
         offset: Optional[int] = None,
         lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
     ) -> MeasureGetActivityResponse:
         """Get user created activities."""
-        params: Final[ParamsType] = {}
-
-        update_params(
-            params,
-            "startdateymd",
-            startdateymd,
-            lambda val: arrow.get(val).format("YYYY-MM-DD"),
-        )
-        update_params(
-            params,
-            "enddateymd",
-            enddateymd,
-            lambda val: arrow.get(val).format("YYYY-MM-DD"),
-        )
-        update_params(params, "offset", offset)
-        update_params(
-            params,
-            "data_fields",
-            data_fields,
-            lambda fields: ",".join([field.value for field in fields]),
-        )
-        update_params(
-            params, "lastupdate", lastupdate, lambda val: arrow.get(val).int_timestamp
+        return self._parse_response(
+            MeasureGetActivityResponse,
+            self.request(
+                path=self.PATH_V2_MEASURE,
+                params=_measure_get_activity_params(
+                    data_fields=data_fields,
+                    startdateymd=startdateymd,
+                    enddateymd=enddateymd,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+            ),
+            records,
         )
-        update_params(params, "action", "getactivity")
 
-        return MeasureGetActivityResponse(
-            **self.request(path=self.PATH_V2_MEASURE, params=params)
-        )
+    def iter_measure_get_activity(
+        self,
+        data_fields: Iterable[GetActivityField] = GetActivityField,
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> Iterator[MeasureGetActivityActivity]:
+        """Iterate over user created activities, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = self.measure_get_activity(
+                data_fields=data_fields,
+                startdateymd=startdateymd,
+                enddateymd=enddateymd,
+                offset=offset,
+                lastupdate=lastupdate,
+                records=records,
+            )
+            yield from response.activities
+
+            if not response.more:
+                return
+            offset = response.offset
 
     def measure_get_meas(
         self,
@@ -173,52 +629,157 @@ class AbstractWithingsApi:
         enddate: Optional[DateType] = arrow.utcnow(),
         offset: Optional[int] = None,
         lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
     ) -> MeasureGetMeasResponse:
         """Get measures."""
-        params: Final[ParamsType] = {}
-
-        update_params(params, "meastype", meastype, lambda val: val.value)
-        update_params(params, "category", category, lambda val: val.value)
-        update_params(
-            params, "startdate", startdate, lambda val: arrow.get(val).int_timestamp
-        )
-        update_params(
-            params, "enddate", enddate, lambda val: arrow.get(val).int_timestamp
-        )
-        update_params(params, "offset", offset)
-        update_params(
-            params, "lastupdate", lastupdate, lambda val: arrow.get(val).int_timestamp
+        return self._parse_response(
+            MeasureGetMeasResponse,
+            self.request(
+                path=self.PATH_MEASURE,
+                params=_measure_get_meas_params(
+                    meastype=meastype,
+                    category=category,
+                    startdate=startdate,
+                    enddate=enddate,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+            ),
+            records,
         )
-        update_params(params, "action", "getmeas")
 
-        return MeasureGetMeasResponse(
-            **self.request(path=self.PATH_MEASURE, params=params)
+    def iter_measure_get_meas(
+        self,
+        meastype: Optional[MeasureType] = None,
+        category: Optional[MeasureGetMeasGroupCategory] = None,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> Iterator[MeasureGetMeasGroup]:
+        """Iterate over measure groups, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = self.measure_get_meas(
+                meastype=meastype,
+                category=category,
+                startdate=startdate,
+                enddate=enddate,
+                offset=offset,
+                lastupdate=lastupdate,
+                records=records,
+            )
+            yield from response.measuregrps
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    def stream_measure_get_meas(
+        self,
+        meastype: Optional[MeasureType] = None,
+        category: Optional[MeasureGetMeasGroupCategory] = None,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> Iterator[MeasureGetMeasGroup]:
+        """
+        Iterate over measure groups while they are downloaded, following every page.
+
+        Unlike iter_measure_get_meas, pages are never held in memory as a
+        whole. The requests are rate limited but neither retried nor cached.
+        """
+        offset: Optional[int] = None
+        while True:
+            body = yield from self._stream_items(
+                MeasureGetMeasGroup,
+                path=self.PATH_MEASURE,
+                params=_measure_get_meas_params(
+                    meastype=meastype,
+                    category=category,
+                    startdate=startdate,
+                    enddate=enddate,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+                key="measuregrps",
+                records=records,
+            )
+
+            if not body.get("more"):
+                return
+            offset = body["offset"]
+
+    def measure_get_meas_windowed(
+        self,
+        startdate: DateType,
+        enddate: DateType,
+        meastype: Optional[MeasureType] = None,
+        category: Optional[MeasureGetMeasGroupCategory] = None,
+        windows: int = 4,
+        max_workers: Optional[int] = None,
+        records: Optional[bool] = None,
+    ) -> MeasureGetMeasResponse:
+        """
+        Get all measures of a large date range using concurrent requests.
+
+        The range is split into windows that are paged through in parallel.
+        The groups are merged into a single response, deduplicated by grpid
+        and sorted by date, newest first. The windows share the token, once
+        expired it is refreshed by a single request.
+        """
+        ranges: Final = _split_range(
+            arrow.get(startdate).int_timestamp,
+            arrow.get(enddate).int_timestamp,
+            windows,
         )
 
+        def fetch(window: Tuple[int, int]) -> List[MeasureGetMeasResponse]:
+            responses: Final[List[MeasureGetMeasResponse]] = []
+            offset: Optional[int] = None
+            while True:
+                response = self.measure_get_meas(
+                    meastype=meastype,
+                    category=category,
+                    startdate=window[0],
+                    enddate=window[1],
+                    offset=offset,
+                    lastupdate=None,
+                    records=records,
+                )
+                responses.append(response)
+                if not response.more:
+                    return responses
+                offset = response.offset
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(ranges)) as executor:
+            return _merge_meas_responses(
+                [
+                    page
+                    for window_pages in executor.map(fetch, ranges)
+                    for page in window_pages
+                ]
+            )
+
     def sleep_get(
         self,
         data_fields: Iterable[GetSleepField],
         startdate: Optional[DateType] = arrow.utcnow(),
         enddate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
     ) -> SleepGetResponse:
         """Get sleep data."""
-        params: Final[ParamsType] = {}
-
-        update_params(
-            params, "startdate", startdate, lambda val: arrow.get(val).int_timestamp
-        )
-        update_params(
-            params, "enddate", enddate, lambda val: arrow.get(val).int_timestamp
-        )
-        update_params(
-            params,
-            "data_fields",
-            data_fields,
-            lambda fields: ",".join([field.value for field in fields]),
+        return self._parse_response(
+            SleepGetResponse,
+            self.request(
+                path=self.PATH_V2_SLEEP,
+                params=_sleep_get_params(
+                    data_fields=data_fields, startdate=startdate, enddate=enddate
+                ),
+            ),
+            records,
         )
-        update_params(params, "action", "get")
-
-        return SleepGetResponse(**self.request(path=self.PATH_V2_SLEEP, params=params))
 
     def sleep_get_summary(
         self,
@@ -229,44 +790,78 @@ class AbstractWithingsApi:
         lastupdate: Optional[DateType] = arrow.utcnow(),
     ) -> SleepGetSummaryResponse:
         """Get sleep summary."""
-        params: Final[ParamsType] = {}
-
-        update_params(
-            params,
-            "startdateymd",
-            startdateymd,
-            lambda val: arrow.get(val).format("YYYY-MM-DD"),
-        )
-        update_params(
-            params,
-            "enddateymd",
-            enddateymd,
-            lambda val: arrow.get(val).format("YYYY-MM-DD"),
-        )
-        update_params(
-            params,
-            "data_fields",
-            data_fields,
-            lambda fields: ",".join([field.value for field in fields]),
-        )
-        update_params(params, "offset", offset)
-        update_params(
-            params, "lastupdate", lastupdate, lambda val: arrow.get(val).int_timestamp
+        return self._parse_response(
+            SleepGetSummaryResponse,
+            self.request(
+                path=self.PATH_V2_SLEEP,
+                params=_sleep_get_summary_params(
+                    data_fields=data_fields,
+                    startdateymd=startdateymd,
+                    enddateymd=enddateymd,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+            ),
         )
-        update_params(params, "action", "getsummary")
 
-        return SleepGetSummaryResponse(
-            **self.request(path=self.PATH_V2_SLEEP, params=params)
-        )
+    def iter_sleep_get_summary(
+        self,
+        data_fields: Iterable[GetSleepSummaryField],
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+    ) -> Iterator[GetSleepSummarySerie]:
+        """Iterate over sleep summary series, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = self.sleep_get_summary(
+                data_fields=data_fields,
+                startdateymd=startdateymd,
+                enddateymd=enddateymd,
+                offset=offset,
+                lastupdate=lastupdate,
+            )
+            yield from response.series
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    def stream_sleep_get_summary(
+        self,
+        data_fields: Iterable[GetSleepSummaryField],
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+    ) -> Iterator[GetSleepSummarySerie]:
+        """Iterate over sleep summary series while they are downloaded."""
+        offset: Optional[int] = None
+        while True:
+            body = yield from self._stream_items(
+                GetSleepSummarySerie,
+                path=self.PATH_V2_SLEEP,
+                params=_sleep_get_summary_params(
+                    data_fields=data_fields,
+                    startdateymd=startdateymd,
+                    enddateymd=enddateymd,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+                key="series",
+            )
+
+            if not body.get("more"):
+                return
+            offset = body["offset"]
 
     def heart_get(self, signalid: int) -> HeartGetResponse:
         """Get ECG recording."""
-        params: Final[ParamsType] = {}
-
-        update_params(params, "signalid", signalid)
-        update_params(params, "action", "get")
-
-        return HeartGetResponse(**self.request(path=self.PATH_V2_HEART, params=params))
+        return self._parse_response(
+            HeartGetResponse,
+            self.request(
+                path=self.PATH_V2_HEART, params=_heart_get_params(signalid=signalid)
+            ),
+        )
 
     def heart_list(
         self,
@@ -275,18 +870,53 @@ class AbstractWithingsApi:
         offset: Optional[int] = None,
     ) -> HeartListResponse:
         """Get heart list."""
-        params: Final[ParamsType] = {}
-
-        update_params(
-            params, "startdate", startdate, lambda val: arrow.get(val).int_timestamp,
-        )
-        update_params(
-            params, "enddate", enddate, lambda val: arrow.get(val).int_timestamp,
+        return self._parse_response(
+            HeartListResponse,
+            self.request(
+                path=self.PATH_V2_HEART,
+                params=_heart_list_params(
+                    startdate=startdate, enddate=enddate, offset=offset
+                ),
+            ),
         )
-        update_params(params, "offset", offset)
-        update_params(params, "action", "list")
 
-        return HeartListResponse(**self.request(path=self.PATH_V2_HEART, params=params))
+    def iter_heart_list(
+        self,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+    ) -> Iterator[HeartListSerie]:
+        """Iterate over heart list series, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = self.heart_list(
+                startdate=startdate, enddate=enddate, offset=offset
+            )
+            yield from response.series
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    def stream_heart_list(
+        self,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+    ) -> Iterator[HeartListSerie]:
+        """Iterate over heart list series while they are downloaded."""
+        offset: Optional[int] = None
+        while True:
+            body = yield from self._stream_items(
+                HeartListSerie,
+                path=self.PATH_V2_HEART,
+                params=_heart_list_params(
+                    startdate=startdate, enddate=enddate, offset=offset
+                ),
+                key="series",
+            )
+
+            if not body.get("more"):
+                return
+            offset = body["offset"]
 
     def notify_get(
         self, callbackurl: str, appli: Optional[NotifyAppli] = None
@@ -297,22 +927,22 @@ class AbstractWithingsApi:
         Return the last notification service that a user was subscribed to,
         and its expiry date.
         """
-        params: Final[ParamsType] = {}
-
-        update_params(params, "callbackurl", callbackurl)
-        update_params(params, "appli", appli, lambda appli: appli.value)
-        update_params(params, "action", "get")
-
-        return NotifyGetResponse(**self.request(path=self.PATH_NOTIFY, params=params))
+        return self._parse_response(
+            NotifyGetResponse,
+            self.request(
+                path=self.PATH_NOTIFY,
+                params=_notify_get_params(callbackurl=callbackurl, appli=appli),
+            ),
+        )
 
     def notify_list(self, appli: Optional[NotifyAppli] = None) -> NotifyListResponse:
         """List notification configuration for this user."""
-        params: Final[ParamsType] = {}
-
-        update_params(params, "appli", appli, lambda appli: appli.value)
-        update_params(params, "action", "list")
-
-        return NotifyListResponse(**self.request(path=self.PATH_NOTIFY, params=params))
+        return self._parse_response(
+            NotifyListResponse,
+            self.request(
+                path=self.PATH_NOTIFY, params=_notify_list_params(appli=appli)
+            ),
+        )
 
     def notify_revoke(
         self, callbackurl: Optional[str] = None, appli: Optional[NotifyAppli] = None
@@ -323,13 +953,11 @@ class AbstractWithingsApi:
         This service disables the notification between the API and the
         specified applications for the user.
         """
-        params: Final[ParamsType] = {}
-
-        update_params(params, "callbackurl", callbackurl)
-        update_params(params, "appli", appli, lambda appli: appli.value)
-        update_params(params, "action", "revoke")
-
-        self.request(path=self.PATH_NOTIFY, params=params)
+        self.request(
+            path=self.PATH_NOTIFY,
+            params=_notify_revoke_params(callbackurl=callbackurl, appli=appli),
+        )
+        self.invalidate_response_cache(self.PATH_NOTIFY)
 
     def notify_subscribe(
         self,
@@ -338,14 +966,13 @@ class AbstractWithingsApi:
         comment: Optional[str] = None,
     ) -> None:
         """Subscribe to receive notifications when new data is available."""
-        params: Final[ParamsType] = {}
-
-        update_params(params, "callbackurl", callbackurl)
-        update_params(params, "appli", appli, lambda appli: appli.value)
-        update_params(params, "comment", comment)
-        update_params(params, "action", "subscribe")
-
-        self.request(path=self.PATH_NOTIFY, params=params)
+        self.request(
+            path=self.PATH_NOTIFY,
+            params=_notify_subscribe_params(
+                callbackurl=callbackurl, appli=appli, comment=comment
+            ),
+        )
+        self.invalidate_response_cache(self.PATH_NOTIFY)
 
     def notify_update(
         self,
@@ -356,16 +983,32 @@ class AbstractWithingsApi:
         comment: Optional[str] = None,
     ) -> None:
         """Update the callbackurl and or appli of a created notification."""
-        params: Final[ParamsType] = {}
+        self.request(
+            path=self.PATH_NOTIFY,
+            params=_notify_update_params(
+                callbackurl=callbackurl,
+                appli=appli,
+                new_callbackurl=new_callbackurl,
+                new_appli=new_appli,
+                comment=comment,
+            ),
+        )
+        self.invalidate_response_cache(self.PATH_NOTIFY)
+
 
-        update_params(params, "callbackurl", callbackurl)
-        update_params(params, "appli", appli, lambda appli: appli.value)
-        update_params(params, "new_callbackurl", new_callbackurl)
-        update_params(params, "new_appli", new_appli, lambda new_appli: new_appli.value)
-        update_params(params, "comment", comment)
-        update_params(params, "action", "update")
+def create_http_adapter(
+    pool_maxsize: int = 10, pool_block: bool = False
+) -> HTTPAdapter:
+    """
+    Create a connection pool to share between many WithingsApi objects.
 
-        self.request(path=self.PATH_NOTIFY, params=params)
+    pool_maxsize is the number of connections kept alive per host. When
+    pool_block is set, requests wait for a free connection instead of
+    opening a throw away one once the pool is exhausted.
+    """
+    return HTTPAdapter(
+        pool_connections=2, pool_maxsize=pool_maxsize, pool_block=pool_block
+    )
 
 
 class WithingsAuth:
@@ -434,7 +1077,7 @@ class WithingsAuth:
         )
 
 
-class WithingsApi(AbstractWithingsApi):
+class WithingsApi(AbstractWithingsApi, UserWithingsApi):
     """
     Provides entrypoint for calling the withings api.
 
@@ -453,16 +1096,51 @@ class WithingsApi(AbstractWithingsApi):
     user = ...
     creds = ...
     api = WithingsApi(creds, refresh_cb=user.refresh_cb)
+
+    When serving many users, create one pool with ``create_http_adapter`` and
+    pass it as ``http_adapter`` to every WithingsApi so they share connections.
+    The tokens remain per object. In the same way, share one ``RateLimiter``
+    to keep all the users of your client_id under the request quota.
+
+    A ``response_cache`` such as ``SqliteResponseCache`` serves repeated
+    requests for closed date ranges without hitting the API. Its entries are
+    kept per user id, so it can be shared like the pool.
+
+    With ``trusted_parsing`` responses are not validated, see ``parse_trusted``.
+    It is much faster when fetching a lot of data.
+
+    With ``records`` measures, measure groups, activities and sleep values are
+    created as lightweight named tuples, which also skip validation. Endpoints
+    returning them accept ``records`` to choose per call.
+
+    With ``lazy_parsing`` lists of nested models, like the measure groups, are
+    only parsed when accessed, see ``parse_lazy``. Paging through responses
+    without reading every item gets almost free.
     """
 
     def __init__(
         self,
         credentials: CredentialsType,
         refresh_cb: Optional[Callable[[Credentials2], None]] = None,
+        http_adapter: Optional[HTTPAdapter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        response_cache: Optional[AbstractResponseCache] = None,
+        trusted_parsing: bool = False,
+        records: bool = False,
+        lazy_parsing: bool = False,
     ):
         """Initialize new object."""
-        self._credentials = maybe_upgrade_credentials(credentials)
-        self._refresh_cb: Final = refresh_cb or self._blank_refresh_cb
+        super().__init__(
+            credentials,
+            refresh_cb=refresh_cb,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            response_cache=response_cache,
+            trusted_parsing=trusted_parsing,
+            records=records,
+            lazy_parsing=lazy_parsing,
+        )
         token: Final = {
             "access_token": self._credentials.access_token,
             "refresh_token": self._credentials.refresh_token,
@@ -492,13 +1170,9 @@ class WithingsApi(AbstractWithingsApi):
         self._client.register_compliance_hook(
             "refresh_token_response", adjust_withings_token
         )
-
-    def _blank_refresh_cb(self, creds: Credentials2) -> None:
-        """The default callback which does nothing."""
-
-    def get_credentials(self) -> Credentials2:
-        """Get the current oauth credentials."""
-        return self._credentials
+        if http_adapter is not None:
+            self._client.mount("https://", http_adapter)
+        self._refresh_lock: Final = threading.Lock()
 
     def refresh_token(self) -> None:
         """Manually refresh the token."""
@@ -507,28 +1181,42 @@ class WithingsApi(AbstractWithingsApi):
         )
         self._update_token(token=token_dict)
 
-    def _update_token(self, token: Dict[str, Union[str, int]]) -> None:
-        """Set the oauth token."""
-        self._credentials = Credentials2(
-            access_token=token["access_token"],
-            expires_in=token["expires_in"],
-            token_type=self._credentials.token_type,
-            refresh_token=token["refresh_token"],
-            userid=self._credentials.userid,
-            client_id=self._credentials.client_id,
-            consumer_secret=self._credentials.consumer_secret,
-        )
+    def _ensure_token(self) -> None:
+        """Refresh the token if it has expired, only once for concurrent calls."""
+        credentials: Final = self._credentials
+        if credentials.token_expiry > arrow.utcnow().int_timestamp:
+            return
 
-        self._refresh_cb(self._credentials)
+        with self._refresh_lock:
+            # Another thread may have refreshed since the snapshot, and the
+            # refresh token can only be used once.
+            if self._credentials is credentials:
+                self.refresh_token()
 
     def _request(
         self, path: str, params: Dict[str, Any], method: str = "GET"
     ) -> Dict[str, Any]:
+        self._ensure_token()
         return cast(
             Dict[str, Any],
-            self._client.request(
-                method=method,
-                url="%s/%s" % (self.URL.strip("/"), path.strip("/")),
-                params=params,
-            ).json(),
+            codec.loads(
+                self._client.request(
+                    method=method,
+                    url="%s/%s" % (self.URL.strip("/"), path.strip("/")),
+                    params=params,
+                ).content
+            ),
+        )
+
+    def _request_stream(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Iterator[bytes]:
+        self._ensure_token()
+        response: Final = self._client.request(
+            method=method,
+            url="%s/%s" % (self.URL.strip("/"), path.strip("/")),
+            params=params,
+            stream=True,
         )
+        with response:
+            yield from response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE)
@@ -0,0 +1,311 @@
+"""Daily, weekly and monthly rollups of measures."""
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta, tzinfo
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple, Union, cast
+
+import arrow
+from arrow import Arrow
+from typing_extensions import Final
+
+from .columns import MeasureColumns, MeasureColumnsSourceType
+from .common import (
+    MeasureGetMeasGroupAttrib,
+    MeasureGetMeasResponse,
+    MeasureGroupAttribs,
+    MeasureType,
+    MeasureTypes,
+    TimeZone,
+    _as_tuple,
+)
+
+
+class AggregatePeriod(Enum):
+    """Periods measures are aggregated over."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class MeasureAggregate(NamedTuple):
+    """Statistics of the values of a measure type in one period."""
+
+    start: Arrow
+    end: Arrow
+    size: int
+    mean: float
+    min: float
+    max: float
+    last: float
+
+
+_SeriesType = Tuple["array[int]", "array[float]"]
+
+# Index of the period in the bounds, size, total, min, max, and the date and
+# value of the last measure, of the measures of a series in one period.
+_BucketType = Tuple[int, int, float, float, float, int, float]
+
+
+@dataclass
+class _PeriodState:  # pylint: disable=too-many-instance-attributes
+    """Running statistics of a period, merged over sources."""
+
+    start: Arrow
+    end: Arrow
+    count: int
+    total: float
+    min: float
+    max: float
+    last_date: int
+    last: float
+
+    def to_aggregate(self) -> MeasureAggregate:
+        """Get the statistics of the period."""
+        return MeasureAggregate(
+            start=self.start,
+            end=self.end,
+            size=self.count,
+            mean=self.total / self.count,
+            min=self.min,
+            max=self.max,
+            last=self.last,
+        )
+
+
+def _series(
+    columns: MeasureColumns,
+    meastypes: Iterable[MeasureType],
+    attribs: Tuple[MeasureGetMeasGroupAttrib, ...],
+) -> Dict[MeasureType, _SeriesType]:
+    """Split the columns into dates and values per measure type, sorted by date."""
+    wanted: Final = frozenset(meastypes)
+    series: Final[Dict[MeasureType, _SeriesType]] = {}
+    for timestamp, meastype, attrib, value in zip(
+        columns.dates, columns.types, columns.attribs, columns.scaled_values
+    ):
+        if meastype in wanted and attrib in attribs:
+            dates, values = series.setdefault(
+                MeasureType(meastype), (array("q"), array("d"))
+            )
+            dates.append(timestamp)
+            values.append(value)
+
+    for meastype, (dates, values) in series.items():
+        if any(dates[index] > dates[index + 1] for index in range(len(dates) - 1)):
+            order = sorted(range(len(dates)), key=dates.__getitem__)
+            series[meastype] = (
+                array("q", [dates[index] for index in order]),
+                array("d", [values[index] for index in order]),
+            )
+
+    return series
+
+
+def _numpy_series(
+    numpy: Any,
+    columns: MeasureColumns,
+    meastypes: Iterable[MeasureType],
+    attribs: Tuple[MeasureGetMeasGroupAttrib, ...],
+) -> Dict[MeasureType, Tuple[Any, Any]]:
+    """Split the columns into numpy dates and values per measure type, sorted by date."""
+    rows = columns.to_numpy()
+    rows = rows[numpy.argsort(rows["date"], kind="stable")]
+    rows = rows[
+        numpy.isin(rows["type"], tuple(meastypes)) & numpy.isin(rows["attrib"], attribs)
+    ]
+    return {
+        MeasureType(meastype): (
+            rows["date"][rows["type"] == meastype].astype(numpy.int64),
+            rows["value"][rows["type"] == meastype],
+        )
+        for meastype in numpy.unique(rows["type"]).tolist()
+    }
+
+
+def _buckets(
+    dates: "array[int]", values: "array[float]", edges: List[int]
+) -> List[_BucketType]:
+    """Split a series by period, only the periods with values are looked up."""
+    buckets: Final[List[_BucketType]] = []
+    high = 0
+    while high < len(dates):
+        low = high
+        index = bisect_right(edges, dates[low]) - 1
+        high = bisect_left(dates, edges[index + 1], low)
+        chunk = values[low:high]
+        buckets.append(
+            (
+                index,
+                high - low,
+                sum(chunk),
+                min(chunk),
+                max(chunk),
+                dates[high - 1],
+                chunk[-1],
+            )
+        )
+    return buckets
+
+
+def _numpy_buckets(
+    numpy: Any, dates: Any, values: Any, edges: List[int]
+) -> List[_BucketType]:
+    """Split a series by period with numpy."""
+    periods: Final = numpy.searchsorted(edges, dates, side="right") - 1
+    starts: Final = numpy.flatnonzero(numpy.diff(periods, prepend=-1))
+    lasts: Final = numpy.append(starts[1:], len(dates)) - 1
+    return cast(
+        List[_BucketType],
+        list(
+            zip(
+                periods[starts].tolist(),
+                (lasts - starts + 1).tolist(),
+                numpy.add.reduceat(values, starts).tolist(),
+                numpy.minimum.reduceat(values, starts).tolist(),
+                numpy.maximum.reduceat(values, starts).tolist(),
+                dates[lasts].tolist(),
+                values[lasts].tolist(),
+            )
+        ),
+    )
+
+
+def _periods(
+    first: int, last: int, period: AggregatePeriod, timezone: tzinfo
+) -> List[Arrow]:
+    """Get the local starts of the periods from first to last, and the end."""
+    day = arrow.get(first).to(timezone).date()
+    if period is AggregatePeriod.WEEK:
+        day -= timedelta(days=day.weekday())
+    elif period is AggregatePeriod.MONTH:
+        day = day.replace(day=1)
+
+    bounds: Final = [Arrow(day.year, day.month, day.day, tzinfo=timezone)]
+    while bounds[-1].int_timestamp <= last:
+        if period is AggregatePeriod.MONTH:
+            day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        else:
+            day += timedelta(days=7 if period is AggregatePeriod.WEEK else 1)
+        bounds.append(Arrow(day.year, day.month, day.day, tzinfo=timezone))
+    return bounds
+
+
+def _source_buckets(
+    columns: MeasureColumns,
+    meastypes: Iterable[MeasureType],
+    attribs: Tuple[MeasureGetMeasGroupAttrib, ...],
+    period: AggregatePeriod,
+    timezone: tzinfo,
+) -> Tuple[List[Arrow], Dict[MeasureType, List[_BucketType]]]:
+    """Get the period bounds of a source and the buckets of each measure type."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import numpy
+    except ImportError:
+        series: Dict[MeasureType, Tuple[Any, Any]] = _series(
+            columns, meastypes, attribs
+        )
+        bucket: Callable[[Any, Any, List[int]], List[_BucketType]] = _buckets
+    else:
+        series = _numpy_series(numpy, columns, meastypes, attribs)
+        bucket = partial(_numpy_buckets, numpy)
+
+    if not series:
+        return [], {}
+
+    bounds: Final = _periods(
+        min(int(dates[0]) for dates, _ in series.values()),
+        max(int(dates[-1]) for dates, _ in series.values()),
+        period,
+        timezone,
+    )
+    edges: Final = [bound.int_timestamp for bound in bounds]
+    return (
+        bounds,
+        {
+            meastype: bucket(dates, values, edges)
+            for meastype, (dates, values) in series.items()
+        },
+    )
+
+
+def _merge(
+    states: Dict[date, _PeriodState], bounds: List[Arrow], buckets: List[_BucketType]
+) -> None:
+    """Merge the buckets of a source into the states of a measure type."""
+    for index, count, total, minimum, maximum, last_date, last in buckets:
+        key = bounds[index].date()
+        state = states.get(key)
+        if state is None:
+            states[key] = _PeriodState(
+                start=bounds[index],
+                end=bounds[index + 1],
+                count=count,
+                total=total,
+                min=minimum,
+                max=maximum,
+                last_date=last_date,
+                last=last,
+            )
+            continue
+
+        state.count += count
+        state.total += total
+        state.min = min(state.min, minimum)
+        state.max = max(state.max, maximum)
+        if last_date >= state.last_date:
+            state.last_date = last_date
+            state.last = last
+
+
+def aggregate_measures(
+    *sources: MeasureColumnsSourceType,
+    period: AggregatePeriod = AggregatePeriod.DAY,
+    with_measure_types: Iterable[MeasureType] = MeasureTypes.ANY,
+    with_group_attrib: Union[
+        MeasureGetMeasGroupAttrib, Tuple[MeasureGetMeasGroupAttrib, ...]
+    ] = MeasureGroupAttribs.ANY,
+    timezone: Union[str, tzinfo, None] = None,
+) -> Dict[MeasureType, Tuple[MeasureAggregate, ...]]:
+    """
+    Get the mean, min, max and last value of measure types per period.
+
+    Periods start at local midnight, weeks on monday, in the timezone of each
+    response. Groups that do not come with a response use timezone, UTC by
+    default. The period bounds of each source are computed once, its values
+    are sorted by date and split by bisection, or by numpy when installed.
+    Periods without values are left out.
+
+    rollups = aggregate_measures(response, period=AggregatePeriod.WEEK)
+    for rollup in rollups[MeasureType.WEIGHT]:
+        print(rollup.start, rollup.mean)
+    """
+    default_timezone: Final = TimeZone.validate("UTC" if timezone is None else timezone)
+    attribs: Final = _as_tuple(with_group_attrib)
+    meastypes: Final = tuple(with_measure_types)
+
+    # Periods are keyed by their local date, sources may be in other timezones.
+    states: Final[Dict[MeasureType, Dict[date, _PeriodState]]] = {}
+    for source in sources:
+        bounds, buckets = _source_buckets(
+            MeasureColumns(source),
+            meastypes,
+            attribs,
+            period,
+            source.timezone
+            if isinstance(source, MeasureGetMeasResponse)
+            else default_timezone,
+        )
+        for meastype, type_buckets in buckets.items():
+            _merge(states.setdefault(meastype, {}), bounds, type_buckets)
+
+    return {
+        meastype: tuple(
+            state.to_aggregate() for _, state in sorted(type_states.items())
+        )
+        for meastype, type_states in states.items()
+    }
@@ -0,0 +1,559 @@
+"""
+Asyncio client for the Withings Health API.
+
+The transport is an aiohttp compatible ``ClientSession``. Pass a shared
+session to reuse one connection pool across many users, otherwise one is
+created lazily (requires ``aiohttp`` to be installed).
+"""
+# The methods mirror the signatures of WithingsApi.
+# pylint: disable=duplicate-code
+from abc import abstractmethod
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, cast
+
+import arrow
+from typing_extensions import Final
+
+from . import (
+    BaseWithingsApi,
+    DateType,
+    UserWithingsApi,
+    WithingsAuth,
+    _heart_get_params,
+    _heart_list_params,
+    _measure_get_activity_params,
+    _measure_get_meas_params,
+    _notify_get_params,
+    _notify_list_params,
+    _notify_revoke_params,
+    _notify_subscribe_params,
+    _notify_update_params,
+    _sleep_get_params,
+    _sleep_get_summary_params,
+    codec,
+)
+from .cache import AbstractResponseCache
+from .common import (
+    Credentials2,
+    CredentialsType,
+    GetActivityField,
+    GetSleepField,
+    GetSleepSummaryField,
+    GetSleepSummarySerie,
+    HeartGetResponse,
+    HeartListResponse,
+    HeartListSerie,
+    MeasureGetActivityActivity,
+    MeasureGetActivityResponse,
+    MeasureGetMeasGroup,
+    MeasureGetMeasGroupCategory,
+    MeasureGetMeasResponse,
+    MeasureType,
+    NotifyAppli,
+    NotifyGetResponse,
+    NotifyListResponse,
+    SleepGetResponse,
+    SleepGetSummaryResponse,
+    TooManyRequestsException,
+    UserGetDeviceResponse,
+    response_body_or_raise,
+)
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+
+
+class AbstractAsyncWithingsApi(BaseWithingsApi):
+    """Abstract class for customizing which async requests module you want."""
+
+    @abstractmethod
+    async def _request(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Dict[str, Any]:
+        """Fetch data from the Withings API."""
+
+    async def request(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Dict[str, Any]:
+        """Request a specific service."""
+        response_cache: Final = self._response_cache if method == "GET" else None
+        if response_cache is not None:
+            cached: Final = response_cache.get(path, params)
+            if cached is not None:
+                return cached
+
+        retry_policy: Final = self._retry_policy
+        if retry_policy is None:
+            body = await self._request_body(path=path, params=params, method=method)
+        else:
+            body = await retry_policy.call_async(
+                lambda: self._request_body(path=path, params=params, method=method)
+            )
+
+        if response_cache is not None:
+            response_cache.set(path, params, body)
+
+        return body
+
+    async def _request_body(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Dict[str, Any]:
+        """Make a single rate limited request and return its body."""
+        rate_limiter: Final = self._rate_limiter
+        if rate_limiter is None:
+            return response_body_or_raise(
+                await self._request(method=method, path=path, params=params)
+            )
+
+        delay: Final = rate_limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            body: Final = response_body_or_raise(
+                await self._request(method=method, path=path, params=params)
+            )
+        except TooManyRequestsException:
+            rate_limiter.on_throttled()
+            raise
+        rate_limiter.on_success()
+
+        return body
+
+    async def user_get_device(self) -> UserGetDeviceResponse:
+        """
+        Get user device.
+
+        Some data related to user profile are available through those services.
+        """
+        return self._parse_response(
+            UserGetDeviceResponse,
+            await self.request(path=self.PATH_V2_USER, params={"action": "getdevice"}),
+        )
+
+    async def measure_get_activity(
+        self,
+        data_fields: Iterable[GetActivityField] = GetActivityField,
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        offset: Optional[int] = None,
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> MeasureGetActivityResponse:
+        """Get user created activities."""
+        return self._parse_response(
+            MeasureGetActivityResponse,
+            await self.request(
+                path=self.PATH_V2_MEASURE,
+                params=_measure_get_activity_params(
+                    data_fields=data_fields,
+                    startdateymd=startdateymd,
+                    enddateymd=enddateymd,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+            ),
+            records,
+        )
+
+    async def iter_measure_get_activity(
+        self,
+        data_fields: Iterable[GetActivityField] = GetActivityField,
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> AsyncIterator[MeasureGetActivityActivity]:
+        """Iterate over user created activities, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = await self.measure_get_activity(
+                data_fields=data_fields,
+                startdateymd=startdateymd,
+                enddateymd=enddateymd,
+                offset=offset,
+                lastupdate=lastupdate,
+                records=records,
+            )
+            for activity in response.activities:
+                yield activity
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    async def measure_get_meas(
+        self,
+        meastype: Optional[MeasureType] = None,
+        category: Optional[MeasureGetMeasGroupCategory] = None,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+        offset: Optional[int] = None,
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> MeasureGetMeasResponse:
+        """Get measures."""
+        return self._parse_response(
+            MeasureGetMeasResponse,
+            await self.request(
+                path=self.PATH_MEASURE,
+                params=_measure_get_meas_params(
+                    meastype=meastype,
+                    category=category,
+                    startdate=startdate,
+                    enddate=enddate,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+            ),
+            records,
+        )
+
+    async def iter_measure_get_meas(
+        self,
+        meastype: Optional[MeasureType] = None,
+        category: Optional[MeasureGetMeasGroupCategory] = None,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> AsyncIterator[MeasureGetMeasGroup]:
+        """Iterate over measure groups, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = await self.measure_get_meas(
+                meastype=meastype,
+                category=category,
+                startdate=startdate,
+                enddate=enddate,
+                offset=offset,
+                lastupdate=lastupdate,
+                records=records,
+            )
+            for group in response.measuregrps:
+                yield group
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    async def sleep_get(
+        self,
+        data_fields: Iterable[GetSleepField],
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+        records: Optional[bool] = None,
+    ) -> SleepGetResponse:
+        """Get sleep data."""
+        return self._parse_response(
+            SleepGetResponse,
+            await self.request(
+                path=self.PATH_V2_SLEEP,
+                params=_sleep_get_params(
+                    data_fields=data_fields, startdate=startdate, enddate=enddate
+                ),
+            ),
+            records,
+        )
+
+    async def sleep_get_summary(
+        self,
+        data_fields: Iterable[GetSleepSummaryField],
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        offset: Optional[int] = None,
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+    ) -> SleepGetSummaryResponse:
+        """Get sleep summary."""
+        return self._parse_response(
+            SleepGetSummaryResponse,
+            await self.request(
+                path=self.PATH_V2_SLEEP,
+                params=_sleep_get_summary_params(
+                    data_fields=data_fields,
+                    startdateymd=startdateymd,
+                    enddateymd=enddateymd,
+                    offset=offset,
+                    lastupdate=lastupdate,
+                ),
+            ),
+        )
+
+    async def iter_sleep_get_summary(
+        self,
+        data_fields: Iterable[GetSleepSummaryField],
+        startdateymd: Optional[DateType] = arrow.utcnow(),
+        enddateymd: Optional[DateType] = arrow.utcnow(),
+        lastupdate: Optional[DateType] = arrow.utcnow(),
+    ) -> AsyncIterator[GetSleepSummarySerie]:
+        """Iterate over sleep summary series, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = await self.sleep_get_summary(
+                data_fields=data_fields,
+                startdateymd=startdateymd,
+                enddateymd=enddateymd,
+                offset=offset,
+                lastupdate=lastupdate,
+            )
+            for summary in response.series:
+                yield summary
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    async def heart_get(self, signalid: int) -> HeartGetResponse:
+        """Get ECG recording."""
+        return self._parse_response(
+            HeartGetResponse,
+            await self.request(
+                path=self.PATH_V2_HEART, params=_heart_get_params(signalid=signalid)
+            ),
+        )
+
+    async def heart_list(
+        self,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+        offset: Optional[int] = None,
+    ) -> HeartListResponse:
+        """Get heart list."""
+        return self._parse_response(
+            HeartListResponse,
+            await self.request(
+                path=self.PATH_V2_HEART,
+                params=_heart_list_params(
+                    startdate=startdate, enddate=enddate, offset=offset
+                ),
+            ),
+        )
+
+    async def iter_heart_list(
+        self,
+        startdate: Optional[DateType] = arrow.utcnow(),
+        enddate: Optional[DateType] = arrow.utcnow(),
+    ) -> AsyncIterator[HeartListSerie]:
+        """Iterate over heart list series, following every page."""
+        offset: Optional[int] = None
+        while True:
+            response = await self.heart_list(
+                startdate=startdate, enddate=enddate, offset=offset
+            )
+            for heart in response.series:
+                yield heart
+
+            if not response.more:
+                return
+            offset = response.offset
+
+    async def notify_get(
+        self, callbackurl: str, appli: Optional[NotifyAppli] = None
+    ) -> NotifyGetResponse:
+        """
+        Get subscription.
+
+        Return the last notification service that a user was subscribed to,
+        and its expiry date.
+        """
+        return self._parse_response(
+            NotifyGetResponse,
+            await self.request(
+                path=self.PATH_NOTIFY,
+                params=_notify_get_params(callbackurl=callbackurl, appli=appli),
+            ),
+        )
+
+    async def notify_list(
+        self, appli: Optional[NotifyAppli] = None
+    ) -> NotifyListResponse:
+        """List notification configuration for this user."""
+        return self._parse_response(
+            NotifyListResponse,
+            await self.request(
+                path=self.PATH_NOTIFY, params=_notify_list_params(appli=appli)
+            ),
+        )
+
+    async def notify_revoke(
+        self, callbackurl: Optional[str] = None, appli: Optional[NotifyAppli] = None
+    ) -> None:
+        """
+        Revoke a subscription.
+
+        This service disables the notification between the API and the
+        specified applications for the user.
+        """
+        await self.request(
+            path=self.PATH_NOTIFY,
+            params=_notify_revoke_params(callbackurl=callbackurl, appli=appli),
+        )
+        self.invalidate_response_cache(self.PATH_NOTIFY)
+
+    async def notify_subscribe(
+        self,
+        callbackurl: str,
+        appli: Optional[NotifyAppli] = None,
+        comment: Optional[str] = None,
+    ) -> None:
+        """Subscribe to receive notifications when new data is available."""
+        await self.request(
+            path=self.PATH_NOTIFY,
+            params=_notify_subscribe_params(
+                callbackurl=callbackurl, appli=appli, comment=comment
+            ),
+        )
+        self.invalidate_response_cache(self.PATH_NOTIFY)
+
+    async def notify_update(
+        self,
+        callbackurl: str,
+        appli: NotifyAppli,
+        new_callbackurl: str,
+        new_appli: Optional[NotifyAppli] = None,
+        comment: Optional[str] = None,
+    ) -> None:
+        """Update the callbackurl and or appli of a created notification."""
+        await self.request(
+            path=self.PATH_NOTIFY,
+            params=_notify_update_params(
+                callbackurl=callbackurl,
+                appli=appli,
+                new_callbackurl=new_callbackurl,
+                new_appli=new_appli,
+                comment=comment,
+            ),
+        )
+        self.invalidate_response_cache(self.PATH_NOTIFY)
+
+
+def create_client_session(limit: int = 100) -> Any:
+    """Create an aiohttp session with a connection pool of the given size."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import aiohttp
+    except ImportError as ex:
+        raise ImportError(
+            "aiohttp is required to create a session, install it or pass session="
+        ) from ex
+
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit))
+
+
+class AsyncWithingsApi(AbstractAsyncWithingsApi, UserWithingsApi):
+    """
+    Provides an asyncio entrypoint for calling the withings api.
+
+    Behaves like WithingsApi, tokens are refreshed automatically once they
+    expire and ``refresh_cb`` is called with the updated credentials.
+
+    async with AsyncWithingsApi(creds, refresh_cb=user.refresh_cb) as api:
+        meas = await api.measure_get_meas()
+
+    Prefer a ``MemoryResponseCache`` as ``response_cache``, the SQLite one
+    blocks the event loop while it reads and writes.
+
+    With ``records`` measures, measure groups, activities and sleep values are
+    created as lightweight named tuples and ``lazy_parsing`` parses lists
+    of nested models when accessed, see WithingsApi.
+    """
+
+    def __init__(
+        self,
+        credentials: CredentialsType,
+        refresh_cb: Optional[Callable[[Credentials2], None]] = None,
+        session: Any = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        response_cache: Optional[AbstractResponseCache] = None,
+        trusted_parsing: bool = False,
+        records: bool = False,
+        lazy_parsing: bool = False,
+    ):
+        """Initialize new object."""
+        super().__init__(
+            credentials,
+            refresh_cb=refresh_cb,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            response_cache=response_cache,
+            trusted_parsing=trusted_parsing,
+            records=records,
+            lazy_parsing=lazy_parsing,
+        )
+        self._session = session
+        self._owns_session = session is None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "AsyncWithingsApi":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the session if it was created by this object."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> Any:
+        if self._session is None:
+            self._session = create_client_session()
+        return self._session
+
+    async def refresh_token(self) -> None:
+        """Manually refresh the token."""
+        token: Final = response_body_or_raise(
+            await self._fetch(
+                method="POST",
+                path=WithingsAuth.PATH_V2_OAUTH2,
+                data={
+                    "action": "requesttoken",
+                    "grant_type": "refresh_token",
+                    "client_id": self._credentials.client_id,
+                    "client_secret": self._credentials.consumer_secret,
+                    "refresh_token": self._credentials.refresh_token,
+                },
+            )
+        )
+        self._update_token(token=token)
+
+    async def _ensure_token(self) -> None:
+        """Refresh the token if it has expired, only once for concurrent calls."""
+        if self._credentials.token_expiry > arrow.utcnow().int_timestamp:
+            return
+
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+
+        expired_token: Final = self._credentials.access_token
+        async with self._refresh_lock:
+            if self._credentials.access_token == expired_token:
+                await self.refresh_token()
+
+    async def _fetch(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        async with self._get_session().request(
+            method=method,
+            url="%s/%s" % (self.URL.strip("/"), path.strip("/")),
+            params=params,
+            data=data,
+        ) as response:
+            return codec.loads(await response.read())
+
+    async def _request(
+        self, path: str, params: Dict[str, Any], method: str = "GET"
+    ) -> Dict[str, Any]:
+        await self._ensure_token()
+        return cast(
+            Dict[str, Any],
+            await self._fetch(
+                method=method,
+                path=path,
+                params={**params, "access_token": self._credentials.access_token},
+            ),
+        )
@@ -0,0 +1,315 @@
+"""Caching of Withings API responses."""
+from abc import abstractmethod
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+import arrow
+from typing_extensions import Final
+
+from . import codec
+
+EndpointType = Tuple[str, str]
+
+# Measures of a window that closed this long ago are considered final.
+DEFAULT_HISTORICAL_GRACE: Final = 24 * 60 * 60
+DEFAULT_HISTORICAL_TTL: Final = 30 * 24 * 60 * 60
+_END_PARAMS: Final = ("enddate", "enddateymd")
+
+# Devices and subscriptions rarely change, subscription changes made through
+# the api invalidate them anyway.
+DEFAULT_MEMORY_TTLS: Final = {
+    ("v2/user", "getdevice"): 60 * 60,
+    ("notify", "get"): 60 * 60,
+    ("notify", "list"): 60 * 60,
+}
+
+
+class CachePolicy:
+    """
+    Decides how long the response of a request may be cached.
+
+    ttls maps (path, action) endpoints to a number of seconds. Requests for a
+    date range that ended more than historical_grace seconds ago are cached
+    for historical_ttl seconds instead, with or without lastupdate. Everything
+    else is not cached.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Mapping[EndpointType, float]] = None,
+        historical_ttl: Optional[float] = DEFAULT_HISTORICAL_TTL,
+        historical_grace: float = DEFAULT_HISTORICAL_GRACE,
+    ):
+        """Initialize new object."""
+        self._ttls: Final = dict(ttls or {})
+        self._historical_ttl: Final = historical_ttl
+        self._historical_grace: Final = historical_grace
+
+    def _is_historical(self, params: Mapping[str, Any], now: float) -> bool:
+        # A lastupdate does not matter, changes to final measures are not
+        # expected either. measure_get_meas always sends one by default.
+        for name in _END_PARAMS:
+            if name in params:
+                end: Any = params[name]
+                if name == "enddateymd":
+                    # The whole day must be over.
+                    end = arrow.get(end).shift(days=1).int_timestamp
+                return int(end) < now - self._historical_grace
+        return False
+
+    def get_ttl(
+        self, path: str, params: Mapping[str, Any], now: float
+    ) -> Optional[float]:
+        """Get the number of seconds to cache a response for, None to skip it."""
+        if self._historical_ttl is not None and self._is_historical(params, now):
+            return self._historical_ttl
+        return self._ttls.get((path.strip("/"), str(params.get("action"))))
+
+
+def make_cache_key(userid: Hashable, path: str, params: Mapping[str, Any]) -> str:
+    """Build a cache key that does not depend on the order of the params."""
+    # Always the stdlib, keys must not change with the codec.
+    return json.dumps(
+        [
+            str(userid),
+            path.strip("/"),
+            sorted((str(key), str(value)) for key, value in params.items()),
+        ],
+        separators=(",", ":"),
+    )
+
+
+class AbstractResponseCache:
+    """
+    Abstract class for storing response bodies of many users.
+
+    Bodies are keyed by user id, the policy is the same for every user. A
+    client uses a single cache, caches can not be layered.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[CachePolicy] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize new object."""
+        self.policy: Final = policy or CachePolicy()
+        self._clock: Final = clock
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an unexpired body."""
+
+    @abstractmethod
+    def set(
+        self, key: str, userid: Hashable, path: str, body: Dict[str, Any], ttl: float
+    ) -> None:
+        """Store a body for ttl seconds."""
+
+    @abstractmethod
+    def invalidate(self, userid: Hashable, path: Optional[str] = None) -> None:
+        """Drop the bodies of a user, optionally only the ones of a path."""
+
+    def for_user(self, userid: Hashable) -> "UserResponseCache":
+        """Get a view of the cache for a single user."""
+        return UserResponseCache(self, userid)
+
+
+class UserResponseCache:
+    """The response cache of a single user."""
+
+    def __init__(self, cache: AbstractResponseCache, userid: Hashable):
+        """Initialize new object."""
+        self._cache: Final = cache
+        self._userid: Final = userid
+
+    def get(self, path: str, params: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the cached body of a request."""
+        return self._cache.get(make_cache_key(self._userid, path, params))
+
+    def set(self, path: str, params: Mapping[str, Any], body: Dict[str, Any]) -> None:
+        """Cache the body of a request if the policy allows it."""
+        # pylint: disable=protected-access
+        ttl: Final = self._cache.policy.get_ttl(path, params, self._cache._clock())
+        if ttl:
+            self._cache.set(
+                make_cache_key(self._userid, path, params),
+                self._userid,
+                path.strip("/"),
+                body,
+                ttl,
+            )
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop the cached bodies of this user."""
+        self._cache.invalidate(self._userid, None if path is None else path.strip("/"))
+
+
+class SqliteResponseCache(AbstractResponseCache):
+    """
+    Keeps response bodies in a SQLite database file.
+
+    Expired bodies are dropped and once more than max_entries are stored the
+    least recently used ones are evicted.
+
+    cache = SqliteResponseCache("responses.db", max_entries=100000)
+    api = WithingsApi(creds, response_cache=cache)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        policy: Optional[CachePolicy] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize new object."""
+        super().__init__(policy=policy, clock=clock)
+        self._max_entries: Final = max_entries
+        self._lock: Final = threading.Lock()
+        self._connection: Final = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS withings_response ("
+                "key TEXT PRIMARY KEY, userid TEXT NOT NULL, path TEXT NOT NULL, "
+                "body BLOB NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS withings_response_accessed "
+                "ON withings_response (accessed)"
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(
+                self._connection.execute(
+                    "SELECT COUNT(*) FROM withings_response"
+                ).fetchone()[0]
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an unexpired body."""
+        now: Final = self._clock()
+        with self._lock, self._connection:
+            row: Final = self._connection.execute(
+                "SELECT body, expires FROM withings_response WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._connection.execute(
+                    "DELETE FROM withings_response WHERE key = ?", (key,)
+                )
+                return None
+            self._connection.execute(
+                "UPDATE withings_response SET accessed = ? WHERE key = ?", (now, key)
+            )
+
+        return dict(codec.loads(row[0]))
+
+    def set(
+        self, key: str, userid: Hashable, path: str, body: Dict[str, Any], ttl: float
+    ) -> None:
+        """Store a body for ttl seconds."""
+        now: Final = self._clock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO withings_response "
+                "(key, userid, path, body, expires, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, str(userid), path, codec.dumps(body), now + ttl, now),
+            )
+            self._connection.execute(
+                "DELETE FROM withings_response WHERE expires <= ?", (now,)
+            )
+            self._connection.execute(
+                "DELETE FROM withings_response WHERE key IN ("
+                "SELECT key FROM withings_response ORDER BY accessed DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            )
+
+    def invalidate(self, userid: Hashable, path: Optional[str] = None) -> None:
+        """Drop the bodies of a user, optionally only the ones of a path."""
+        with self._lock, self._connection:
+            if path is None:
+                self._connection.execute(
+                    "DELETE FROM withings_response WHERE userid = ?", (str(userid),)
+                )
+            else:
+                self._connection.execute(
+                    "DELETE FROM withings_response WHERE userid = ? AND path = ?",
+                    (str(userid), path),
+                )
+
+
+class MemoryResponseCache(AbstractResponseCache):
+    """
+    Keeps response bodies in memory.
+
+    By default only devices and notification subscriptions are cached. Once
+    more than max_entries are stored the least recently used ones are evicted.
+
+    cache = MemoryResponseCache()
+    api = WithingsApi(creds, response_cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        policy: Optional[CachePolicy] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize new object."""
+        super().__init__(
+            policy=policy or CachePolicy(ttls=DEFAULT_MEMORY_TTLS, historical_ttl=None),
+            clock=clock,
+        )
+        self._max_entries: Final = max_entries
+        self._lock: Final = threading.Lock()
+        self._entries: Final[
+            "OrderedDict[str, Tuple[str, str, Dict[str, Any], float]]"
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an unexpired body."""
+        with self._lock:
+            entry: Final = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        return dict(entry[2])
+
+    def set(
+        self, key: str, userid: Hashable, path: str, body: Dict[str, Any], ttl: float
+    ) -> None:
+        """Store a body for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (str(userid), path, body, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, userid: Hashable, path: Optional[str] = None) -> None:
+        """Drop the bodies of a user, optionally only the ones of a path."""
+        with self._lock:
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry[0] == str(userid) and (path is None or entry[1] == path)
+            ]:
+                del self._entries[key]
@@ -0,0 +1,55 @@
+"""JSON encoding and decoding, using the fastest library installed."""
+import json
+from typing import Any, Callable, Dict, NamedTuple, Union
+
+from typing_extensions import Final
+
+
+class JsonCodec(NamedTuple):
+    """Functions decoding and encoding JSON documents."""
+
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+STDLIB_CODEC: Final = JsonCodec(name="json", loads=json.loads, dumps=_stdlib_dumps)
+CODECS: Final[Dict[str, JsonCodec]] = {STDLIB_CODEC.name: STDLIB_CODEC}
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+
+    def _orjson_dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    CODECS["orjson"] = JsonCodec(name="orjson", loads=orjson.loads, dumps=_orjson_dumps)
+
+_codec = CODECS.get("orjson", STDLIB_CODEC)
+
+
+def get_codec() -> JsonCodec:
+    """Get the codec used to decode and encode responses."""
+    return _codec
+
+
+def set_codec(codec: Union[str, JsonCodec]) -> None:
+    """Use another codec, either one of CODECS by name or a custom one."""
+    global _codec  # pylint: disable=global-statement,invalid-name
+    _codec = CODECS[codec] if isinstance(codec, str) else codec
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document."""
+    return _codec.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a JSON document as UTF-8."""
+    return _codec.dumps(value)
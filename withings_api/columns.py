@@ -0,0 +1,130 @@
+"""Columnar export of measure groups."""
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from typing_extensions import Final
+
+from .common import MeasureGetMeasGroup, MeasureGetMeasResponse, _source_groups
+
+MeasureColumnsSourceType = Union[
+    MeasureGetMeasResponse, MeasureGetMeasGroup, Iterable[MeasureGetMeasGroup]
+]
+
+# Names of the columns, in the order of to_numpy() and to_pandas().
+COLUMNS: Final = (
+    "date",
+    "grpid",
+    "type",
+    "attrib",
+    "category",
+    "deviceid",
+    "value",
+)
+
+_SCALES: Final[Dict[int, float]] = {}
+
+
+def _scale(unit: int) -> float:
+    scale = _SCALES.get(unit)
+    if scale is None:
+        scale = _SCALES[unit] = float(pow(10, unit))
+    return scale
+
+
+class MeasureColumns:  # pylint: disable=too-many-instance-attributes
+    """
+    The measures of groups as columns, one row per measure.
+
+    The columns are kept in compact arrays. values holds the raw values and
+    units their exponents, scaled_values gives value * 10 ** unit. With numpy
+    or pandas installed, to_numpy() and to_pandas() convert everything at once.
+
+    columns = MeasureColumns()
+    for group in api.stream_measure_get_meas(startdate=start, enddate=end):
+        columns.add(group)
+    frame = columns.to_pandas()
+    """
+
+    def __init__(self, *sources: MeasureColumnsSourceType):
+        """Initialize new object."""
+        self.dates: Final = array("q")
+        self.grpids: Final = array("q")
+        self.types: Final = array("i")
+        self.attribs: Final = array("i")
+        self.categories: Final = array("i")
+        self.deviceids: Final[List[Optional[str]]] = []
+        self.values: Final = array("q")
+        self.units: Final = array("i")
+        for source in sources:
+            self.add(source)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, source: MeasureColumnsSourceType) -> None:
+        """Append the measures of a response, a group or an iterable of groups."""
+        for group in _source_groups(source):
+            count = len(group.measures)
+            self.dates.extend((group.date.int_timestamp,) * count)
+            self.grpids.extend((group.grpid,) * count)
+            self.attribs.extend((group.attrib,) * count)
+            self.categories.extend((group.category,) * count)
+            self.deviceids.extend((group.deviceid,) * count)
+            for measure in group.measures:
+                self.types.append(measure.type)
+                self.values.append(measure.value)
+                self.units.append(measure.unit)
+
+    @property
+    def scaled_values(self) -> "array[float]":
+        """Get value * 10 ** unit of every measure."""
+        return array(
+            "d", [value * _scale(unit) for value, unit in zip(self.values, self.units)],
+        )
+
+    def to_numpy(self) -> Any:
+        """
+        Get a numpy structured array with the fields of COLUMNS.
+
+        date holds datetime64 seconds since the epoch in UTC.
+        """
+        try:
+            # pylint: disable=import-outside-toplevel
+            import numpy
+        except ImportError as ex:
+            raise ImportError("numpy is required to use to_numpy()") from ex
+
+        result: Final = numpy.empty(
+            len(self),
+            dtype=[
+                ("date", "datetime64[s]"),
+                ("grpid", numpy.int64),
+                ("type", numpy.int32),
+                ("attrib", numpy.int32),
+                ("category", numpy.int32),
+                ("deviceid", object),
+                ("value", numpy.float64),
+            ],
+        )
+        result["date"] = numpy.frombuffer(self.dates, dtype=numpy.int64)
+        result["grpid"] = numpy.frombuffer(self.grpids, dtype=numpy.int64)
+        result["type"] = numpy.frombuffer(self.types, dtype=numpy.intc)
+        result["attrib"] = numpy.frombuffer(self.attribs, dtype=numpy.intc)
+        result["category"] = numpy.frombuffer(self.categories, dtype=numpy.intc)
+        result["deviceid"] = self.deviceids
+        result["value"] = numpy.frombuffer(
+            self.values, dtype=numpy.int64
+        ) * numpy.power(10.0, numpy.frombuffer(self.units, dtype=numpy.intc))
+        return result
+
+    def to_pandas(self) -> Any:
+        """Get a pandas DataFrame with the COLUMNS, date is timezone aware UTC."""
+        try:
+            # pylint: disable=import-outside-toplevel
+            import pandas
+        except ImportError as ex:
+            raise ImportError("pandas is required to use to_pandas()") from ex
+
+        frame: Final = pandas.DataFrame(self.to_numpy(), columns=list(COLUMNS))
+        frame["date"] = frame["date"].dt.tz_localize("UTC")
+        return frame
@@ -1,15 +1,38 @@
 """Common classes and functions."""
+from array import array
 from dataclasses import dataclass
+import datetime
 from datetime import tzinfo
 from enum import Enum, IntEnum
+from functools import lru_cache
 import logging
-from typing import Any, Dict, Optional, Tuple, Type, TypeVar, Union, cast
+import sys
+import threading
+from typing import (
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
 
 import arrow
 from arrow import Arrow
 from dateutil import tz
 from dateutil.tz import tzlocal
 from pydantic import BaseModel, Field, validator
+from pydantic.fields import SHAPE_TUPLE_ELLIPSIS, ModelField
 from typing_extensions import Final
 
 from .const import (
@@ -25,7 +48,25 @@ from .const import (
 )
 
 _LOGGER = logging.getLogger(LOG_NAMESPACE)
+DateType = Union[Arrow, datetime.date, datetime.datetime, int, str]
 _GenericType = TypeVar("_GenericType")
+_ModelType = TypeVar("_ModelType", bound=BaseModel)
+
+
+# Unknown values are logged the first time and then every this many times.
+UNKNOWN_ENUM_WARNING_INTERVAL: Final = 1000
+
+_ENUM_MEMBERS: Final[Dict[type, Dict[Any, Any]]] = {}
+_UNKNOWN_ENUM_VALUES: Final[Counter[Tuple[str, str]]] = Counter()
+_UNKNOWN_ENUM_VALUES_LOCK: Final = threading.Lock()
+
+
+def _enum_members(enum_class: Type[_GenericType]) -> Dict[Any, _GenericType]:
+    members = _ENUM_MEMBERS.get(enum_class)
+    if members is None:
+        members = {member.value: member for member in enum_class}  # type: ignore
+        _ENUM_MEMBERS[enum_class] = members
+    return members
 
 
 def to_enum(
@@ -33,15 +74,36 @@ def to_enum(
 ) -> _GenericType:
     """Attempt to convert a value to an enum."""
     try:
-        return enum_class(value)  # type: ignore
-    except ValueError:
+        return _enum_members(enum_class)[value]
+    except (KeyError, TypeError):
+        pass
+
+    key: Final = (enum_class.__name__, str(value))
+    with _UNKNOWN_ENUM_VALUES_LOCK:
+        _UNKNOWN_ENUM_VALUES[key] += 1
+        count: Final = _UNKNOWN_ENUM_VALUES[key]
+
+    if count == 1 or count % UNKNOWN_ENUM_WARNING_INTERVAL == 0:
         _LOGGER.warning(
-            "Unsupported %s value %s. Replacing with UNKNOWN value %s. Please report this warning to the developer to ensure proper support.",
+            "Unsupported %s value %s (seen %s times). Replacing with UNKNOWN value %s. Please report this warning to the developer to ensure proper support.",
             str(enum_class),
             value,
+            count,
             str(default_value),
         )
-        return default_value
+    return default_value
+
+
+def get_unknown_enum_values() -> Dict[Tuple[str, str], int]:
+    """Get how often each unsupported (enum name, value) was replaced."""
+    with _UNKNOWN_ENUM_VALUES_LOCK:
+        return dict(_UNKNOWN_ENUM_VALUES)
+
+
+def reset_unknown_enum_values() -> None:
+    """Forget the unsupported enum values seen so far."""
+    with _UNKNOWN_ENUM_VALUES_LOCK:
+        _UNKNOWN_ENUM_VALUES.clear()
 
 
 class ConfiguredBaseModel(BaseModel):
@@ -54,6 +116,18 @@ class ConfiguredBaseModel(BaseModel):
         allow_extra: Final = False
         allow_mutation: Final = False
 
+    @classmethod
+    def _get_value(cls, v: Any, to_dict: bool, *args: Any, **kwargs: Any) -> Any:
+        # dict() and json() give the compact sequences as tuples, like before.
+        if to_dict and isinstance(v, (HeartSignal, SleepGetTimestampValues)):
+            v = tuple(v)
+        elif isinstance(v, tuple) and hasattr(v, "_fields"):
+            # Records are named tuples, which pydantic < 1.8 can not rebuild.
+            return cast(Any, v)._make(
+                cls._get_value(item, to_dict, *args, **kwargs) for item in v
+            )
+        return super()._get_value(v, to_dict, *args, **kwargs)
+
 
 class TimeZone(tzlocal):
     """Subclass of tzinfo for parsing timezones."""
@@ -71,7 +145,7 @@ class TimeZone(tzlocal):
         if isinstance(value, tzinfo):
             return value
         if isinstance(value, str):
-            timezone: Final = tz.gettz(value)
+            timezone: Final = get_timezone(value)
             if timezone:
                 return timezone
             raise ValueError(f"Invalid timezone provided {value}")
@@ -79,8 +153,33 @@ class TimeZone(tzlocal):
         raise TypeError("string or tzinfo required")
 
 
+@lru_cache(maxsize=1024)
+def get_timezone(name: str) -> Optional[tzinfo]:
+    """Get a timezone by name, remembering the most recently used ones."""
+    return cast(Optional[tzinfo], tz.gettz(name))
+
+
+def to_timezone(value: Arrow, timezone: tzinfo) -> Arrow:
+    """Convert a date to a timezone, unless it already is in it."""
+    if value.tzinfo is timezone:
+        return value
+    return cast(Arrow, value.to(timezone))
+
+
+_EPOCH_ORDINAL: Final = datetime.date(1970, 1, 1).toordinal()
+# The timezone of arrow.get(timestamp), older arrow versions use dateutil's.
+_UTC: Final = arrow.get(0).tzinfo
+
+
 class ArrowType(Arrow):
-    """Subclass of Arrow for parsing dates."""
+    """
+    Subclass of Arrow for parsing dates.
+
+    Dates parsed from timestamps only keep the timestamp and timezone, the
+    underlying datetime is created the first time it is needed. Comparing,
+    sorting, int_timestamp, tzinfo and converting to another timezone work
+    without it.
+    """
 
     @classmethod
     def __get_validators__(cls) -> Any:
@@ -94,15 +193,95 @@ class ArrowType(Arrow):
         """Convert input to the desired object."""
         if isinstance(value, str):
             if value.isdigit():
-                return arrow.get(int(value))
+                return cls.from_int_timestamp(int(value))
+            if len(value) == 10:
+                # Plain days like 2020-01-31 are common and slow to parse by arrow.
+                try:
+                    day: Final = datetime.date.fromisoformat(value)
+                except ValueError:
+                    pass
+                else:
+                    return cls.from_int_timestamp(
+                        (day.toordinal() - _EPOCH_ORDINAL) * 24 * 60 * 60
+                    )
             return arrow.get(value)
         if isinstance(value, int):
-            return arrow.get(value)
+            return cls.from_int_timestamp(value)
         if isinstance(value, (Arrow, ArrowType)):
             return value
 
         raise TypeError("string or int required")
 
+    @classmethod
+    def from_int_timestamp(
+        cls, timestamp: int, timezone: datetime.tzinfo = _UTC
+    ) -> "ArrowType":
+        """Create a date from a timestamp, without creating its datetime yet."""
+        instance: Final = cls.__new__(cls)
+        instance.__dict__["_timestamp"] = timestamp
+        instance.__dict__["_lazy_tzinfo"] = timezone
+        return cast(ArrowType, instance)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_datetime" and "_timestamp" in self.__dict__:
+            value: Final = datetime.datetime.fromtimestamp(
+                self.__dict__["_timestamp"], self.__dict__["_lazy_tzinfo"]
+            )
+            self.__dict__["_datetime"] = value
+            return value
+
+        return super().__getattr__(name)
+
+    @property
+    def int_timestamp(self) -> int:
+        """Get the timestamp."""
+        timestamp: Final = self.__dict__.get("_timestamp")
+        return super().int_timestamp if timestamp is None else cast(int, timestamp)
+
+    @property
+    def tzinfo(self) -> tzinfo:
+        """Get the timezone."""
+        if "_timestamp" in self.__dict__:
+            return cast(tzinfo, self.__dict__["_lazy_tzinfo"])
+        return super().tzinfo
+
+    def to(self, tz: Any) -> Arrow:  # pylint: disable=invalid-name,redefined-outer-name
+        """Convert to another timezone."""
+        timestamp: Final = self.__dict__.get("_timestamp")
+        if timestamp is not None and isinstance(tz, tzinfo):
+            return ArrowType.from_int_timestamp(timestamp, tz)
+        return super().to(tz)
+
+    def _compare(
+        self, other: Any, operator: Callable[[Any, Any], bool], fallback: Any
+    ) -> bool:
+        timestamp: Final = self.__dict__.get("_timestamp")
+        if timestamp is not None and isinstance(other, ArrowType):
+            other_timestamp: Final = other.__dict__.get("_timestamp")
+            if other_timestamp is not None:
+                return operator(timestamp, other_timestamp)
+        return cast(bool, fallback(self, other))
+
+    def __eq__(self, other: Any) -> bool:
+        return self._compare(other, int.__eq__, Arrow.__eq__)
+
+    def __ne__(self, other: Any) -> bool:
+        return self._compare(other, int.__ne__, Arrow.__ne__)
+
+    def __lt__(self, other: Any) -> bool:
+        return self._compare(other, int.__lt__, Arrow.__lt__)
+
+    def __le__(self, other: Any) -> bool:
+        return self._compare(other, int.__le__, Arrow.__le__)
+
+    def __gt__(self, other: Any) -> bool:
+        return self._compare(other, int.__gt__, Arrow.__gt__)
+
+    def __ge__(self, other: Any) -> bool:
+        return self._compare(other, int.__ge__, Arrow.__ge__)
+
+    __hash__ = Arrow.__hash__
+
 
 class SleepModel(IntEnum):
     """Sleep model."""
@@ -266,46 +445,184 @@ class SleepGetTimestampValue(ConfiguredBaseModel):
     value: int
 
 
+if sys.version_info >= (3, 8):
+
+    def _readonly_view(values: "array[Any]") -> memoryview:
+        """Get a read only view of an array, without copying it."""
+        return memoryview(values).toreadonly()  # pylint: disable=no-member
+
+
+else:
+
+    def _readonly_view(values: "array[Any]") -> memoryview:
+        """Get a read only copy of an array, toreadonly() is new in 3.8."""
+        return memoryview(values.tobytes()).cast(values.typecode)
+
+
+class SleepGetTimestampValues(Sequence[SleepGetTimestampValue]):
+    """
+    Timestamped values of a sleep series, stored compactly.
+
+    The timestamps and values are kept in two int64 arrays, the
+    SleepGetTimestampValue items are only created when accessed.
+    """
+
+    __slots__ = ("_timestamps", "_values")
+
+    def __init__(self, timestamps: Iterable[int] = (), values: Iterable[int] = ()):
+        """Initialize new object."""
+        self._timestamps: Final = array("q", timestamps)
+        self._values: Final = array("q", values)
+        if len(self._timestamps) != len(self._values):
+            raise ValueError("timestamps and values must have the same length")
+
+    @classmethod
+    def __get_validators__(cls) -> Any:
+        # one or more validators may be yielded which will be called in the
+        # order to validate the input, each validator will receive as an input
+        # the value returned from the previous validator
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: Any) -> "SleepGetTimestampValues":
+        """Convert input to the desired object."""
+        if isinstance(value, SleepGetTimestampValues):
+            return value
+        if not value:
+            return cls()
+        if isinstance(value, dict):
+            timestamps: Final = [int(key) for key in value]
+            try:
+                return cls(timestamps, value.values())
+            except TypeError:
+                # Like pydantic, accept samples sent as floats or strings.
+                return cls(timestamps, [int(sample) for sample in value.values()])
+        if isinstance(value, (list, tuple)):
+            items: Final = [
+                item
+                if isinstance(item, SleepGetTimestampValue)
+                else SleepGetTimestampValue.parse_obj(item)
+                for item in value
+            ]
+            return cls(
+                [item.timestamp.int_timestamp for item in items],
+                [item.value for item in items],
+            )
+
+        raise TypeError("dict or sequence required")
+
+    def as_records(self) -> "SleepGetTimestampValueRecords":
+        """Get the same values, accessed as SleepTimestampValueRecord items."""
+        return SleepGetTimestampValueRecords(self._timestamps, self._values)
+
+    @property
+    def timestamps(self) -> memoryview:
+        """Get the timestamps without copying them."""
+        return _readonly_view(self._timestamps)
+
+    @property
+    def values(self) -> memoryview:
+        """Get the values without copying them."""
+        return _readonly_view(self._values)
+
+    def to_numpy(self) -> Tuple[Any, Any]:
+        """Get the timestamps and values as numpy arrays, without copying them."""
+        try:
+            # pylint: disable=import-outside-toplevel
+            import numpy
+        except ImportError as ex:
+            raise ImportError("numpy is required to use to_numpy()") from ex
+
+        return (
+            numpy.frombuffer(self.timestamps, dtype=numpy.int64),
+            numpy.frombuffer(self.values, dtype=numpy.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> SleepGetTimestampValue:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "SleepGetTimestampValues":  # noqa: F811
+        ...
+
+    def __getitem__(  # noqa: F811
+        self, index: Union[int, slice]
+    ) -> Union[SleepGetTimestampValue, "SleepGetTimestampValues"]:
+        if isinstance(index, slice):
+            return type(self)(self._timestamps[index], self._values[index])
+
+        return self._item(self._timestamps[index], self._values[index])
+
+    @staticmethod
+    def _item(timestamp: int, value: int) -> SleepGetTimestampValue:
+        return SleepGetTimestampValue.construct(
+            timestamp=ArrowType.from_int_timestamp(timestamp), value=value
+        )
+
+    def __iter__(self) -> Iterator[SleepGetTimestampValue]:
+        for timestamp, value in zip(self._timestamps, self._values):
+            yield self._item(timestamp, value)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SleepGetTimestampValues):
+            return bool(
+                self._timestamps == other._timestamps and self._values == other._values
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(
+                item == other_item for item, other_item in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SleepGetTimestampValues":
+        # Nothing can modify the arrays.
+        return self
+
+    def __reduce__(self) -> Any:
+        return type(self), (self._timestamps, self._values)
+
+    def __repr__(self) -> str:
+        return "%s(%s, %s)" % (
+            type(self).__name__,
+            self._timestamps.tolist(),
+            self._values.tolist(),
+        )
+
+
 class SleepGetSerie(ConfiguredBaseModel):
     """SleepGetSerie."""
 
     enddate: ArrowType
     startdate: ArrowType
     state: SleepState
-    hr: Tuple[SleepGetTimestampValue, ...] = ()  # pylint: disable=invalid-name
-    rr: Tuple[SleepGetTimestampValue, ...] = ()  # pylint: disable=invalid-name
-    snoring: Tuple[SleepGetTimestampValue, ...] = ()
+    hr: SleepGetTimestampValues = SleepGetTimestampValues()  # pylint: disable=invalid-name
+    rr: SleepGetTimestampValues = SleepGetTimestampValues()  # pylint: disable=invalid-name
+    snoring: SleepGetTimestampValues = SleepGetTimestampValues()
 
     @validator("hr", pre=True)
     @classmethod
-    def _hr_to_tuple(cls, value: Dict[str, int]) -> Tuple:
+    def _hr_to_tuple(cls, value: Dict[str, int]) -> SleepGetTimestampValues:
         return SleepGetSerie._timestamp_value_to_object(value)
 
     @validator("rr", pre=True)
     @classmethod
-    def _rr_to_tuple(cls, value: Dict[str, int]) -> Tuple:
+    def _rr_to_tuple(cls, value: Dict[str, int]) -> SleepGetTimestampValues:
         return SleepGetSerie._timestamp_value_to_object(value)
 
     @validator("snoring", pre=True)
     @classmethod
-    def _snoring_to_tuple(cls, value: Dict[str, int]) -> Tuple:
+    def _snoring_to_tuple(cls, value: Dict[str, int]) -> SleepGetTimestampValues:
         return SleepGetSerie._timestamp_value_to_object(value)
 
     @classmethod
-    def _timestamp_value_to_object(
-        cls, value: Any
-    ) -> Tuple[SleepGetTimestampValue, ...]:
-        if not value:
-            return ()
-        if isinstance(value, dict):
-            return tuple(
-                [
-                    SleepGetTimestampValue(timestamp=item_key, value=item_value)
-                    for item_key, item_value in value.items()
-                ]
-            )
-
-        return cast(Tuple[SleepGetTimestampValue, ...], value)
+    def _timestamp_value_to_object(cls, value: Any) -> SleepGetTimestampValues:
+        return SleepGetTimestampValues.validate(value)
 
     @validator("state", pre=True)
     @classmethod
@@ -361,31 +678,10 @@ class GetSleepSummarySerie(ConfiguredBaseModel):
     data: GetSleepSummaryData
     id: Optional[int] = None
 
-    @validator("startdate")
-    @classmethod
-    def _set_timezone_on_startdate(
-        cls, value: ArrowType, values: Dict[str, Any]
-    ) -> Arrow:
-        return cast(Arrow, value.to(values["timezone"]))
-
-    @validator("enddate")
+    @validator("startdate", "enddate", "date", "modified")
     @classmethod
-    def _set_timezone_on_enddate(
-        cls, value: ArrowType, values: Dict[str, Any]
-    ) -> Arrow:
-        return cast(Arrow, value.to(values["timezone"]))
-
-    @validator("date")
-    @classmethod
-    def _set_timezone_on_date(cls, value: ArrowType, values: Dict[str, Any]) -> Arrow:
-        return cast(Arrow, value.to(values["timezone"]))
-
-    @validator("modified")
-    @classmethod
-    def _set_timezone_on_modified(
-        cls, value: ArrowType, values: Dict[str, Any]
-    ) -> Arrow:
-        return cast(Arrow, value.to(values["timezone"]))
+    def _set_timezone(cls, value: ArrowType, values: Dict[str, Any]) -> Arrow:
+        return to_timezone(value, values["timezone"])
 
     @validator("model", pre=True)
     @classmethod
@@ -454,7 +750,7 @@ class MeasureGetMeasResponse(ConfiguredBaseModel):
     def _set_timezone_on_updatetime(
         cls, value: ArrowType, values: Dict[str, Any]
     ) -> Arrow:
-        return cast(Arrow, value.to(values["timezone"]))
+        return to_timezone(value, values["timezone"])
 
 
 class MeasureGetActivityActivity(
@@ -523,13 +819,129 @@ class HeartWearPosition(IntEnum):
     LEFT_FOOT = 5
 
 
+# Typecodes able to hold ECG samples, from the most compact one.
+_SIGNAL_TYPECODES: Final = ("h", "i", "q")
+
+
+class HeartSignal(Sequence[int]):
+    """
+    ECG samples stored in a contiguous typed buffer.
+
+    Samples are kept as 16 bit integers, or wider ones when they do not fit.
+    """
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, samples: Iterable[int] = ()):
+        """Initialize new object."""
+        if isinstance(samples, array):
+            self._samples: "array[int]" = samples
+            return
+
+        values: Final = samples if isinstance(samples, (list, tuple)) else list(samples)
+        for typecode in _SIGNAL_TYPECODES:
+            try:
+                self._samples = array(typecode, values)
+                return
+            except OverflowError:
+                continue
+
+        raise OverflowError("signal samples do not fit in 64 bits")
+
+    @classmethod
+    def __get_validators__(cls) -> Any:
+        # one or more validators may be yielded which will be called in the
+        # order to validate the input, each validator will receive as an input
+        # the value returned from the previous validator
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: Any) -> "HeartSignal":
+        """Convert input to the desired object."""
+        if isinstance(value, HeartSignal):
+            return value
+        if isinstance(value, (list, tuple, array)):
+            return cls(value)
+
+        raise TypeError("list, tuple or array required")
+
+    @property
+    def typecode(self) -> str:
+        """Get the array typecode of the samples."""
+        return self._samples.typecode
+
+    @property
+    def buffer(self) -> memoryview:
+        """Get the samples without copying them."""
+        return _readonly_view(self._samples)
+
+    def to_numpy(self) -> Any:
+        """Get the samples as a numpy array, without copying them."""
+        try:
+            # pylint: disable=import-outside-toplevel
+            import numpy
+        except ImportError as ex:
+            raise ImportError("numpy is required to use to_numpy()") from ex
+
+        return numpy.frombuffer(self.buffer, dtype=self._samples.typecode)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @overload
+    def __getitem__(self, index: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "HeartSignal":  # noqa: F811
+        ...
+
+    def __getitem__(  # noqa: F811
+        self, index: Union[int, slice]
+    ) -> Union[int, "HeartSignal"]:
+        if isinstance(index, slice):
+            return HeartSignal(self._samples[index])
+        return self._samples[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._samples)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, HeartSignal):
+            return bool(self._samples == other._samples)
+        if isinstance(other, (list, tuple)):
+            return len(self._samples) == len(other) and all(
+                sample == other_sample
+                for sample, other_sample in zip(self._samples, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "HeartSignal":
+        # Nothing can modify the samples.
+        return self
+
+    def __reduce__(self) -> Any:
+        # Arrays pickle as their raw bytes, not one int per sample.
+        return HeartSignal, (self._samples,)
+
+    def __repr__(self) -> str:
+        return "HeartSignal(%s)" % self._samples.tolist()
+
+
 class HeartGetResponse(ConfiguredBaseModel):
     """HeartGetResponse."""
 
-    signal: Tuple[int, ...]
+    signal: HeartSignal
     sampling_frequency: int
     wearposition: HeartWearPosition
 
+    class Config:
+        """Config for pydantic model."""
+
+        json_encoders: Final = {HeartSignal: list}
+
     @validator("wearposition", pre=True)
     @classmethod
     def _wearposition_to_enum(cls, value: Any) -> HeartWearPosition:
@@ -654,6 +1066,121 @@ class NotifyListResponse(ConfiguredBaseModel):
     profiles: Tuple[NotifyListProfile, ...]
 
 
+class SleepTimestampValueRecord(NamedTuple):
+    """Lightweight SleepGetTimestampValue."""
+
+    timestamp: Arrow
+    value: int
+
+
+class SleepGetTimestampValueRecords(SleepGetTimestampValues):
+    """SleepGetTimestampValues with SleepTimestampValueRecord items."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def _item(  # type: ignore
+        timestamp: int, value: int
+    ) -> SleepTimestampValueRecord:
+        return SleepTimestampValueRecord(ArrowType.from_int_timestamp(timestamp), value)
+
+
+class MeasureRecord(NamedTuple):
+    """Lightweight MeasureGetMeasMeasure."""
+
+    type: MeasureType
+    unit: int
+    value: int
+
+    @classmethod
+    def parse(cls, data: Dict[str, Any]) -> "MeasureRecord":
+        """Create a record from data of the API."""
+        return cls(
+            to_enum(MeasureType, data["type"], MeasureType.UNKNOWN),
+            data["unit"],
+            data["value"],
+        )
+
+
+class MeasureGroupRecord(NamedTuple):
+    """Lightweight MeasureGetMeasGroup."""
+
+    attrib: MeasureGetMeasGroupAttrib
+    category: MeasureGetMeasGroupCategory
+    created: Arrow
+    date: Arrow
+    deviceid: Optional[str]
+    grpid: int
+    measures: Tuple[MeasureRecord, ...]
+
+    @classmethod
+    def parse(cls, data: Dict[str, Any]) -> "MeasureGroupRecord":
+        """Create a record from data of the API."""
+        return cls(
+            to_enum(
+                MeasureGetMeasGroupAttrib,
+                data["attrib"],
+                MeasureGetMeasGroupAttrib.UNKNOWN,
+            ),
+            to_enum(
+                MeasureGetMeasGroupCategory,
+                data["category"],
+                MeasureGetMeasGroupCategory.UNKNOWN,
+            ),
+            ArrowType.validate(data["created"]),
+            ArrowType.validate(data["date"]),
+            data.get("deviceid"),
+            data["grpid"],
+            tuple([MeasureRecord.parse(measure) for measure in data["measures"]]),
+        )
+
+
+class ActivityRecord(NamedTuple):  # pylint: disable=too-many-instance-attributes
+    """Lightweight MeasureGetActivityActivity."""
+
+    date: Arrow
+    timezone: tzinfo
+    deviceid: Optional[str]
+    brand: int
+    is_tracker: bool
+    steps: Optional[int]
+    distance: Optional[float]
+    elevation: Optional[float]
+    soft: Optional[int]
+    moderate: Optional[int]
+    intense: Optional[int]
+    active: Optional[int]
+    calories: Optional[float]
+    totalcalories: float
+    hr_average: Optional[int]
+    hr_min: Optional[int]
+    hr_max: Optional[int]
+    hr_zone_0: Optional[int]
+    hr_zone_1: Optional[int]
+    hr_zone_2: Optional[int]
+    hr_zone_3: Optional[int]
+
+    @classmethod
+    def parse(cls, data: Dict[str, Any]) -> "ActivityRecord":
+        """Create a record from data of the API."""
+        return cls(
+            ArrowType.validate(data["date"]),
+            TimeZone.validate(data["timezone"]),
+            *cast(List[Any], [data.get(name) for name in cls._fields[2:]]),
+        )
+
+
+# Record types replacing models when parsing with records=True.
+_RECORD_PARSERS: Final[Dict[Any, Callable[[Any], Any]]] = {
+    MeasureGetMeasMeasure: MeasureRecord.parse,
+    MeasureGetMeasGroup: MeasureGroupRecord.parse,
+    MeasureGetActivityActivity: ActivityRecord.parse,
+    SleepGetTimestampValues: lambda value: SleepGetTimestampValues.validate(
+        value
+    ).as_records(),
+}
+
+
 class NotifyGetResponse(ConfiguredBaseModel):
     """NotifyGetResponse."""
 
@@ -667,6 +1194,231 @@ class NotifyGetResponse(ConfiguredBaseModel):
         return to_enum(NotifyAppli, value, NotifyAppli.UNKNOWN)
 
 
+_TrustedFieldType = Tuple[
+    str, str, ModelField, List[Any], Optional[Callable[[Any], Any]], List[Any]
+]
+_TRUSTED_PLANS: Final[
+    Dict[Tuple[Type[BaseModel], bool], Tuple[_TrustedFieldType, ...]]
+] = {}
+
+
+def _trusted_model_converter(
+    model: Type[BaseModel], records: bool
+) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        if isinstance(value, model):
+            return value
+        return parse_trusted(model, value, records=records)
+
+    return convert
+
+
+def _trusted_converter(
+    field: ModelField, records: bool
+) -> Optional[Callable[[Any], Any]]:
+    """Get the conversion of a field value that cannot be skipped."""
+    type_: Final = field.type_
+    convert: Optional[Callable[[Any], Any]] = None
+    if records and type_ in _RECORD_PARSERS:
+        convert = _RECORD_PARSERS[type_]
+    elif isinstance(type_, type) and issubclass(type_, BaseModel):
+        convert = _trusted_model_converter(type_, records)
+    elif type_ in (ArrowType, TimeZone, SleepGetTimestampValues, HeartSignal):
+        convert = cast(Any, type_).validate
+
+    if field.shape != SHAPE_TUPLE_ELLIPSIS:
+        return convert
+    if convert is None:
+        return tuple
+
+    item_convert: Final = convert
+    return lambda value: tuple([item_convert(item) for item in value])
+
+
+def _trusted_plan(
+    model: Type[BaseModel], records: bool
+) -> Tuple[_TrustedFieldType, ...]:
+    plan = _TRUSTED_PLANS.get((model, records))
+    if plan is None:
+        plan = _TRUSTED_PLANS[(model, records)] = tuple(
+            (
+                name,
+                field.alias,
+                field,
+                list(field.pre_validators or ()),
+                _trusted_converter(field, records),
+                list(field.post_validators or ()),
+            )
+            for name, field in model.__fields__.items()
+        )
+
+    return plan
+
+
+def parse_trusted(
+    model: Type[_ModelType], data: Dict[str, Any], records: bool = False
+) -> _ModelType:
+    """
+    Create a response model from data known to match it, without validating it.
+
+    The model's own validators still run and nested models, dates and
+    timezones are still converted, but the types of other values are not
+    checked. Malformed data gives malformed models or unexpected exceptions.
+
+    With records, measures, measure groups, activities and sleep values are
+    created as the lightweight record types having the same attributes.
+    """
+    if records and model in _RECORD_PARSERS:
+        return cast(_ModelType, _RECORD_PARSERS[model](data))
+
+    values: Final[Dict[str, Any]] = {}
+    for name, alias, field, pre_validators, convert, post_validators in _trusted_plan(
+        model, records
+    ):
+        if alias not in data:
+            values[name] = field.get_default()
+            continue
+
+        value = data[alias]
+        for pre_validator in pre_validators:
+            value = pre_validator(model, value, values, field, field.model_config)
+        if value is not None and convert is not None:
+            value = convert(value)
+        for post_validator in post_validators:
+            value = post_validator(model, value, values, field, field.model_config)
+        values[name] = value
+
+    # Like model.construct() without filling in the values a second time.
+    instance: Final = cast(_ModelType, model.__new__(model))
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__fields_set__", set(data).intersection(values))
+    return instance
+
+
+class LazySequence(Sequence[_GenericType]):
+    """
+    Items of a response, each one parsed when it is first accessed.
+
+    The raw items are kept and every parsed item is remembered, so an item is
+    parsed at most once.
+    """
+
+    __slots__ = ("_raw", "_parse", "_items")
+
+    def __init__(
+        self, raw: Sequence[Any], parse: Callable[[Any], _GenericType]
+    ) -> None:
+        """Initialize new object."""
+        self._raw: Final = raw
+        self._parse: Final = parse
+        self._items: Final[List[Any]] = [_NOT_PARSED] * len(raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    @overload
+    def __getitem__(self, index: int) -> _GenericType:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[_GenericType, ...]:  # noqa: F811
+        ...
+
+    def __getitem__(  # noqa: F811
+        self, index: Union[int, slice]
+    ) -> Union[_GenericType, Tuple[_GenericType, ...]]:
+        if isinstance(index, slice):
+            return tuple([self[item] for item in range(*index.indices(len(self._raw)))])
+
+        item = self._items[index]
+        if item is _NOT_PARSED:
+            item = self._items[index] = self._parse(self._raw[index])
+        return cast(_GenericType, item)
+
+    def __iter__(self) -> Iterator[_GenericType]:
+        for index in range(len(self._raw)):
+            yield self[index]
+
+    @property
+    def parsed_count(self) -> int:
+        """Get how many items were parsed so far."""
+        return len(self._items) - self._items.count(_NOT_PARSED)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (LazySequence, list, tuple)):
+            return len(self) == len(other) and all(
+                item == other_item for item, other_item in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __reduce__(self) -> Any:
+        return tuple, (tuple(self),)
+
+    def __repr__(self) -> str:
+        return "LazySequence(%s)" % repr(tuple(self))
+
+
+_NOT_PARSED: Final = object()
+_LAZY_FIELDS: Final[Dict[Type[BaseModel], Tuple[Tuple[str, str, Any], ...]]] = {}
+
+
+def _lazy_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, str, Any], ...]:
+    fields = _LAZY_FIELDS.get(model)
+    if fields is None:
+        fields = _LAZY_FIELDS[model] = tuple(
+            (name, field.alias, field.type_)
+            for name, field in model.__fields__.items()
+            if field.shape == SHAPE_TUPLE_ELLIPSIS
+            and isinstance(field.type_, type)
+            and issubclass(field.type_, BaseModel)
+        )
+    return fields
+
+
+def _lazy_item_parser(
+    model: Type[BaseModel], trusted: bool, records: bool
+) -> Callable[[Any], Any]:
+    if records and model in _RECORD_PARSERS:
+        return _RECORD_PARSERS[model]
+    if trusted or records:
+        return lambda item: parse_trusted(model, item, records=records)
+    return lambda item: model(**item)
+
+
+def parse_lazy(
+    model: Type[_ModelType],
+    data: Dict[str, Any],
+    trusted: bool = False,
+    records: bool = False,
+) -> _ModelType:
+    """
+    Create a response model whose lists of nested models are parsed lazily.
+
+    Lists like series, measuregrps or activities become LazySequence objects,
+    their items are only parsed, validated unless trusted, when accessed.
+    Everything else is parsed right away, so reading more and offset is cheap.
+    """
+    fields: Final = _lazy_fields(model)
+    eager: Final = dict(data)
+    for _, alias, _ in fields:
+        if alias in eager:
+            eager[alias] = ()
+
+    instance: Final = (
+        parse_trusted(model, eager, records=records)
+        if trusted or records
+        else model(**eager)
+    )
+    for name, alias, item_model in fields:
+        if alias in data:
+            instance.__dict__[name] = LazySequence(
+                data[alias], _lazy_item_parser(item_model, trusted, records)
+            )
+    return instance
+
+
 class UnexpectedTypeException(Exception):
     """Thrown when encountering an unexpected type."""
 
@@ -701,6 +1453,59 @@ class MeasureTypes:
     ANY: Final = tuple(enum_val for enum_val in MeasureType)
 
 
+def replace_measures(
+    group: Union[MeasureGetMeasGroup, MeasureGroupRecord],
+    measures: Tuple[MeasureGetMeasMeasure, ...],
+) -> MeasureGetMeasGroup:
+    """Get a copy of an already parsed group with other measures."""
+    if isinstance(group, MeasureGroupRecord):
+        return cast(MeasureGetMeasGroup, group._replace(measures=cast(Any, measures)))
+    return MeasureGetMeasGroup.construct(
+        attrib=group.attrib,
+        category=group.category,
+        created=group.created,
+        date=group.date,
+        deviceid=group.deviceid,
+        grpid=group.grpid,
+        measures=measures,
+    )
+
+
+def _as_tuple(value: Union[Any, Tuple[Any, ...]]) -> Tuple[Any, ...]:
+    return value if isinstance(value, tuple) else (value,)
+
+
+def _source_groups(from_source: Any) -> Iterable[MeasureGetMeasGroup]:
+    if isinstance(from_source, MeasureGetMeasResponse):
+        return from_source.measuregrps
+    if isinstance(from_source, (MeasureGetMeasGroup, MeasureGroupRecord)):
+        return (cast(MeasureGetMeasGroup, from_source),)
+    return cast(Iterable[MeasureGetMeasGroup], from_source)
+
+
+def _groups_in_range(
+    groups: Iterable[MeasureGetMeasGroup],
+    start: Optional[DateType],
+    end: Optional[DateType],
+) -> Iterator[MeasureGetMeasGroup]:
+    start_timestamp: Final = None if start is None else arrow.get(start).int_timestamp
+    end_timestamp: Final = None if end is None else arrow.get(end).int_timestamp
+    for group in groups:
+        timestamp = group.date.int_timestamp
+        if (start_timestamp is None or timestamp >= start_timestamp) and (
+            end_timestamp is None or timestamp <= end_timestamp
+        ):
+            yield group
+
+
+def _only_measure_types(
+    group: MeasureGetMeasGroup, meastypes: Tuple[MeasureType, ...]
+) -> MeasureGetMeasGroup:
+    return replace_measures(
+        group, tuple(measure for measure in group.measures if measure.type in meastypes)
+    )
+
+
 def query_measure_groups(
     from_source: Union[
         MeasureGetMeasGroup, MeasureGetMeasResponse, Tuple[MeasureGetMeasGroup, ...]
@@ -709,14 +1514,18 @@ def query_measure_groups(
     with_group_attrib: Union[
         MeasureGetMeasGroupAttrib, Tuple[MeasureGetMeasGroupAttrib, ...]
     ] = MeasureGroupAttribs.ANY,
+    start: Optional[DateType] = None,
+    end: Optional[DateType] = None,
 ) -> Tuple[MeasureGetMeasGroup, ...]:
-    """Return a groups and measurements based on filters."""
-    if isinstance(from_source, MeasureGetMeasResponse):
-        iter_groups = cast(MeasureGetMeasResponse, from_source).measuregrps
-    elif isinstance(from_source, MeasureGetMeasGroup):
-        iter_groups = (cast(MeasureGetMeasGroup, from_source),)
-    else:
-        iter_groups = cast(Tuple[MeasureGetMeasGroup], from_source)
+    """
+    Return a groups and measurements based on filters.
+
+    start and end, both included, limit the dates of the groups. Every group is
+    looked at, MeasureStore.query finds the groups of a date range faster.
+    """
+    iter_groups: Iterable[MeasureGetMeasGroup] = _source_groups(from_source)
+    if start is not None or end is not None:
+        iter_groups = _groups_in_range(iter_groups, start, end)
 
     if isinstance(with_measure_type, MeasureType):
         iter_measure_type = (cast(MeasureType, with_measure_type),)
@@ -729,19 +1538,7 @@ def query_measure_groups(
         iter_group_attrib = cast(Tuple[MeasureGetMeasGroupAttrib], with_group_attrib)
 
     return tuple(
-        MeasureGetMeasGroup(
-            attrib=group.attrib,
-            category=group.category,
-            created=group.created,
-            date=group.date,
-            deviceid=group.deviceid,
-            grpid=group.grpid,
-            measures=tuple(
-                measure
-                for measure in group.measures
-                if measure.type in iter_measure_type
-            ),
-        )
+        _only_measure_types(group, iter_measure_type)
         for group in iter_groups
         if group.attrib in iter_group_attrib
     )
@@ -757,28 +1554,86 @@ def get_measure_value(
     ] = MeasureGroupAttribs.ANY,
 ) -> Optional[float]:
     """Get the first value of a measure that meet the query requirements."""
-    groups: Final = query_measure_groups(
-        from_source, with_measure_type, with_group_attrib
-    )
+    meastypes: Final = _as_tuple(with_measure_type)
+    attribs: Final = _as_tuple(with_group_attrib)
 
     return next(
-        iter(
-            tuple(
-                float(measure.value * pow(10, measure.unit))
-                for group in groups
-                for measure in group.measures
-            )
+        (
+            float(measure.value * pow(10, measure.unit))
+            for group in _source_groups(from_source)
+            if group.attrib in attribs
+            for measure in group.measures
+            if measure.type in meastypes
         ),
         None,
     )
 
 
+class MeasureValue(NamedTuple):
+    """A scaled measure value and the date of its group."""
+
+    value: float
+    date: Arrow
+
+
+def get_measure_values(
+    from_source: Union[
+        MeasureGetMeasGroup, MeasureGetMeasResponse, Iterable[MeasureGetMeasGroup]
+    ],
+    with_measure_types: Iterable[MeasureType] = MeasureTypes.ANY,
+    with_group_attrib: Union[
+        MeasureGetMeasGroupAttrib, Tuple[MeasureGetMeasGroupAttrib, ...]
+    ] = MeasureGroupAttribs.ANY,
+    latest: bool = False,
+) -> Dict[MeasureType, MeasureValue]:
+    """
+    Get the value of each measure type in a single pass over the groups.
+
+    By default the first value of every type is kept, like get_measure_value,
+    and the pass stops once all types were found. With latest the value of the
+    newest group is kept instead, which needs every group to be looked at.
+    Types without any value are left out.
+    """
+    wanted: Final = frozenset(with_measure_types)
+    missing: Final = set(wanted)
+    attribs: Final = _as_tuple(with_group_attrib)
+    values: Final[Dict[MeasureType, MeasureValue]] = {}
+    dates: Final[Dict[MeasureType, int]] = {}
+
+    for group in _source_groups(from_source):
+        if group.attrib not in attribs:
+            continue
+
+        date = group.date.int_timestamp if latest else 0
+        for measure in group.measures:
+            meastype = measure.type
+            if latest:
+                if meastype not in wanted or (
+                    meastype in dates and date <= dates[meastype]
+                ):
+                    continue
+            elif meastype in missing:
+                missing.discard(meastype)
+            else:
+                continue
+            dates[meastype] = date
+            values[meastype] = MeasureValue(
+                float(measure.value * pow(10, measure.unit)), group.date
+            )
+
+        if not missing and not latest:
+            break
+
+    return values
+
+
 class StatusException(Exception):
     """Status exception."""
 
     def __init__(self, status: Any):
         """Create instance."""
         super().__init__("Error code %s" % str(status))
+        self.status: Final = status
 
 
 class AuthFailedException(StatusException):
@@ -0,0 +1,168 @@
+"""Fan out calls over the clients of many users."""
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from typing_extensions import Final
+
+_ResultType = TypeVar("_ResultType")
+
+CallType = Union[str, Callable[..., Any]]
+
+_NO_MORE_KEYS: Final = object()
+
+
+@dataclass(frozen=True)
+class PoolResult(Generic[_ResultType]):
+    """The outcome of a call for one user, either a value or an exception."""
+
+    key: Hashable
+    value: Optional[_ResultType] = None
+    exception: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if the call did not raise."""
+        return self.exception is None
+
+    def get(self) -> _ResultType:
+        """Return the value or raise the exception of the call."""
+        if self.exception is not None:
+            raise self.exception
+        return cast(_ResultType, self.value)
+
+
+def _bind(func: CallType, args: Any, kwargs: Any) -> Callable[[Any], Any]:
+    """Turn a method name or a callable into a function of an api object."""
+    if isinstance(func, str):
+        name: Final = func
+        return lambda api: getattr(api, name)(*args, **kwargs)
+    method: Final = func
+    return lambda api: method(api, *args, **kwargs)
+
+
+class WithingsApiPool:
+    """
+    Holds the api objects of many users and runs calls for all of them.
+
+    Results are streamed back as they complete. An exception raised for one
+    user, such as the ones from response_body_or_raise, is returned in its
+    PoolResult instead of aborting the batch.
+
+    pool = WithingsApiPool({user.id: WithingsApi(user.creds) for user in users})
+    for result in pool.map("measure_get_meas", lastupdate=last_sync):
+        if result.ok:
+            save(result.key, result.value)
+    """
+
+    def __init__(
+        self, apis: Optional[Mapping[Hashable, Any]] = None, max_workers: int = 10
+    ):
+        """Initialize new object."""
+        self._apis: Final[Dict[Hashable, Any]] = dict(apis or {})
+        self._max_workers: Final = max_workers
+
+    def __len__(self) -> int:
+        return len(self._apis)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._apis
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._apis[key]
+
+    def add(self, key: Hashable, api: Any) -> None:
+        """Add or replace the api object of a user."""
+        self._apis[key] = api
+
+    def remove(self, key: Hashable) -> None:
+        """Remove the api object of a user."""
+        del self._apis[key]
+
+    def keys(self) -> Iterable[Hashable]:
+        """Get the keys of all users."""
+        return tuple(self._apis)
+
+    def map(
+        self,
+        func: CallType,
+        *args: Any,
+        keys: Optional[Iterable[Hashable]] = None,
+        **kwargs: Any,
+    ) -> Iterator[PoolResult]:
+        """
+        Run a call for every user on a bounded thread pool.
+
+        func is either the name of an api method or a callable taking the api
+        object as first argument. Extra arguments are passed along.
+        """
+        call: Final = _bind(func, args, kwargs)
+        pending_keys: Final = iter(tuple(self._apis) if keys is None else keys)
+        in_flight: Dict[Future, Hashable] = {}
+
+        def run(key: Hashable) -> PoolResult:
+            try:
+                return PoolResult(key=key, value=call(self._apis[key]))
+            except Exception as ex:  # pylint: disable=broad-except
+                return PoolResult(key=key, exception=ex)
+
+        def submit_next(executor: ThreadPoolExecutor) -> None:
+            key: Final = next(pending_keys, _NO_MORE_KEYS)
+            if key is not _NO_MORE_KEYS:
+                in_flight[executor.submit(run, key)] = key
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for _ in range(self._max_workers * 2):
+                submit_next(executor)
+
+            while in_flight:
+                done: Set[Future] = wait(in_flight, return_when=FIRST_COMPLETED)[0]
+                for future in done:
+                    del in_flight[future]
+                    yield future.result()
+                    submit_next(executor)
+
+    async def map_async(
+        self,
+        func: Union[str, Callable[..., Awaitable[Any]]],
+        *args: Any,
+        keys: Optional[Iterable[Hashable]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[PoolResult]:
+        """
+        Run a coroutine call for every user on the running event loop.
+
+        Same as map but for AsyncWithingsApi objects, at most max_workers calls
+        are in flight at once.
+        """
+        call: Final = _bind(func, args, kwargs)
+        semaphore: Final = asyncio.Semaphore(self._max_workers)
+
+        async def run(key: Hashable) -> PoolResult:
+            async with semaphore:
+                try:
+                    return PoolResult(key=key, value=await call(self._apis[key]))
+                except Exception as ex:  # pylint: disable=broad-except
+                    return PoolResult(key=key, exception=ex)
+
+        for next_result in asyncio.as_completed(
+            [run(key) for key in (tuple(self._apis) if keys is None else keys)]
+        ):
+            yield await next_result
@@ -0,0 +1,170 @@
+"""Client side rate limiting of Withings API requests."""
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+from typing_extensions import Final
+
+# Withings allows 120 requests per minute per application.
+DEFAULT_RATE: Final = 2.0
+DEFAULT_BURST: Final = 10.0
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket whose rate adapts to throttling.
+
+    Each throttled request multiplies the rate by decrease_factor, down to
+    min_rate. Each successful request then adds back recovery_step of the
+    configured rate until it is reached again.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        recovery_step: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize new object."""
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.max_rate: Final = rate
+        self.burst: Final = burst if burst is not None else rate
+        self.min_rate: Final = min_rate if min_rate is not None else rate / 10
+        self._decrease_factor: Final = decrease_factor
+        self._recovery_step: Final = recovery_step
+        self._clock: Final = clock
+        self._lock: Final = threading.Lock()
+        self._rate = rate
+        self._tokens = self.burst
+        self._updated = clock()
+
+    @property
+    def rate(self) -> float:
+        """Get the current rate in requests per second."""
+        return self._rate
+
+    def _refill(self) -> None:
+        now: Final = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return abs(self._tokens) / self._rate
+
+    def on_throttled(self) -> None:
+        """Slow down after the API reported too many requests."""
+        with self._lock:
+            self._refill()
+            self._rate = max(self.min_rate, self._rate * self._decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+
+    def on_success(self) -> None:
+        """Recover towards the configured rate."""
+        with self._lock:
+            if self._rate < self.max_rate:
+                self._refill()
+                self._rate = min(
+                    self.max_rate, self._rate + self.max_rate * self._recovery_step
+                )
+
+
+class UserRateLimiter:
+    """Rate limiter of a single user, drawing from its client's bucket too."""
+
+    def __init__(
+        self,
+        client_bucket: TokenBucket,
+        user_bucket: Optional[TokenBucket] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize new object."""
+        self._buckets: Final = tuple(
+            bucket for bucket in (client_bucket, user_bucket) if bucket is not None
+        )
+        self._sleep: Final = sleep
+
+    def reserve(self) -> float:
+        """Take a token from every bucket and return the seconds to wait."""
+        return max([bucket.reserve() for bucket in self._buckets])
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        delay: Final = self.reserve()
+        if delay > 0:
+            self._sleep(delay)
+
+    def on_throttled(self) -> None:
+        """Slow down after the API reported too many requests."""
+        for bucket in self._buckets:
+            bucket.on_throttled()
+
+    def on_success(self) -> None:
+        """Recover towards the configured rate."""
+        for bucket in self._buckets:
+            bucket.on_success()
+
+
+class RateLimiter:
+    """
+    Rate limiter for all the users of a client_id.
+
+    Share one instance between the api objects of every user of the same
+    application. rate and burst bound the requests of the application as a
+    whole, user_rate and user_burst optionally bound each user.
+
+    limiter = RateLimiter(rate=2, user_rate=0.5)
+    api = WithingsApi(creds, rate_limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: Optional[float] = DEFAULT_BURST,
+        user_rate: Optional[float] = None,
+        user_burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize new object."""
+        self._client_bucket: Final = TokenBucket(rate=rate, burst=burst, clock=clock)
+        self._user_rate: Final = user_rate
+        self._user_burst: Final = user_burst
+        self._clock: Final = clock
+        self._sleep: Final = sleep
+        self._lock: Final = threading.Lock()
+        self._users: Final[Dict[Hashable, UserRateLimiter]] = {}
+
+    @property
+    def client_bucket(self) -> TokenBucket:
+        """Get the bucket shared by all users."""
+        return self._client_bucket
+
+    def for_user(self, userid: Hashable) -> UserRateLimiter:
+        """Get the rate limiter of a user."""
+        with self._lock:
+            if userid not in self._users:
+                self._users[userid] = UserRateLimiter(
+                    client_bucket=self._client_bucket,
+                    user_bucket=TokenBucket(
+                        rate=self._user_rate, burst=self._user_burst, clock=self._clock
+                    )
+                    if self._user_rate
+                    else None,
+                    sleep=self._sleep,
+                )
+            return self._users[userid]
@@ -0,0 +1,113 @@
+"""Retrying of transient Withings API failures."""
+import asyncio
+from dataclasses import dataclass
+import random
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple, Type, TypeVar
+
+import requests
+from typing_extensions import Final
+
+from .common import StatusException
+from .const import (
+    STATUS_BAD_STATE,
+    STATUS_ERROR_OCCURRED,
+    STATUS_TIMEOUT,
+    STATUS_TOO_MANY_REQUESTS,
+)
+
+_ResultType = TypeVar("_ResultType")
+
+DEFAULT_RETRYABLE_STATUSES: Final = (
+    STATUS_TIMEOUT + STATUS_ERROR_OCCURRED + STATUS_BAD_STATE + STATUS_TOO_MANY_REQUESTS
+)
+_RETRYABLE_EXCEPTIONS: Final[List[Type[Exception]]] = [
+    requests.ConnectionError,
+    requests.Timeout,
+    ConnectionError,
+    asyncio.TimeoutError,
+]
+
+try:
+    import aiohttp
+except ImportError:
+    pass
+else:
+    # Connection failures of aiohttp are not builtin ConnectionErrors.
+    _RETRYABLE_EXCEPTIONS.append(aiohttp.ClientConnectionError)
+
+DEFAULT_RETRYABLE_EXCEPTIONS: Final = tuple(_RETRYABLE_EXCEPTIONS)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how often to retry a failed request.
+
+    A request is attempted at most max_attempts times. Between attempts it
+    waits a random delay of up to backoff_base * 2 ** (attempt - 1) seconds,
+    capped at backoff_max. No new attempt is started if it would begin after
+    deadline seconds from the first one.
+
+    api = WithingsApi(creds, retry_policy=RetryPolicy(max_attempts=5))
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    deadline: Optional[float] = 60.0
+    retryable_statuses: Tuple[int, ...] = DEFAULT_RETRYABLE_STATUSES
+    retryable_exceptions: Tuple[Type[Exception], ...] = DEFAULT_RETRYABLE_EXCEPTIONS
+
+    def is_retryable(self, ex: Exception) -> bool:
+        """Return True if the exception is a transient failure."""
+        if isinstance(ex, StatusException):
+            return ex.status in self.retryable_statuses
+        return isinstance(ex, self.retryable_exceptions)
+
+    def backoff(self, attempt: int) -> float:
+        """Get the jittered delay to wait after the given failed attempt."""
+        ceiling: Final = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)  # nosec
+
+    def _next_delay(self, ex: Exception, attempt: int, elapsed: float) -> float:
+        """Get the delay before the next attempt or raise if there is none."""
+        if attempt >= self.max_attempts or not self.is_retryable(ex):
+            raise ex
+
+        delay: Final = self.backoff(attempt)
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            raise ex
+
+        return delay
+
+    def call(
+        self,
+        func: Callable[[], _ResultType],
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> _ResultType:
+        """Call func, retrying it according to this policy."""
+        started: Final = clock()
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except Exception as ex:  # pylint: disable=broad-except
+                sleep(self._next_delay(ex, attempt, clock() - started))
+            attempt += 1
+
+    async def call_async(
+        self,
+        func: Callable[[], Awaitable[_ResultType]],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> _ResultType:
+        """Await func, retrying it according to this policy."""
+        started: Final = clock()
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as ex:  # pylint: disable=broad-except
+                await asyncio.sleep(self._next_delay(ex, attempt, clock() - started))
+            attempt += 1
@@ -0,0 +1,273 @@
+"""In-memory index of measure groups for repeated queries."""
+from bisect import bisect_left, insort
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import arrow
+from typing_extensions import Final
+
+from .common import (
+    DateType,
+    MeasureGetMeasGroup,
+    MeasureGetMeasGroupAttrib,
+    MeasureGetMeasGroupCategory,
+    MeasureGetMeasResponse,
+    MeasureGroupAttribs,
+    MeasureType,
+    MeasureTypes,
+    MeasureValue,
+    _as_tuple,
+    _only_measure_types,
+    _source_groups,
+    get_measure_values,
+)
+
+MeasureSourceType = Union[
+    MeasureGetMeasResponse, MeasureGetMeasGroup, Iterable[MeasureGetMeasGroup]
+]
+_GroupAttribType = Union[
+    MeasureGetMeasGroupAttrib, Tuple[MeasureGetMeasGroupAttrib, ...]
+]
+
+
+def _timestamp(value: DateType) -> int:
+    return int(arrow.get(value).int_timestamp)
+
+
+class MeasureStore:
+    """
+    Measure groups of a user, indexed by measure type, attrib, category and date.
+
+    Groups are added from responses, single groups or iterables of groups,
+    either models or records. A group added again with the same grpid replaces
+    the previous one. Queries look up the matching groups in the indexes, newest
+    first, and return them without validating anything again.
+
+    The groups are also kept sorted by date, so queries limited to a range of
+    dates, from start to end included, only look at the groups of that range.
+    Pages can be added in any order.
+
+    store = MeasureStore(api.measure_get_meas(startdate=start, enddate=end))
+    weight = store.get_measure_value(MeasureType.WEIGHT)
+    """
+
+    def __init__(self, *sources: MeasureSourceType):
+        """Initialize new object."""
+        self._groups: Final[Dict[int, MeasureGetMeasGroup]] = {}
+        self._types: Final[Dict[int, FrozenSet[MeasureType]]] = {}
+        self._dates: Final[Dict[int, int]] = {}
+        # (-date, grpid) of every group, newest first like the queries.
+        self._order: Final[List[Tuple[int, int]]] = []
+        self._by_type: Final[Dict[MeasureType, Set[int]]] = {}
+        self._by_attrib: Final[Dict[MeasureGetMeasGroupAttrib, Set[int]]] = {}
+        self._by_category: Final[Dict[MeasureGetMeasGroupCategory, Set[int]]] = {}
+        for source in sources:
+            self.add(source)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __iter__(self) -> Iterator[MeasureGetMeasGroup]:
+        """Iterate over the groups, newest first."""
+        return (self._groups[grpid] for _, grpid in self._order)
+
+    def __contains__(self, grpid: object) -> bool:
+        return grpid in self._groups
+
+    def add(self, source: MeasureSourceType) -> None:
+        """Add the groups of a response, a single group or an iterable of groups."""
+        for group in _source_groups(source):
+            self._add_group(group)
+
+    def _add_group(self, group: MeasureGetMeasGroup) -> None:
+        grpid: Final = group.grpid
+        if grpid in self._groups:
+            self.remove(grpid)
+
+        meastypes: Final = frozenset(measure.type for measure in group.measures)
+        self._groups[grpid] = group
+        self._types[grpid] = meastypes
+        self._dates[grpid] = group.date.int_timestamp
+        insort(self._order, (-self._dates[grpid], grpid))
+        for meastype in meastypes:
+            self._by_type.setdefault(meastype, set()).add(grpid)
+        self._by_attrib.setdefault(group.attrib, set()).add(grpid)
+        self._by_category.setdefault(group.category, set()).add(grpid)
+
+    def remove(self, grpid: int) -> None:
+        """Remove a group, raise KeyError if it is unknown."""
+        group: Final = self._groups.pop(grpid)
+        for meastype in self._types.pop(grpid):
+            self._by_type[meastype].discard(grpid)
+        del self._order[bisect_left(self._order, (-self._dates.pop(grpid), grpid))]
+        self._by_attrib[group.attrib].discard(grpid)
+        self._by_category[group.category].discard(grpid)
+
+    def get_group(self, grpid: int) -> Optional[MeasureGetMeasGroup]:
+        """Get a group by its id."""
+        return self._groups.get(grpid)
+
+    def _find(
+        self,
+        meastypes: Tuple[MeasureType, ...],
+        attribs: Tuple[MeasureGetMeasGroupAttrib, ...],
+        categories: Optional[Tuple[MeasureGetMeasGroupCategory, ...]],
+    ) -> Set[int]:
+        """Get the ids of the matching groups from the indexes."""
+        grpids: Final[Set[int]] = set()
+        for meastype in meastypes:
+            grpids.update(self._by_type.get(meastype, ()))
+
+        with_attrib: Final[Set[int]] = set()
+        for attrib in attribs:
+            with_attrib.update(self._by_attrib.get(attrib, ()))
+        grpids.intersection_update(with_attrib)
+
+        if categories is not None:
+            with_category: Final[Set[int]] = set()
+            for category in categories:
+                with_category.update(self._by_category.get(category, ()))
+            grpids.intersection_update(with_category)
+
+        return grpids
+
+    def _find_in_range(
+        self,
+        meastypes: Tuple[MeasureType, ...],
+        attribs: Tuple[MeasureGetMeasGroupAttrib, ...],
+        categories: Optional[Tuple[MeasureGetMeasGroupCategory, ...]],
+        start: Optional[DateType],
+        end: Optional[DateType],
+    ) -> Iterator[int]:
+        """Iterate over the ids of the matching groups of a range, newest first."""
+        order: Final = self._order
+        low: Final = 0 if end is None else bisect_left(order, (-_timestamp(end),))
+        high: Final = (
+            len(order)
+            if start is None
+            else bisect_left(order, (1 - _timestamp(start),))
+        )
+
+        for index in range(low, high):
+            grpid = order[index][1]
+            group = self._groups[grpid]
+            if (
+                not self._types[grpid].isdisjoint(meastypes)
+                and group.attrib in attribs
+                and (categories is None or group.category in categories)
+            ):
+                yield grpid
+
+    def _newest_first(
+        self,
+        meastypes: Tuple[MeasureType, ...],
+        attribs: Tuple[MeasureGetMeasGroupAttrib, ...],
+        categories: Optional[Tuple[MeasureGetMeasGroupCategory, ...]],
+        start: Optional[DateType],
+        end: Optional[DateType],
+    ) -> Iterator[int]:
+        """Iterate over the ids of the matching groups, newest first."""
+        if start is not None or end is not None:
+            return self._find_in_range(meastypes, attribs, categories, start, end)
+
+        grpids: Final = self._find(meastypes, attribs, categories)
+        return (grpid for _, grpid in self._order if grpid in grpids)
+
+    def query(
+        self,
+        with_measure_type: Union[
+            MeasureType, Tuple[MeasureType, ...]
+        ] = MeasureTypes.ANY,
+        with_group_attrib: _GroupAttribType = MeasureGroupAttribs.ANY,
+        with_category: Union[
+            None, MeasureGetMeasGroupCategory, Tuple[MeasureGetMeasGroupCategory, ...]
+        ] = None,
+        start: Optional[DateType] = None,
+        end: Optional[DateType] = None,
+    ) -> Tuple[MeasureGetMeasGroup, ...]:
+        """
+        Get the groups having measures of the given types, newest first.
+
+        Like query_measure_groups, the groups only contain the measures of the
+        given types, but groups without any of them are left out.
+        """
+        meastypes: Final = _as_tuple(with_measure_type)
+        attribs: Final = _as_tuple(with_group_attrib)
+        categories: Final = None if with_category is None else _as_tuple(with_category)
+        if start is None and end is None:
+            dates: Final = self._dates
+            grpids: Iterable[int] = sorted(
+                self._find(meastypes, attribs, categories),
+                key=lambda grpid: (-dates[grpid], grpid),
+            )
+        else:
+            grpids = self._find_in_range(meastypes, attribs, categories, start, end)
+
+        result: Final[List[MeasureGetMeasGroup]] = []
+        for grpid in grpids:
+            group = self._groups[grpid]
+            if self._types[grpid].issubset(meastypes):
+                result.append(group)
+                continue
+            result.append(_only_measure_types(group, meastypes))
+
+        return tuple(result)
+
+    def get_measure_value(
+        self,
+        with_measure_type: Union[MeasureType, Tuple[MeasureType, ...]],
+        with_group_attrib: _GroupAttribType = MeasureGroupAttribs.ANY,
+        start: Optional[DateType] = None,
+        end: Optional[DateType] = None,
+    ) -> Optional[float]:
+        """Get the newest value of a measure that meet the query requirements."""
+        meastypes: Final = _as_tuple(with_measure_type)
+        attribs: Final = _as_tuple(with_group_attrib)
+        if start is None and end is None:
+            grpids: Final = self._find(meastypes, attribs, None)
+            dates: Final = self._dates
+            newest = (
+                min(grpids, key=lambda grpid: (-dates[grpid], grpid))
+                if grpids
+                else None
+            )
+        else:
+            newest = next(
+                self._find_in_range(meastypes, attribs, None, start, end), None
+            )
+        if newest is None:
+            return None
+
+        return next(
+            float(measure.value * pow(10, measure.unit))
+            for measure in self._groups[newest].measures
+            if measure.type in meastypes
+        )
+
+    def get_measure_values(
+        self,
+        with_measure_types: Iterable[MeasureType] = MeasureTypes.ANY,
+        with_group_attrib: _GroupAttribType = MeasureGroupAttribs.ANY,
+        start: Optional[DateType] = None,
+        end: Optional[DateType] = None,
+    ) -> Dict[MeasureType, MeasureValue]:
+        """Get the newest value and its date of each measure type."""
+        meastypes: Final = tuple(with_measure_types)
+        attribs: Final = _as_tuple(with_group_attrib)
+        return get_measure_values(
+            (
+                self._groups[grpid]
+                for grpid in self._newest_first(meastypes, attribs, None, start, end)
+            ),
+            meastypes,
+            attribs,
+        )
@@ -0,0 +1,145 @@
+"""Incremental decoding of JSON responses."""
+import codecs
+import json
+import re
+from typing import Any, Dict, Generator, Iterable, Iterator, Optional, Sequence
+
+from typing_extensions import Final
+
+DEFAULT_CHUNK_SIZE: Final = 64 * 1024
+
+_WHITESPACE: Final = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL: Final = ".eE+-"
+
+
+class JsonItemStream:  # pylint: disable=too-many-instance-attributes
+    """
+    Decodes the items of one array of a JSON document while it is downloaded.
+
+    The array is found by following the object keys of path from the root.
+    Its items are yielded one at a time as soon as they are complete, so only
+    a single item and one chunk are held in memory. Everything else in the
+    document is collected into rest, without the array, once the items were
+    consumed.
+
+    stream = JsonItemStream(response.iter_content(65536), ("body", "series"))
+    for item in stream:
+        save(item)
+    print(stream.rest)
+    """
+
+    def __init__(self, chunks: Iterable[bytes], path: Sequence[str]):
+        """Initialize new object."""
+        if not path:
+            raise ValueError("path must not be empty")
+
+        self._chunks: Final = iter(chunks)
+        self._path: Final = tuple(path)
+        self._utf8: Final = codecs.getincrementaldecoder("utf-8")()
+        self._decoder: Final = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+        self.rest: Optional[Dict[str, Any]] = None
+
+    def _fill(self) -> bool:
+        """Read the next chunk, return False at the end of the document."""
+        if self._eof:
+            return False
+
+        chunk: Final = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._utf8.decode(b"", final=True)
+        else:
+            text = self._utf8.decode(chunk)
+
+        if self._pos > len(self._buffer) // 2:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += text
+
+        return chunk is not None or bool(text)
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()  # type: ignore
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise self._error("Unexpected end of document")
+        return self._buffer[self._pos]
+
+    def _expect(self, chars: str) -> str:
+        char: Final = self._peek()
+        if char not in chars:
+            raise self._error("Expecting one of %r" % chars)
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+
+            # A number cut by the end of the buffer may continue in the next chunk.
+            if (
+                isinstance(value, (int, float))
+                and (end == len(self._buffer) or self._buffer[end] in _NUMBER_TAIL)
+                and self._fill()
+            ):
+                continue
+
+            self._pos = end
+            return value
+
+    def _object(self, path: Sequence[str]) -> Generator[Any, None, Dict[str, Any]]:
+        """Decode an object, yielding the items of the array at path."""
+        result: Final[Dict[str, Any]] = {}
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return result
+
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == path[0] and len(path) == 1 and self._peek() == "[":
+                yield from self._array()
+            elif key == path[0] and len(path) > 1 and self._peek() == "{":
+                result[key] = yield from self._object(path[1:])
+            else:
+                result[key] = self._value()
+
+            if self._expect(",}") == "}":
+                return result
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._started:
+            raise RuntimeError("the stream can only be iterated once")
+        self._started = True
+
+        self.rest = yield from self._object(self._path)
@@ -0,0 +1,195 @@
+"""Incremental syncing of Withings data using lastupdate cursors."""
+from abc import abstractmethod
+import sqlite3
+import threading
+from typing import Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+import arrow
+from typing_extensions import Final
+
+from . import AbstractWithingsApi, DateType
+from .common import (
+    GetActivityField,
+    GetSleepSummaryField,
+    GetSleepSummarySerie,
+    MeasureGetActivityActivity,
+    MeasureGetMeasGroup,
+    MeasureGetMeasGroupCategory,
+    MeasureType,
+)
+
+ENDPOINT_MEASURE_GET_MEAS: Final = "measure_get_meas"
+ENDPOINT_MEASURE_GET_ACTIVITY: Final = "measure_get_activity"
+ENDPOINT_SLEEP_GET_SUMMARY: Final = "sleep_get_summary"
+
+
+class AbstractCursorStore:
+    """Abstract class for persisting the sync cursors of users."""
+
+    @abstractmethod
+    def get_cursor(self, userid: Hashable, endpoint: str) -> Optional[int]:
+        """Get the timestamp up to which an endpoint was synced."""
+
+    @abstractmethod
+    def set_cursor(self, userid: Hashable, endpoint: str, cursor: int) -> None:
+        """Store the timestamp up to which an endpoint was synced."""
+
+
+class MemoryCursorStore(AbstractCursorStore):
+    """Keeps the cursors in memory, mostly useful for testing."""
+
+    def __init__(self) -> None:
+        """Initialize new object."""
+        self._cursors: Final[Dict[Tuple[str, str], int]] = {}
+
+    def get_cursor(self, userid: Hashable, endpoint: str) -> Optional[int]:
+        """Get the timestamp up to which an endpoint was synced."""
+        return self._cursors.get((str(userid), endpoint))
+
+    def set_cursor(self, userid: Hashable, endpoint: str, cursor: int) -> None:
+        """Store the timestamp up to which an endpoint was synced."""
+        self._cursors[(str(userid), endpoint)] = cursor
+
+
+class SqliteCursorStore(AbstractCursorStore):
+    """Keeps the cursors in a SQLite database file."""
+
+    def __init__(self, path: str):
+        """Initialize new object."""
+        self._lock: Final = threading.Lock()
+        self._connection: Final = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS withings_sync_cursor ("
+                "userid TEXT NOT NULL, endpoint TEXT NOT NULL, cursor INTEGER NOT NULL, "
+                "PRIMARY KEY (userid, endpoint))"
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def get_cursor(self, userid: Hashable, endpoint: str) -> Optional[int]:
+        """Get the timestamp up to which an endpoint was synced."""
+        with self._lock:
+            row: Final = self._connection.execute(
+                "SELECT cursor FROM withings_sync_cursor WHERE userid = ? AND endpoint = ?",
+                (str(userid), endpoint),
+            ).fetchone()
+        return None if row is None else int(row[0])
+
+    def set_cursor(self, userid: Hashable, endpoint: str, cursor: int) -> None:
+        """Store the timestamp up to which an endpoint was synced."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO withings_sync_cursor (userid, endpoint, cursor) "
+                "VALUES (?, ?, ?)",
+                (str(userid), endpoint, cursor),
+            )
+
+
+class WithingsSync:
+    """
+    Fetches only what changed since the previous sync of a user.
+
+    Each sync method pages through the data modified after the stored cursor
+    of its endpoint. The cursor is advanced to the high water mark reported by
+    the responses once every item was consumed, so an interrupted sync is
+    simply repeated the next time.
+
+    sync = WithingsSync(api, SqliteCursorStore("sync.db"), userid=user.id)
+    for group in sync.sync_measures():
+        save(group)
+    """
+
+    def __init__(
+        self,
+        api: AbstractWithingsApi,
+        store: AbstractCursorStore,
+        userid: Hashable,
+        initial: DateType = 0,
+    ):
+        """Initialize new object."""
+        self._api: Final = api
+        self._store: Final = store
+        self._userid: Final = userid
+        self._initial: Final = arrow.get(initial).int_timestamp
+
+    def get_cursor(self, endpoint: str) -> int:
+        """Get the timestamp up to which an endpoint was synced."""
+        cursor: Final = self._store.get_cursor(self._userid, endpoint)
+        return self._initial if cursor is None else cursor
+
+    def _advance(self, endpoint: str, cursor: int) -> None:
+        if cursor > self.get_cursor(endpoint):
+            self._store.set_cursor(self._userid, endpoint, cursor)
+
+    def sync_measures(
+        self,
+        meastype: Optional[MeasureType] = None,
+        category: Optional[MeasureGetMeasGroupCategory] = None,
+    ) -> Iterator[MeasureGetMeasGroup]:
+        """Yield the measure groups modified since the last sync."""
+        lastupdate: Final = self.get_cursor(ENDPOINT_MEASURE_GET_MEAS)
+        high_water_mark = lastupdate
+        offset: Optional[int] = None
+        while True:
+            response = self._api.measure_get_meas(
+                meastype=meastype,
+                category=category,
+                startdate=None,
+                enddate=None,
+                offset=offset,
+                lastupdate=lastupdate,
+            )
+            yield from response.measuregrps
+
+            high_water_mark = max(high_water_mark, response.updatetime.int_timestamp)
+            if not response.more:
+                break
+            offset = response.offset
+
+        self._advance(ENDPOINT_MEASURE_GET_MEAS, high_water_mark)
+
+    def sync_activity(
+        self, data_fields: Iterable[GetActivityField] = GetActivityField
+    ) -> Iterator[MeasureGetActivityActivity]:
+        """
+        Yield the activities modified since the last sync.
+
+        Activities carry no modification time, the cursor is advanced to the
+        time the sync started.
+        """
+        started: Final = arrow.utcnow().int_timestamp
+        yield from self._api.iter_measure_get_activity(
+            data_fields=data_fields,
+            startdateymd=None,
+            enddateymd=None,
+            lastupdate=self.get_cursor(ENDPOINT_MEASURE_GET_ACTIVITY),
+        )
+
+        self._advance(ENDPOINT_MEASURE_GET_ACTIVITY, started)
+
+    def sync_sleep_summary(
+        self, data_fields: Iterable[GetSleepSummaryField] = GetSleepSummaryField
+    ) -> Iterator[GetSleepSummarySerie]:
+        """Yield the sleep summaries modified since the last sync."""
+        high_water_mark = self.get_cursor(ENDPOINT_SLEEP_GET_SUMMARY)
+        for summary in self._api.iter_sleep_get_summary(
+            data_fields=data_fields,
+            startdateymd=None,
+            enddateymd=None,
+            lastupdate=high_water_mark,
+        ):
+            yield summary
+            high_water_mark = max(high_water_mark, summary.modified.int_timestamp)
+
+        self._advance(ENDPOINT_SLEEP_GET_SUMMARY, high_water_mark)
+
+    def reset(self, endpoint: str, cursor: Optional[DateType] = None) -> None:
+        """Move the cursor of an endpoint back, to fetch data again."""
+        self._store.set_cursor(
+            self._userid,
+            endpoint,
+            self._initial if cursor is None else arrow.get(cursor).int_timestamp,
+        )